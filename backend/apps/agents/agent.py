@@ -1,18 +1,22 @@
 import os
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import AgentExecutor
-from langchain.agents.tool_calling_agent.base import create_tool_calling_agent
-
 from apps.agents.tools import ALL_TOOLS
 from apps.agents.prompt import STOCK_ANALYST_PROMPT
 
+# The Gemini client and the agent runtime are slow to import; they are
+# loaded when the executor is first built (see apps.services.warmup).
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+
 # Load env vars from .env
 load_dotenv()
 
 
 def _get_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not found in environment variables.")
@@ -25,7 +29,7 @@ def _get_llm():
     return llm
 
 
-def create_stock_agent_executor() -> AgentExecutor:
+def create_stock_agent_executor() -> "AgentExecutor":
     """
     Build and return an AgentExecutor that:
     - Uses Gemini (ChatGoogleGenerativeAI)
@@ -33,6 +37,9 @@ def create_stock_agent_executor() -> AgentExecutor:
     - Uses the STOCK_ANALYST_PROMPT
     via LangChain's create_tool_calling_agent helper.
     """
+    from langchain.agents import AgentExecutor
+    from langchain.agents.tool_calling_agent.base import create_tool_calling_agent
+
     llm = _get_llm()
 
     agent = create_tool_calling_agent(
@@ -44,7 +51,8 @@ def create_stock_agent_executor() -> AgentExecutor:
     agent_executor = AgentExecutor(
         agent=agent,
         tools=ALL_TOOLS,
-        verbose=True,
+        # Per-step timings come from the tracing layer; this only prints to stdout.
+        verbose=os.getenv("AGENT_VERBOSE", "0").lower() in ("1", "true", "yes"),
     )
 
     return agent_executor
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from apps.services.tracing import Span, Trace, current_trace, record
+
+
+def _model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    name = params.get("model") or params.get("model_name")
+    if not name and serialized:
+        name = (serialized.get("kwargs") or {}).get("model") or serialized.get("name")
+    return str(name or "llm")
+
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    """Input/output token counts from the message metadata or provider output."""
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                found = True
+                usage["input_tokens"] += metadata.get("input_tokens", 0)
+                usage["output_tokens"] += metadata.get("output_tokens", 0)
+    if not found:
+        reported = (response.llm_output or {}).get("token_usage") or {}
+        usage["input_tokens"] = reported.get("prompt_tokens", 0)
+        usage["output_tokens"] = reported.get("completion_tokens", 0)
+    return usage
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records every LLM call of a run as an `llm` span with its token counts
+    and prompt size. Tools, upstream requests and renders trace themselves
+    (see apps.services.tracing); this covers what only LangChain sees.
+
+    The trace is captured when the handler is created, so callbacks that
+    LangChain runs on other threads still land in the right request.
+    """
+
+    run_inline = True
+
+    def __init__(self, trace: Optional[Trace] = None):
+        self.trace = trace or current_trace()
+        self._started: Dict[UUID, Tuple[float, str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, name: str, prompt_chars: int) -> None:
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), name, prompt_chars)
+
+    def _finish(self, run_id: UUID, error: Optional[str] = None, **attrs: Any) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, name, prompt_chars = started
+        span = Span("llm", name, start, time.perf_counter() - start, error,
+                    {"prompt_chars": prompt_chars, **attrs})
+        record(span, self.trace)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID,
+                     **kwargs: Any) -> None:
+        self._start(run_id, _model_name(serialized, kwargs), sum(len(p) for p in prompts))
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        self._start(run_id, _model_name(serialized, kwargs), chars)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        text = "".join(g.text for generations in response.generations for g in generations)
+        self._finish(run_id, output_chars=len(text), **_token_usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=type(error).__name__)
+
+
+def _is_error_output(output: Any) -> bool:
+    """Whether a tool's output is one of the tools' error results ("ERROR: ..." or {"error": ...})."""
+    if getattr(output, "status", None) == "error":  # ToolMessage
+        return True
+    content = getattr(output, "content", output)
+    if isinstance(content, str):
+        return content.lstrip().startswith("ERROR")
+    return isinstance(content, dict) and "error" in content
+
+
+class RunOutcomeHandler(BaseCallbackHandler):
+    """
+    Notes whether anything went wrong during a run: a tool that raised or
+    returned an error result, or a chain or LLM call that raised. The agent
+    may still answer after such a failure, but the answer is not one to
+    reuse for other requests.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.failed = False
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        if _is_error_output(output):
+            self.failed = True
+
+    def on_tool_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.failed = True
+
+    def on_chain_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.failed = True
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.failed = True
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from apps.agents.callbacks import TracingCallbackHandler
+from apps.agents.tools import compute_indicators, fetch_stock_prices, generate_plot
+from apps.agents.tools.price_series import series_url
+from apps.services.dataset_registry import Dataset, current_registry
+from apps.services.market_calendar import last_session_date, trading_days_between
+from apps.services.query_parser import ParsedQuery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_DAYS = 90
+DEFAULT_WINDOWS: Tuple[int, ...] = (5, 20, 50)
+COMPACT_ROWS = 100
+SUMMARY_TIMEOUT = float(os.getenv("FAST_PATH_SUMMARY_TIMEOUT_SECONDS", "20"))
+
+# Indicators the fixed pipeline computes; anything else needs the agent.
+FAST_PATH_INDICATORS = {"sma", "bb", "stats"}
+_HANDLE = re.compile(r"DATASET: (ds_[0-9a-f]{12})")
+
+SUMMARY_PROMPT = """You are a stock market analyst. Using only the figures below, write a short
+plain-English summary (4-6 sentences) of {symbol}'s recent price action for a
+non-technical reader: trend, where price sits versus its moving averages and
+Bollinger Bands, and volatility. Do not invent numbers. Mention the chart URL
+if one is given.
+
+{facts}
+"""
+
+
+@dataclass
+class AnalysisParams:
+    """
+    Inputs of the standard fetch -> indicators -> chart -> summary pipeline.
+    The chart is drawn by the browser from `series_url`; `chart` also
+    renders the PNG fallback.
+    """
+    symbol: str
+    range_days: int = DEFAULT_RANGE_DAYS
+    windows: Tuple[int, ...] = DEFAULT_WINDOWS
+    band_window: int = 20
+    num_std: float = 2.0
+    chart: bool = False
+    summarize: bool = True
+
+    @property
+    def indicator_specs(self) -> str:
+        specs = [f"sma:{w}" for w in self.windows]
+        specs.append(f"bb:{self.band_window}:{self.num_std:g}")
+        return ",".join(specs)
+
+
+class PipelineError(RuntimeError):
+    """A pipeline step failed in a way the caller should report (bad symbol, quota)."""
+
+
+def fast_path_params(parsed: ParsedQuery) -> Optional[AnalysisParams]:
+    """
+    AnalysisParams for a question the standard pipeline can answer in full:
+    one symbol, a look-back range (no explicit dates), daily bars, only
+    SMA / Bollinger / stats, and nothing else the parser could not account
+    for ("why", "sell", an unknown ticker). None means the question should
+    go to the agent.
+    """
+    if len(parsed.symbols) != 1 or parsed.dates or parsed.interval or parsed.unparsed:
+        return None
+    if not set(parsed.indicators) <= FAST_PATH_INDICATORS:
+        return None
+
+    range_days = parsed.range_days or DEFAULT_RANGE_DAYS
+    if parsed.ytd:
+        today = date.today()
+        range_days = max(1, (today - date(today.year, 1, 1)).days)
+    return AnalysisParams(
+        symbol=parsed.symbols[0],
+        range_days=range_days,
+        windows=tuple(parsed.sma_windows) or DEFAULT_WINDOWS,
+    )
+
+
+def _handle(tool_output: str) -> str:
+    match = _HANDLE.search(tool_output)
+    if not match:
+        raise PipelineError(tool_output.removeprefix("ERROR: ").strip())
+    return match.group(1)
+
+
+def output_size_for(start: date, end: date, lookback: int) -> str:
+    """'compact' when the range plus indicator warm-up fits in the compact series."""
+    return "compact" if trading_days_between(start, end) + lookback <= COMPACT_ROWS else "full"
+
+
+def fetch_dataset(symbol: str, output_size: str, interval: str = "daily") -> Dataset:
+    """Fetch through the fetch_stock_prices tool and return the registered dataset."""
+    fetched = fetch_stock_prices.invoke(
+        {"symbol": symbol, "output_size": output_size, "interval": interval}
+    )
+    return current_registry().get(_handle(fetched))
+
+
+def _check(result: Any, step: str) -> Any:
+    if isinstance(result, dict) and "error" in result:
+        raise PipelineError(result["error"])
+    if isinstance(result, str) and result.startswith("ERROR"):
+        raise PipelineError(f"{step}: {result.removeprefix('ERROR: ')}")
+    return result
+
+
+def _facts(params: AnalysisParams, first: str, last: str, indicators: Dict[str, Any],
+           range_stats: Dict[str, Any], start_close: float, chart_url: Optional[str]) -> List[str]:
+    last_values = indicators["last"]
+    close = range_stats["last_close"]
+    change = close / start_close - 1 if start_close else 0.0
+    facts = [
+        f"Period: {first} to {last} ({range_stats['count']} trading days)",
+        f"Last close: {close:.2f} ({change:+.1%} over the period)",
+        f"Period high / low: {range_stats['max']:.2f} / {range_stats['min']:.2f}; "
+        f"mean {range_stats['mean']:.2f}, std {range_stats['std']:.2f}",
+    ]
+    for w in params.windows:
+        value = last_values.get(f"sma_{w}")
+        if value is not None:
+            position = "above" if close >= value else "below"
+            facts.append(f"{w}-day SMA: {value:.2f} (price is {position})")
+    key = f"bb_{params.band_window}_{params.num_std:g}"
+    upper, lower = last_values.get(f"{key}_upper"), last_values.get(f"{key}_lower")
+    if upper is not None and lower is not None:
+        facts.append(f"Bollinger Bands ({params.band_window}, {params.num_std:g}): "
+                     f"{lower:.2f} - {upper:.2f}")
+    if chart_url:
+        facts.append(f"Chart: {chart_url}")
+    return facts
+
+
+async def _llm_summary(symbol: str, facts: List[str]) -> Optional[str]:
+    """One LLM call turning the computed facts into prose; None if unavailable."""
+    try:
+        from apps.agents.agent import _get_llm
+
+        llm = await asyncio.to_thread(_get_llm)
+        prompt = SUMMARY_PROMPT.format(symbol=symbol, facts="\n".join(f"- {f}" for f in facts))
+        message = await asyncio.wait_for(
+            llm.ainvoke(prompt, config={"callbacks": [TracingCallbackHandler()]}),
+            timeout=SUMMARY_TIMEOUT,
+        )
+    except Exception as e:
+        logger.warning("Fast-path summary fell back to template: %s", e)
+        return None
+    content = message.content
+    if isinstance(content, list):
+        content = "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+    return content.strip() or None
+
+
+async def run_analysis(params: AnalysisParams) -> Dict[str, Any]:
+    """
+    Run the standard analysis without the agent loop: fetch once, then
+    compute indicators, range statistics (and the PNG chart if asked for)
+    concurrently, link the interactive series for the range, and
+    make at most one LLM call for the summary (template text otherwise).
+    Must run inside a `dataset_scope`. Returns the /query response shape.
+    """
+    symbol = params.symbol.upper()
+    end = last_session_date()
+    start = end - timedelta(days=params.range_days)
+    lookback = max((*params.windows, params.band_window))
+    full = await asyncio.to_thread(fetch_dataset, symbol, output_size_for(start, end, lookback))
+
+    # Indicators use the whole fetched history (warm-up), the chart and stats the range.
+    in_range = full.frame[full.frame["date"] >= pd.Timestamp(start)]
+    if in_range.empty:
+        raise PipelineError(f"No data available for {symbol} since {start.isoformat()}.")
+    ranged = current_registry().register(in_range.reset_index(drop=True), symbol=symbol)
+
+    steps = [
+        asyncio.to_thread(compute_indicators.invoke, {
+            "csv_data": full.handle, "indicators": params.indicator_specs, "last_n": 0,
+        }),
+        asyncio.to_thread(compute_indicators.invoke, {
+            "csv_data": ranged.handle, "indicators": "stats:close", "last_n": 0,
+        }),
+    ]
+    if params.chart:
+        steps.append(asyncio.to_thread(generate_plot.invoke, {"csv_data": ranged.handle}))
+    indicators, range_result, *chart = await asyncio.gather(*steps)
+
+    indicators = _check(indicators, "indicators")
+    range_stats = _check(range_result, "stats")["stats"]["stats_close"]
+    range_stats["last_close"] = float(in_range["close"].iloc[-1])
+    chart_url = _check(chart[0], "chart") if chart else None
+
+    first = in_range["date"].iloc[0].strftime("%Y-%m-%d")
+    last = in_range["date"].iloc[-1].strftime("%Y-%m-%d")
+    facts = _facts(params, first, last, indicators, range_stats,
+                   float(in_range["close"].iloc[0]), chart_url)
+
+    series = series_url(symbol, start=first, end=last, indicators=params.indicator_specs)
+
+    summary = await _llm_summary(symbol, facts) if params.summarize else None
+    if summary is None:
+        summary = f"{symbol} analysis:\n" + "\n".join(f"- {f}" for f in facts)
+
+    return {
+        "summary": summary,
+        "raw_result": {
+            "pipeline": "fast",
+            "symbol": symbol,
+            "start_date": first,
+            "end_date": last,
+            "last": indicators["last"],
+            "stats": range_stats,
+            "chart_url": chart_url,
+            "series_url": series,
+        },
+        "chart_urls": [chart_url] if chart_url else [],
+        "series_urls": [series],
+    }
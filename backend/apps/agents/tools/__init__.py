@@ -3,6 +3,10 @@ from .calculate_stats import calculate_stats
 from .generate_plot import generate_plot
 from .moving_averages import moving_averages
 from .bollinger import bollinger_bands
+from .compute_indicators import compute_indicators
+from .batch_analysis import batch_analysis
+from .price_series import price_series
+from .backtest_strategy import backtest_strategy
 
 
 # You will keep extending this list as you add more tools.
@@ -11,5 +15,9 @@ ALL_TOOLS = [
     calculate_stats,
     generate_plot,
     moving_averages,
-    bollinger_bands
+    bollinger_bands,
+    compute_indicators,
+    batch_analysis,
+    price_series,
+    backtest_strategy,
 ]
@@ -0,0 +1,131 @@
+from typing import Any, Dict, Literal, Optional
+
+import numpy as np
+import pandas as pd
+from langchain_core.tools import tool
+
+from apps.analytics import backtest_grid, buy_and_hold, compact_table, parse_grid, rank_backtests
+from apps.services.dataset_registry import resolve_frame
+from apps.services.tracing import traced
+
+# Largest grid accepted in one call; keeps a sweep well inside an agent step.
+MAX_COMBINATIONS = 2000
+
+
+def run_backtest(
+    frame: pd.DataFrame,
+    strategy: str = "sma_crossover",
+    fast_windows: str = "5-50:5",
+    slow_windows: str = "20-200:10",
+    band_windows: str = "10-50:5",
+    num_std: str = "1.5,2,2.5,3",
+    range_days: Optional[int] = None,
+    cost_bps: float = 0.0,
+    rank_by: str = "sharpe",
+    top_n: Optional[int] = 10,
+) -> Dict[str, Any]:
+    """
+    Sweep `strategy` over its parameter grid on `frame`'s closes and rank
+    the combinations. Every combination is measured over the same bars:
+    the last `range_days` calendar days, or everything after the longest
+    window's warm-up. Raises ValueError for bad arguments.
+    """
+    if strategy == "sma_crossover":
+        fast, slow = parse_grid(fast_windows), parse_grid(slow_windows)
+        windows, stds = [], []
+        combinations = sum(1 for f in fast for s in slow if f < s)
+        longest = max(slow)
+    else:
+        fast, slow = [], []
+        windows, stds = parse_grid(band_windows), parse_grid(num_std, cast=float)
+        combinations = len(windows) * len(stds)
+        longest = max(windows)
+    if min([*fast, *slow, *windows]) < 2:
+        raise ValueError("windows must be >= 2")
+    if combinations > MAX_COMBINATIONS:
+        raise ValueError(f"at most {MAX_COMBINATIONS} parameter combinations per call, got {combinations}")
+
+    dates = frame["date"].to_numpy(dtype="datetime64[ns]")
+    start = longest - 1
+    if range_days:
+        since = dates[-1] - np.timedelta64(range_days, "D")
+        start = max(start, int(np.searchsorted(dates, since, side="left")))
+
+    close = frame["close"].to_numpy(dtype=np.float64)
+    table = backtest_grid(
+        close, strategy, fast=fast, slow=slow, windows=windows, num_std=stds,
+        start=start, cost_bps=cost_bps,
+    )
+    ranked = rank_backtests(table, rank_by, top_n)
+    compact = compact_table(ranked)
+    compact["columns"][0] = "params"
+    return {
+        "strategy": strategy,
+        "start_date": pd.Timestamp(dates[start]).strftime("%Y-%m-%d"),
+        "end_date": pd.Timestamp(dates[-1]).strftime("%Y-%m-%d"),
+        "bars": len(close) - start,
+        "combinations": len(table),
+        "buy_and_hold": {k: round(v, 4) for k, v in buy_and_hold(close, start).items()},
+        "table": compact,
+    }
+
+
+@tool
+@traced("tool")
+def backtest_strategy(
+    csv_data: str,
+    strategy: Literal["sma_crossover", "bollinger_reversion"] = "sma_crossover",
+    fast_windows: str = "5-50:5",
+    slow_windows: str = "20-200:10",
+    band_windows: str = "10-50:5",
+    num_std: str = "1.5,2,2.5,3",
+    range_days: Optional[int] = None,
+    cost_bps: float = 0.0,
+    rank_by: str = "sharpe",
+    top_n: Optional[int] = 10,
+) -> Dict[str, Any]:
+    """
+    Backtest a long/flat trading strategy on historical closes, over a whole
+    grid of parameters at once, e.g. "would a 20/50 crossover have worked?".
+    Fetch with output_size="full" first for long histories.
+
+    Args:
+        csv_data: dataset handle from fetch_stock_prices
+        strategy: "sma_crossover" (long while SMA(fast) > SMA(slow)) or
+                  "bollinger_reversion" (buy below the lower band, sell
+                  back above the middle band)
+        fast_windows / slow_windows: crossover windows, a list "20,50" or a
+                  range "5-50:5" (start-end:step); every fast < slow pair is tested
+        band_windows / num_std: Bollinger window and band width grids
+        range_days: only measure the last N calendar days (default: all
+                  history after the indicator warm-up)
+        cost_bps: cost per entry or exit in basis points
+        rank_by: sharpe, total_return, cagr, max_drawdown, volatility, trades
+        top_n: only return the N best-ranked combinations (null for all)
+
+    Returns:
+        {
+          "strategy": .., "start_date": .., "end_date": .., "bars": .., "combinations": ..,
+          "buy_and_hold": {"total_return": .., "sharpe": .., ...},
+          "table": {"columns": ["params", "total_return", "cagr", "volatility", "sharpe",
+                                "max_drawdown", "trades", "exposure", "rank"],
+                    "rows": [["fast=20,slow=50", 1.23, ...], ...]}
+        }
+
+    On error returns {"error": "message"}.
+    """
+    try:
+        return run_backtest(
+            resolve_frame(csv_data),
+            strategy=strategy,
+            fast_windows=fast_windows,
+            slow_windows=slow_windows,
+            band_windows=band_windows,
+            num_std=num_std,
+            range_days=range_days,
+            cost_bps=cost_bps,
+            rank_by=rank_by,
+            top_n=top_n,
+        )
+    except Exception as e:
+        return {"error": f"backtest_strategy failed: {str(e)}"}
@@ -0,0 +1,139 @@
+import os
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from langchain_core.tools import tool
+
+from apps.analytics import build_panel, compact_table, cross_section, parse_specs, return_correlation
+from apps.services.alpha_vantage_client import COMPACT_ROWS, get_client
+from apps.services.market_calendar import last_session_date, trading_days_between
+from apps.services.tracing import traced
+
+BATCH_MAX_SYMBOLS = int(os.getenv("BATCH_MAX_SYMBOLS", "500"))
+# Symbols one batch may fetch from upstream; the rest are returned as deferred.
+BATCH_MAX_UPSTREAM = int(os.getenv("BATCH_MAX_UPSTREAM", "5"))
+# Correlation matrices grow quadratically; only include them for small batches.
+CORRELATION_MAX_SYMBOLS = 50
+
+
+def analyze_batch(
+    symbols: List[str],
+    indicators: str = "sma:20,sma:50,rsi:14",
+    range_days: int = 90,
+    rank_by: str = "return_period",
+    ascending: bool = False,
+    top_n: Optional[int] = None,
+    correlation: bool = False,
+    max_upstream: int = BATCH_MAX_UPSTREAM,
+) -> Dict[str, Any]:
+    """
+    Fetch `symbols` concurrently, align their closes into one date x symbol
+    panel and compute returns, volatility, drawdown and `indicators` for
+    every symbol in one pass. Raises ValueError for bad arguments; symbols
+    that cannot be fetched are listed under "errors".
+
+    Symbols with fresh stored bars are always included. At most
+    `max_upstream` others (fewer if the per-minute quota has fewer free
+    slots) are fetched from upstream, without queueing for the quota; the
+    rest are listed under "deferred" to be asked for again later, so a big
+    uncached batch cannot outlast an agent run.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        raise ValueError("no symbols given")
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        raise ValueError(f"at most {BATCH_MAX_SYMBOLS} symbols per batch, got {len(symbols)}")
+    specs = parse_specs(indicators) if indicators.strip() else []
+
+    end = last_session_date()
+    start = end - timedelta(days=range_days)
+    # Warm-up for the longest indicator window and for return_21d.
+    lookback = max([int(p) for spec in specs for p in spec.params] + [21])
+    needed = trading_days_between(start, end) + lookback
+    output_size = "compact" if needed <= COMPACT_ROWS else "full"
+
+    client = get_client()
+    uncached = [s for s in symbols if client.needs_upstream(s, output_size)]
+    slots = min(max_upstream, int(client.limiter.snapshot()["tokens_available"]))
+    deferred = uncached[max(0, slots):]
+    skipped = set(deferred)
+    frames, errors = client.fetch_many([s for s in symbols if s not in skipped], output_size, max_wait=0)
+    if not frames:
+        return {"table": {"columns": [], "rows": []}, "errors": errors, "deferred": deferred}
+
+    panel = build_panel(frames)
+    table = cross_section(panel, specs, start=pd.Timestamp(start), rank_by=rank_by, ascending=ascending)
+    if top_n:
+        table = table.head(top_n)
+
+    result: Dict[str, Any] = {
+        "start_date": start.isoformat(),
+        "end_date": panel.index[-1].strftime("%Y-%m-%d"),
+        "symbols": len(frames),
+        "table": compact_table(table),
+        "errors": errors,
+        "deferred": deferred,
+    }
+    if correlation and len(frames) <= CORRELATION_MAX_SYMBOLS:
+        corr = return_correlation(panel, start=pd.Timestamp(start)).round(3)
+        result["correlation"] = {
+            "symbols": list(corr.columns),
+            "matrix": corr.astype(object).where(corr.notna(), None).values.tolist(),
+        }
+    return result
+
+
+@tool
+@traced("tool")
+def batch_analysis(
+    symbols: str,
+    indicators: str = "sma:20,sma:50,rsi:14",
+    range_days: int = 90,
+    rank_by: str = "return_period",
+    ascending: bool = False,
+    top_n: Optional[int] = 20,
+    correlation: bool = False,
+) -> Dict[str, Any]:
+    """
+    Screen or compare several stocks at once (a watchlist), instead of
+    fetching and analysing them one by one.
+
+    Args:
+        symbols: comma-separated tickers, e.g. "AAPL,MSFT,NVDA"
+        indicators: specs as for compute_indicators (sma:<w>, ema:<span>,
+                    bb:<w>:<k>, rsi:<p>, macd:<f>:<s>:<sig>); the latest value
+                    of each is returned per symbol
+        range_days: period (calendar days) for return_period, volatility
+                    and max_drawdown
+        rank_by: column to rank by, e.g. return_period, return_21d,
+                 volatility, rsi_14, close_vs_sma_50
+        ascending: rank smallest first (e.g. lowest volatility)
+        top_n: only return the N best-ranked rows (null for all)
+        correlation: also return the daily-return correlation matrix
+                     (batches of up to 50 symbols)
+
+    Returns:
+        {
+          "table": {"columns": ["symbol", "last_close", ..., "rank"],
+                    "rows": [["NVDA", 121.3, ...], ...]},
+          "errors": {"XYZ": "reason"}, "start_date": .., "end_date": ..,
+          "deferred": ["TSLA", ...]
+        }
+        Symbols under "deferred" were not fetched yet (upstream quota); say
+        so, and ask for them again in a later call if they are needed.
+
+    On error returns {"error": "message"}.
+    """
+    try:
+        return analyze_batch(
+            symbols.replace(";", ",").split(","),
+            indicators=indicators,
+            range_days=range_days,
+            rank_by=rank_by,
+            ascending=ascending,
+            top_n=top_n,
+            correlation=correlation,
+        )
+    except Exception as e:
+        return {"error": f"batch_analysis failed: {str(e)}"}
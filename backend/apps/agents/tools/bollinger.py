@@ -1,22 +1,44 @@
 # backend/apps/agents/tools/bollinger.py
-from typing import Dict, Any
-import io
+from typing import Dict, Any, Literal, Optional
 
-import pandas as pd
-from langchain.tools import tool
+from langchain_core.tools import tool
+
+from apps.agents.tools.serialize import columnar, rows
+from apps.agents.tools.stored_state import indicator_state_for, tail_for
+from apps.analytics import IndicatorSpec, compute_indicators
+from apps.services.dataset_registry import resolve_dataset
+from apps.services.tracing import traced
 
 
 @tool
-def bollinger_bands(csv_data: str, window: int = 20, num_std: float = 2.0) -> Dict[str, Any]:
+@traced("tool")
+def bollinger_bands(
+    csv_data: str,
+    window: int = 20,
+    num_std: float = 2.0,
+    output_format: Literal["columnar", "rows"] = "columnar",
+    last_n: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Compute Bollinger Bands (SMA, upper, lower) for the 'close' price.
 
     Args:
-        csv_data: CSV string with 'date' and 'close'
+        csv_data: dataset handle from fetch_stock_prices, or a CSV string
+                  with 'date' and 'close'
         window: rolling window for SMA/std
         num_std: multiplier for bands (default 2.0)
+        output_format: "columnar" (default, compact) or "rows" (legacy format)
+        last_n: only return the last N points (0 = only "last")
+        max_points: evenly thin the returned bands to at most this many points
+
+    Returns (columnar):
+        {
+          "bands": {"dates": [...], "sma": [...], "upper": [...], "lower": [...]},
+          "last": {"date": "...", "sma":.., "upper":.., "lower":..}
+        }
 
-    Returns:
+    Returns (rows):
         {
           "bands": [{"date":"2025-01-01","sma":..,"upper":..,"lower":..}, ...],
           "last": {"date": "...", "sma":.., "upper":.., "lower":..}
@@ -25,25 +47,31 @@ def bollinger_bands(csv_data: str, window: int = 20, num_std: float = 2.0) -> Di
     On error returns {"error": "message"}.
     """
     try:
-        df = pd.read_csv(io.StringIO(csv_data), parse_dates=["date"]).sort_values("date")
+        dataset = resolve_dataset(csv_data)
+        df = dataset.frame
         if "close" not in df.columns:
             return {"error": "close column not found in CSV data"}
 
-        df["sma"] = df["close"].rolling(window=window).mean()
-        df["std"] = df["close"].rolling(window=window).std()
-        df["upper"] = df["sma"] + (df["std"] * num_std)
-        df["lower"] = df["sma"] - (df["std"] * num_std)
-
-        rows = []
-        for d, sma, up, lo in zip(df["date"], df["sma"], df["upper"], df["lower"]):
-            rows.append({
-                "date": d.strftime("%Y-%m-%d"),
-                "sma": (None if pd.isna(sma) else float(sma)),
-                "upper": (None if pd.isna(up) else float(up)),
-                "lower": (None if pd.isna(lo) else float(lo)),
-            })
-
-        last = rows[-1] if rows else {}
-        return {"bands": rows, "last": last}
+        # Only the rows that can influence the returned points are scanned
+        part = tail_for(df, last_n, window)
+        spec = IndicatorSpec("bb", (window, num_std))
+        computed = compute_indicators(part, [spec]).series
+        series = {
+            "sma": computed[f"{spec.key}_mid"],
+            "upper": computed[f"{spec.key}_upper"],
+            "lower": computed[f"{spec.key}_lower"],
+        }
+        last_row = rows(part["date"], series, last_n=1)
+        last = last_row[-1] if last_row else {}
+
+        state = indicator_state_for(dataset)
+        if state is not None and len(df) >= window:
+            bands = state.bands(window, num_std)
+            if bands is not None:
+                last = {"date": state.last_date, **bands}
+
+        if output_format == "rows":
+            return {"bands": rows(part["date"], series, last_n, max_points), "last": last}
+        return {"bands": columnar(part["date"], series, last_n, max_points), "last": last}
     except Exception as e:
         return {"error": f"bollinger_bands failed: {str(e)}"}
@@ -1,11 +1,15 @@
 from typing import Literal, Dict, Any
-import io
 
-import pandas as pd
-from langchain.tools import tool
+from langchain_core.tools import tool
+
+from apps.agents.tools.stored_state import covers_full_history, indicator_state_for
+from apps.analytics import column_stats
+from apps.services.dataset_registry import resolve_dataset
+from apps.services.tracing import traced
 
 
 @tool
+@traced("tool")
 def calculate_stats(
     csv_data: str,
     metric: Literal["open", "high", "low", "close", "volume"] = "close",
@@ -14,8 +18,8 @@ def calculate_stats(
     Calculate basic descriptive statistics for a given metric in stock price CSV data.
 
     Args:
-        csv_data: CSV string output from fetch_stock_prices. Must include columns:
-                  date, open, high, low, close, volume.
+        csv_data: Dataset handle from fetch_stock_prices, or a CSV string.
+                  Must include columns: date, open, high, low, close, volume.
         metric:   Which column to analyze. One of: 'open', 'high', 'low', 'close', 'volume'.
 
     Returns:
@@ -35,7 +39,8 @@ def calculate_stats(
         If an error occurs, the returned dict will contain an "error" key with a message.
     """
     try:
-        df = pd.read_csv(io.StringIO(csv_data), parse_dates=["date"])
+        dataset = resolve_dataset(csv_data)
+        df = dataset.frame
 
         if metric not in df.columns:
             return {
@@ -43,22 +48,15 @@ def calculate_stats(
                          f"Available columns: {list(df.columns)}"
             }
 
-        series = df[metric]
-
-        if series.empty:
+        if df[metric].empty:
             return {"error": "No data available to compute statistics."}
 
-        stats = {
-            "metric": metric,
-            "count": int(series.count()),
-            "mean": float(series.mean()),
-            "std": float(series.std()) if series.count() > 1 else 0.0,
-            "min": float(series.min()),
-            "max": float(series.max()),
-            "start_date": df["date"].min().strftime("%Y-%m-%d"),
-            "end_date": df["date"].max().strftime("%Y-%m-%d"),
-        }
-        return stats
+        # Whole stored history: answer from the running statistics, no scan
+        state = indicator_state_for(dataset)
+        if state is not None and metric in state.stats and covers_full_history(dataset, state):
+            return state.column_stats(metric)
+
+        return column_stats(df, metric)
 
     except Exception as e:
         return {"error": f"Failed to calculate statistics: {str(e)}"}
@@ -0,0 +1,68 @@
+from typing import Dict, Any, Literal, Optional
+
+from langchain_core.tools import tool
+
+from apps.agents.tools.serialize import columnar, rows
+from apps.analytics import compute_indicators as run_indicators, parse_specs
+from apps.services.dataset_registry import resolve_dataset
+from apps.services.sessions import current_session
+from apps.services.tracing import traced
+
+
+@tool
+@traced("tool")
+def compute_indicators(
+    csv_data: str,
+    indicators: str = "sma:5,sma:20,sma:50,bb:20:2,rsi:14,macd:12:26:9,stats:close",
+    output_format: Literal["columnar", "rows"] = "columnar",
+    last_n: Optional[int] = 30,
+    max_points: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compute several technical indicators in one call. Prefer this over calling
+    moving_averages, bollinger_bands and calculate_stats separately.
+
+    Args:
+        csv_data: dataset handle from fetch_stock_prices, or a CSV string
+        indicators: comma-separated specs, each 'kind:param:param':
+                    sma:<window>, ema:<span>, bb:<window>:<num_std>, rsi:<period>,
+                    macd:<fast>:<slow>:<signal>, stats:<column>
+        output_format: "columnar" (default) or "rows"
+        last_n: only return the last N points of each series (default 30;
+                pass null for the full history)
+        max_points: evenly thin the returned series to at most this many points
+
+    Returns:
+        {
+          "series": {"dates": [...], "sma_20": [...], "bb_20_2_upper": [...], ...},
+          "last": {"sma_20": 123.4, "rsi_14": 56.7, "macd_12_26_9_hist": 0.8, ...},
+          "stats": {"stats_close": {"mean": .., "std": .., "min": .., "max": .., ...}}
+        }
+
+    On error returns {"error": "message"}.
+    """
+    try:
+        specs = parse_specs(indicators)
+        dataset = resolve_dataset(csv_data)
+        df = dataset.frame
+        session = current_session()
+        if session is not None and dataset.handle:
+            # Follow-up turns asking for the same indicators reuse the result.
+            key = ("indicators", dataset.handle, tuple(specs))
+            computed = session.memo(key, lambda: run_indicators(df, specs))
+        else:
+            computed = run_indicators(df, specs)
+
+        if output_format == "rows":
+            series: Any = rows(df["date"], computed.series, last_n, max_points)
+        else:
+            series = columnar(df["date"], computed.series, last_n, max_points)
+
+        return {
+            "series": series,
+            "last": computed.last_values(),
+            "stats": computed.stats,
+        }
+
+    except Exception as e:
+        return {"error": f"compute_indicators failed: {str(e)}"}
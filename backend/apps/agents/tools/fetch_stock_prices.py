@@ -2,9 +2,15 @@ from typing import Optional, Literal
 from datetime import datetime
 import pandas as pd
 
-from langchain.tools import tool # type: ignore
+from langchain_core.tools import tool # type: ignore
 
-from apps.services.alpha_vantage_client import AlphaVantageClient
+from apps.services.dataset_registry import current_registry
+from apps.services.market_calendar import last_session_date
+from apps.services.price_providers import get_provider
+from apps.services.sessions import current_session
+from apps.services.tracing import traced
+
+PREVIEW_ROWS = 5
 
 
 def _parse_date(date_str: str):
@@ -12,47 +18,103 @@ def _parse_date(date_str: str):
     return pd.to_datetime(date_str)
 
 
+def _describe_dataset(handle: str, symbol: str, frame: pd.DataFrame, interval: str = "daily") -> str:
+    """Short, LLM-friendly summary of a registered dataset."""
+    date_format = "%Y-%m-%d %H:%M" if interval.endswith("min") else "%Y-%m-%d"
+    first = frame["date"].iloc[0].strftime(date_format)
+    last = frame["date"].iloc[-1].strftime(date_format)
+    preview = frame.tail(PREVIEW_ROWS).to_csv(index=False, date_format=date_format)
+    label = interval.replace("_", " ") if not interval.endswith("min") else f"{interval} intraday"
+    return (
+        f"DATASET: {handle}\n"
+        f"{symbol}: {len(frame)} {label} rows from {first} to {last}, "
+        f"last close {frame['close'].iloc[-1]:.2f}.\n"
+        f"Pass '{handle}' as csv_data to the analysis tools.\n"
+        f"Preview (last {min(PREVIEW_ROWS, len(frame))} rows):\n{preview}"
+    )
+
+
+def _with_date_column(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    `df` with its index as a leading "date" column. Built from the column
+    arrays without copying them (reset_index would copy every column), so
+    bars read from the price store stay read-only views of its files.
+    """
+    columns = {"date": df.index.values, **{name: df[name].to_numpy() for name in df.columns}}
+    return pd.DataFrame(columns, copy=False)
+
+
 @tool
+@traced("tool")
 def fetch_stock_prices(
     symbol: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     output_size: Literal["compact", "full"] = "compact",
+    return_csv: bool = False,
+    interval: Literal[
+        "daily", "daily_adjusted", "weekly", "1min", "5min", "15min", "30min", "60min"
+    ] = "daily",
 ) -> str:
     """
-    Fetch daily OHLCV stock price data as a CSV string for a given symbol.
+    Fetch OHLCV stock price data (daily bars by default) for a given symbol.
 
     Dates should be in 'YYYY-MM-DD' format.
     - symbol: Stock ticker symbol, e.g. 'AAPL', 'TSLA', 'INFY'.
     - start_date: Filter data from this date (inclusive). Optional.
     - end_date: Filter data up to this date (inclusive). Optional.
     - output_size: 'compact' for ~100 recent days, 'full' for full history.
+    - return_csv: Return the full CSV instead of a dataset handle. Only use
+      this when the raw numbers are really needed.
+    - interval: 'daily' (default), 'daily_adjusted' (adds adjusted_close,
+      dividend, split_coefficient), 'weekly', or intraday bars '1min',
+      '5min', '15min', '30min', '60min'.
 
     Returns:
-        CSV string with columns: date, open, high, low, close, volume.
+        A dataset handle line such as 'DATASET: ds_1a2b3c4d5e6f' followed by a
+        short summary and a preview of the last rows. Pass the handle as
+        `csv_data` to the analysis tools (moving_averages, bollinger_bands,
+        calculate_stats, generate_plot). With return_csv=True, a CSV string
+        with columns: date, open, high, low, close, volume.
 
     If an error occurs (invalid symbol, API limit, etc.), returns a
     human-readable error message starting with 'ERROR:' so the LLM can
     decide what to do.
     """
     try:
-        client = AlphaVantageClient()
-        df = client.fetch_daily(symbol=symbol, output_size=output_size)
+        # In a conversation, the same fetch returns the dataset an earlier turn
+        # registered (until the next daily bar), without fetching or parsing again.
+        session = current_session() if not return_csv else None
+        fetch_key = (symbol.upper(), interval, output_size, start_date, end_date, last_session_date())
+        if session is not None:
+            earlier = session.fetched(fetch_key)
+            if earlier is not None:
+                return _describe_dataset(earlier.handle, earlier.symbol, earlier.frame, interval)
 
-        # Apply date filters if provided
-        if start_date:
-            start = _parse_date(start_date)
-            df = df[df.index >= start]
-
-        if end_date:
-            end = _parse_date(end_date)
-            df = df[df.index <= end]
+        # Only the requested range is read (a binary search on stored dates);
+        # the end day is included in full, also for intraday bars.
+        start = _parse_date(start_date) if start_date else None
+        end = _parse_date(end_date) + pd.Timedelta(days=1) if end_date else None
+        df = get_provider().fetch(symbol, series=interval, output_size=output_size, start=start, end=end)
 
         if df.empty:
             return f"ERROR: No data available for {symbol} in the given date range."
 
-        csv_str = df.to_csv(index=True, index_label="date")
-        return csv_str
+        if return_csv:
+            return df.to_csv(index=True, index_label="date")
+
+        frame = _with_date_column(df)
+        dataset = current_registry().register(
+            frame,
+            symbol=symbol.upper(),
+            output_size=output_size,
+            start_date=start_date,
+            end_date=end_date,
+            interval=interval,
+        )
+        if session is not None:
+            session.remember_fetch(fetch_key, dataset)
+        return _describe_dataset(dataset.handle, symbol.upper(), frame, interval)
 
     except ValueError as ve:
         return f"ERROR: {str(ve)}"
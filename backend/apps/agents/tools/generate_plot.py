@@ -1,20 +1,19 @@
 from typing import Literal
-import io
-import uuid
-from pathlib import Path
 
-import pandas as pd
-import matplotlib.pyplot as plt
-from langchain.tools import tool
+from langchain_core.tools import tool
 
+from apps.services.chart_cache import chart_key, get_chart_cache
+from apps.services.chart_renderer import CHART_STYLE, render
+from apps.services.dataset_registry import resolve_frame
+from apps.services.single_flight import SingleFlight
+from apps.services.tracing import traced
 
-# Base folder: apps/static/charts (relative to this file)
-BASE_DIR = Path(__file__).resolve().parents[2]  # .../backend/apps
-CHARTS_DIR = BASE_DIR / "static" / "charts"
-CHARTS_DIR.mkdir(parents=True, exist_ok=True)
+# Concurrent requests for the same chart wait for one render.
+_RENDERS = SingleFlight()
 
 
 @tool
+@traced("tool")
 def generate_plot(
     csv_data: str,
     x: str = "date",
@@ -25,7 +24,8 @@ def generate_plot(
     Generate a chart from stock price CSV data and return a URL to the saved image.
 
     Args:
-        csv_data: CSV string output from fetch_stock_prices. Should include a 'date' column.
+        csv_data: Dataset handle from fetch_stock_prices, or a CSV string.
+                  Should include a 'date' column.
         x:        Column name for the x-axis (typically 'date').
         y:        Column name for the y-axis (e.g. 'close', 'open', 'volume').
         chart_type: For now only 'line' is supported, but this can be extended later.
@@ -36,7 +36,7 @@ def generate_plot(
     If an error occurs, the function returns a string starting with "ERROR:" describing the problem.
     """
     try:
-        df = pd.read_csv(io.StringIO(csv_data), parse_dates=[x])
+        df = resolve_frame(csv_data)
 
         if x not in df.columns:
             return (f"ERROR: x-axis column '{x}' not found in data. "
@@ -51,28 +51,17 @@ def generate_plot(
         # Sort by x for nicer plotting
         df = df.sort_values(by=x)
 
-        # Create the plot
-        fig, ax = plt.subplots(figsize=(8, 4))
-        if chart_type == "line":
-            ax.plot(df[x], df[y])
-        else:
-            ax.plot(df[x], df[y])
+        cache = get_chart_cache()
+        key = chart_key(df, x, y, chart_type, CHART_STYLE)
+        path = cache.get(key)
+        if path is None:
+            path = cache.path_for(key)
+            _RENDERS.do(key, render, path, df[x].to_numpy(), df[y].to_numpy(), x, y, chart_type, CHART_STYLE)
+            cache.evict()
 
-        ax.set_xlabel(x)
-        ax.set_ylabel(y)
-        ax.set_title(f"{y} over time")
-        fig.autofmt_xdate()
-        plt.tight_layout()
-
-        # Save to a unique file
-        filename = f"chart_{uuid.uuid4().hex}.png"
-        filepath = CHARTS_DIR / filename
-        fig.savefig(filepath)
-        plt.close(fig)
-
-        # URL that FastAPI will serve (we'll mount /static)
-        url_path = f"/static/charts/{filename}"
-        return url_path
+        # URL that FastAPI serves from the /static mount
+        return cache.url_for(path)
 
     except Exception as e:
         return f"ERROR: Failed to generate plot: {str(e)}"
+
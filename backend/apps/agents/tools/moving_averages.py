@@ -1,21 +1,43 @@
 # backend/apps/agents/tools/moving_averages.py
-from typing import Dict, Any
-import io
+from typing import Dict, Any, Literal, Optional
 
-import pandas as pd
-from langchain.tools import tool
+from langchain_core.tools import tool
+
+from apps.agents.tools.serialize import columnar, rows
+from apps.agents.tools.stored_state import indicator_state_for, tail_for
+from apps.analytics import IndicatorSpec, compute_indicators
+from apps.services.dataset_registry import resolve_dataset
+from apps.services.tracing import traced
 
 
 @tool
-def moving_averages(csv_data: str, windows: str = "5,20,50") -> Dict[str, Any]:
+@traced("tool")
+def moving_averages(
+    csv_data: str,
+    windows: str = "5,20,50",
+    output_format: Literal["columnar", "rows"] = "columnar",
+    last_n: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Compute simple moving averages for given comma-separated windows.
 
     Args:
-        csv_data: CSV string with columns including 'date' and 'close'
+        csv_data: dataset handle from fetch_stock_prices (e.g. 'ds_1a2b3c4d5e6f'),
+                  or a CSV string with columns including 'date' and 'close'
         windows: comma-separated ints, e.g. "5,20,50"
+        output_format: "columnar" (default, compact) or "rows" (legacy format)
+        last_n: only return the last N points of each series (0 = only last_values)
+        max_points: evenly thin the returned series to at most this many points
+
+    Returns (columnar):
+        {
+          "dates": ["2025-01-01", ...],
+          "ma": {"5": [123.4, ...], "20": [null, ...]},
+          "last_values": {"5": 123.4, "20": 120.5}
+        }
 
-    Returns:
+    Returns (rows):
         {
           "ma": {
             "5": [{"date":"2025-01-01","value":123.4}, ...],
@@ -24,10 +46,14 @@ def moving_averages(csv_data: str, windows: str = "5,20,50") -> Dict[str, Any]:
           "last_values": {"5": 123.4, "20": 120.5}
         }
 
+    last_values are always computed over the full series. For datasets from
+    fetch_stock_prices they come from the price store's incremental state.
+
     On error returns {"error": "message"}.
     """
     try:
-        df = pd.read_csv(io.StringIO(csv_data), parse_dates=["date"]).sort_values("date")
+        dataset = resolve_dataset(csv_data)
+        df = dataset.frame
         if "close" not in df.columns:
             return {"error": "close column not found in CSV data"}
 
@@ -37,32 +63,40 @@ def moving_averages(csv_data: str, windows: str = "5,20,50") -> Dict[str, Any]:
             token = token.strip()
             if token:
                 try:
-                    window_list.append(int(token))
+                    window = int(token)
                 except ValueError:
                     # ignore invalid tokens
                     continue
+                if window > 0:
+                    window_list.append(window)
 
         if not window_list:
             return {"error": "no valid windows provided"}
 
-        result: Dict[str, Any] = {"ma": {}, "last_values": {}}
-
-        for w in window_list:
-            col_name = f"sma_{w}"
-            df[col_name] = df["close"].rolling(window=w).mean()
-
-            pairs = []
-            for d, v in zip(df["date"], df[col_name]):
-                pairs.append({"date": d.strftime("%Y-%m-%d"), "value": (None if pd.isna(v) else float(v))})
+        # Only the rows that can influence the returned points are scanned
+        part = tail_for(df, last_n, max(window_list))
+        computed = compute_indicators(part, [IndicatorSpec("sma", (w,)) for w in window_list])
+        last = computed.last_values()
+        smas = {str(w): computed.series[f"sma_{w}"] for w in window_list}
+        # last non-null value for each SMA window
+        last_values: Dict[str, Any] = {str(w): last[f"sma_{w}"] for w in window_list}
 
-            result["ma"][str(w)] = pairs
+        state = indicator_state_for(dataset)
+        if state is not None:
+            for w in window_list:
+                if w in state.windows and len(df) >= w:
+                    last_values[str(w)] = state.sma(w)
 
-            # last non-null value for this SMA window
-            non_null = df[col_name].dropna()
-            last_val = float(non_null.iat[-1]) if not non_null.empty else None
-            result["last_values"][str(w)] = last_val
+        if output_format == "rows":
+            ma = {
+                key: rows(part["date"], {"value": values}, last_n, max_points)
+                for key, values in smas.items()
+            }
+            return {"ma": ma, "last_values": last_values}
 
-        return result
+        cols = columnar(part["date"], smas, last_n, max_points)
+        dates = cols.pop("dates")
+        return {"dates": dates, "ma": cols, "last_values": last_values}
 
     except Exception as e:
         return {"error": f"moving_averages failed: {str(e)}"}
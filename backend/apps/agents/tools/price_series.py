@@ -0,0 +1,114 @@
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlencode
+
+import pandas as pd
+from langchain_core.tools import tool
+
+from apps.agents.tools.serialize import columnar
+from apps.analytics import IndicatorSpec, compute_indicators as run_indicators, parse_specs
+from apps.services.dataset_registry import resolve_dataset
+from apps.services.price_store import date_slice
+from apps.services.tracing import traced
+
+DEFAULT_POINTS = 1000
+MAX_POINTS = 5000
+DEFAULT_SERIES_INDICATORS = "sma:20,sma:50"
+
+
+def warmup_rows(specs: Iterable[IndicatorSpec]) -> int:
+    """Bars needed before the first indicator value: the longest window or span."""
+    return max((int(max(s.params)) for s in specs if s.params), default=0)
+
+
+def series_payload(
+    frame: pd.DataFrame,
+    specs: Iterable[IndicatorSpec],
+    points: int = DEFAULT_POINTS,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> Dict[str, Any]:
+    """
+    Close price and indicator series of `frame` between `start` and `end`
+    (exclusive) as one columnar block, downsampled by LTTB on the close to
+    at most `points` points. Indicators are computed over the whole frame,
+    so rows before `start` serve as warm-up.
+    """
+    computed = run_indicators(frame, specs)
+    rows = date_slice(frame["date"].to_numpy(dtype="datetime64[ns]"), start, end)
+    dates = frame["date"].iloc[rows]
+    if dates.empty:
+        raise ValueError("No data available in the requested date range.")
+
+    series = {"close": frame["close"].to_numpy()[rows]}
+    series.update((name, values[rows]) for name, values in computed.series.items())
+    total = len(dates)
+    return {
+        "start_date": dates.iloc[0].strftime("%Y-%m-%d"),
+        "end_date": dates.iloc[-1].strftime("%Y-%m-%d"),
+        "total_points": total,
+        "points": min(total, points),
+        "downsample": "lttb" if total > points else None,
+        "series": columnar(dates, series, max_points=points, shape_by="close"),
+    }
+
+
+def series_url(symbol: str, **params: Any) -> str:
+    """Path of the /api/series endpoint for `symbol`; None-valued params are left out."""
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    return f"/api/series/{symbol}" + (f"?{query}" if query else "")
+
+
+@tool
+@traced("tool")
+def price_series(
+    csv_data: str,
+    indicators: str = DEFAULT_SERIES_INDICATORS,
+    points: int = DEFAULT_POINTS,
+) -> Dict[str, Any]:
+    """
+    Prepare an interactive price chart (close plus indicator lines) that the
+    frontend draws in the browser. Prefer this over generate_plot.
+
+    Args:
+        csv_data: dataset handle from fetch_stock_prices
+        indicators: comma-separated specs to overlay, e.g. "sma:20,sma:50,bb:20:2"
+        points: most points to draw (long histories are downsampled with LTTB)
+
+    Returns:
+        {"series_url": "/api/series/AAPL?...", "start_date": ..., "end_date": ...,
+         "total_points": .., "points": ..}
+        Mention the series_url in the answer; the UI turns it into a chart.
+
+    On error returns {"error": "message"}.
+    """
+    try:
+        dataset = resolve_dataset(csv_data)
+        if not dataset.symbol:
+            return {"error": "price_series needs a dataset handle from fetch_stock_prices"}
+        specs = parse_specs(indicators)
+        points = max(3, min(int(points), MAX_POINTS))
+
+        frame = dataset.frame
+        if frame.empty:
+            return {"error": "No data available to chart."}
+        first = frame["date"].iloc[0].strftime("%Y-%m-%d")
+        last = frame["date"].iloc[-1].strftime("%Y-%m-%d")
+        interval = dataset.meta.get("interval", "daily")
+        url = series_url(
+            dataset.symbol,
+            start=first,
+            end=last,
+            interval=None if interval == "daily" else interval,
+            indicators=",".join(s.key.replace("_", ":") for s in specs if s.kind != "stats"),
+            points=points,
+        )
+        return {
+            "series_url": url,
+            "start_date": first,
+            "end_date": last,
+            "total_points": len(frame),
+            "points": min(len(frame), points),
+        }
+
+    except Exception as e:
+        return {"error": f"price_series failed: {str(e)}"}
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.analytics import lttb
+
+
+def format_dates(dates: pd.Series) -> np.ndarray:
+    """
+    Vectorized YYYY-MM-DD strings for a datetime column, or
+    YYYY-MM-DDTHH:MM when it holds intraday timestamps.
+    """
+    values = dates.to_numpy(dtype="datetime64[ns]")
+    intraday = bool((values != values.astype("datetime64[D]")).any())
+    return np.datetime_as_string(values, unit="m" if intraday else "D")
+
+
+def float_list(values: Any) -> List[Optional[float]]:
+    """Floats as a JSON-ready list, NaN mapped to None in one pass."""
+    arr = np.asarray(values, dtype=np.float64)
+    out = arr.astype(object)
+    out[np.isnan(arr)] = None
+    return out.tolist()
+
+
+def select_points(
+    n: int,
+    last_n: Optional[int] = None,
+    max_points: Optional[int] = None,
+    x: Optional[np.ndarray] = None,
+    y: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Row positions to emit: optionally only the last `last_n` rows, then
+    thinned to at most `max_points` (always keeping the last row). Given
+    the line (x, y), the points are picked by LTTB so its shape survives;
+    otherwise they are evenly spaced.
+    """
+    start = max(0, n - last_n) if last_n is not None else 0
+    if max_points and max_points > 0 and n - start > max_points:
+        if x is not None and y is not None:
+            return start + lttb(x[start:], y[start:], max_points)
+        return np.unique(np.linspace(start, n - 1, max_points).round().astype(np.int64))
+    return np.arange(start, n)
+
+
+def columnar(
+    dates: pd.Series,
+    series: Mapping[str, Any],
+    last_n: Optional[int] = None,
+    max_points: Optional[int] = None,
+    shape_by: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    {"dates": [...], "<name>": [...], ...} with one shared date axis.
+    `shape_by` names the series whose shape decides which points are kept
+    when thinning to `max_points` (see select_points).
+    """
+    if shape_by is not None:
+        x = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        idx = select_points(len(dates), last_n, max_points, x, np.asarray(series[shape_by], dtype=np.float64))
+    else:
+        idx = select_points(len(dates), last_n, max_points)
+    out: Dict[str, Any] = {"dates": format_dates(dates)[idx].tolist()}
+    for name, values in series.items():
+        out[name] = float_list(np.asarray(values, dtype=np.float64)[idx])
+    return out
+
+
+def rows(
+    dates: pd.Series,
+    series: Mapping[str, Any],
+    last_n: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Legacy row-oriented form: [{"date": ..., "<name>": ...}, ...]."""
+    cols = columnar(dates, series, last_n, max_points)
+    names = list(series)
+    return [
+        dict(zip(["date", *names], values))
+        for values in zip(cols["dates"], *(cols[name] for name in names))
+    ]
@@ -0,0 +1,48 @@
+from typing import Optional
+
+import pandas as pd
+
+from apps.analytics.incremental import IndicatorState
+from apps.services.dataset_registry import Dataset
+from apps.services.price_store import get_price_store
+
+
+def indicator_state_for(dataset: Dataset) -> Optional[IndicatorState]:
+    """
+    The price store's incremental indicator state for `dataset`, if the
+    dataset is a slice of the stored series ending at its last bar (so the
+    latest SMA/band values are identical). None otherwise.
+    """
+    if not dataset.symbol or dataset.frame.empty:
+        return None
+    if dataset.meta.get("interval", "daily") != "daily":
+        return None
+    store = get_price_store()
+    if store is None:
+        return None
+    state = store.indicator_state(dataset.symbol)
+    if state is None or state.last_date is None:
+        return None
+
+    frame = dataset.frame
+    if frame["date"].iloc[-1].strftime("%Y-%m-%d") != state.last_date:
+        return None
+    if float(frame["close"].iloc[-1]) != state.last_close:
+        return None
+    return state
+
+
+def covers_full_history(dataset: Dataset, state: IndicatorState) -> bool:
+    """True if `dataset` is the whole stored series, not a date-filtered slice."""
+    frame = dataset.frame
+    return len(frame) == state.rows and frame["date"].iloc[0] == pd.Timestamp(state.first_date)
+
+
+def tail_for(frame: pd.DataFrame, last_n: Optional[int], lookback: int) -> pd.DataFrame:
+    """
+    Rows needed to produce the last `last_n` points of an indicator with the
+    given lookback window; the whole frame when last_n is None.
+    """
+    if last_n is None:
+        return frame
+    return frame.iloc[-(last_n + lookback):] if last_n + lookback < len(frame) else frame
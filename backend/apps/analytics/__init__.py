@@ -0,0 +1,27 @@
+from .backtest import backtest_grid, buy_and_hold, parse_grid, rank_backtests
+from .downsample import lttb
+from .indicators import (
+    IndicatorResult,
+    IndicatorSpec,
+    column_stats,
+    compute_indicators,
+    parse_specs,
+)
+from .panel import build_panel, compact_table, cross_section, return_correlation
+
+__all__ = [
+    "IndicatorResult",
+    "IndicatorSpec",
+    "backtest_grid",
+    "build_panel",
+    "buy_and_hold",
+    "column_stats",
+    "compact_table",
+    "compute_indicators",
+    "cross_section",
+    "lttb",
+    "parse_grid",
+    "parse_specs",
+    "rank_backtests",
+    "return_correlation",
+]
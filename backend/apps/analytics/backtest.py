@@ -0,0 +1,196 @@
+import math
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import _ColumnMoments, _PandasMoments
+from .panel import TRADING_DAYS_PER_YEAR
+
+STRATEGIES = ("sma_crossover", "bollinger_reversion")
+METRICS = ("total_return", "cagr", "volatility", "sharpe", "max_drawdown", "trades", "exposure")
+# Bound the (combinations x bars) matrices held at once.
+_CHUNK_CELLS = 1_000_000
+
+
+def parse_grid(text: str, cast=int) -> List:
+    """
+    Parameter values from "5,10,20" or ranges "5-50:5" (start-end:step,
+    end inclusive), mixed freely: "5,10-30:10" -> [5, 10, 20, 30].
+    """
+    values = []
+    for token in text.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if "-" in token.lstrip("-"):
+            bounds, _, step = token.partition(":")
+            lo, hi = (float(b) for b in bounds.split("-", 1))
+            step_value = float(step) if step else 1.0
+            if step_value <= 0 or hi < lo:
+                raise ValueError(f"Bad range '{token}': expected start-end:step with end >= start")
+            count = int(math.floor((hi - lo) / step_value + 1e-9)) + 1
+            values.extend(cast(lo + i * step_value) for i in range(count))
+        else:
+            values.append(cast(float(token)))
+    if not values:
+        raise ValueError(f"No parameter values in '{text}'")
+    return sorted(set(values))
+
+
+def _moments(close: np.ndarray):
+    return _PandasMoments(close) if np.isnan(close).any() else _ColumnMoments(close)
+
+
+def _hold(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """
+    Long/flat positions (rows x bars) from entry and exit signals: in from
+    an entry until the next exit. The latest event per bar is carried
+    forward with a running maximum of its position, so there is no loop.
+    """
+    n = entries.shape[1]
+    events = entries | exits
+    last_event = np.where(events, np.arange(n), -1)
+    np.maximum.accumulate(last_event, axis=1, out=last_event)
+    held = np.take_along_axis(entries, np.clip(last_event, 0, None), axis=1)
+    return held & (last_event >= 0)
+
+
+def _bar_returns(close: np.ndarray) -> np.ndarray:
+    """Close-to-close returns, 0 for the first bar and across gaps."""
+    returns = np.zeros(len(close))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = close[1:] / close[:-1] - 1
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+
+def _metrics(positions: np.ndarray, returns: np.ndarray, cost: float) -> Dict[str, np.ndarray]:
+    """
+    Performance of each row of `positions` (signal at a close, held over
+    the next bar) against the bar returns `returns`, all rows at once.
+    """
+    held = np.zeros(positions.shape, dtype=np.float64)
+    held[:, 1:] = positions[:, :-1]
+    changes = np.abs(np.diff(held, axis=1, prepend=0.0))
+    strat = held * returns - changes * cost
+
+    n = strat.shape[1]
+    # Log equity: growth, CAGR and drawdown all come from one cumulative sum.
+    log_equity = np.cumsum(np.log1p(strat), axis=1)
+    log_growth = log_equity[:, -1]
+    total = np.expm1(log_growth)
+    years = n / TRADING_DAYS_PER_YEAR
+    cagr = np.expm1(log_growth / years) if years > 0 else np.full(len(strat), np.nan)
+
+    mean, std = strat.mean(axis=1), strat.std(axis=1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * math.sqrt(TRADING_DAYS_PER_YEAR), np.nan)
+
+    # Peak includes the starting capital (log equity 0).
+    peak = np.maximum.accumulate(np.maximum(log_equity, 0.0), axis=1)
+    drawdown = np.expm1((log_equity - peak).min(axis=1))
+
+    return {
+        "total_return": total,
+        "cagr": cagr,
+        "volatility": std * math.sqrt(TRADING_DAYS_PER_YEAR),
+        "sharpe": sharpe,
+        "max_drawdown": drawdown,
+        "trades": ((changes > 0) & (held > 0)).sum(axis=1),
+        "exposure": held.mean(axis=1),
+    }
+
+
+def _evaluate(
+    combos: List[Tuple],
+    signals,
+    returns: np.ndarray,
+    cost: float,
+) -> Dict[str, np.ndarray]:
+    """Run `signals(chunk) -> positions` over the combinations in bounded chunks."""
+    chunk = max(1, _CHUNK_CELLS // max(1, returns.size))
+    parts = [
+        _metrics(signals(combos[i:i + chunk]), returns, cost)
+        for i in range(0, len(combos), chunk)
+    ]
+    return {name: np.concatenate([p[name] for p in parts]) for name in METRICS}
+
+
+def backtest_grid(
+    close: np.ndarray,
+    strategy: str = "sma_crossover",
+    fast: Sequence[int] = (5, 10, 20),
+    slow: Sequence[int] = (50, 100, 200),
+    windows: Sequence[int] = (20,),
+    num_std: Sequence[float] = (2.0,),
+    start: int = 0,
+    cost_bps: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Evaluate a long/flat strategy for every parameter combination at once.
+
+    sma_crossover: long while SMA(fast) > SMA(slow), for all fast < slow.
+    bollinger_reversion: buy a close below the lower band (window, num_std),
+    sell once the close is back above the middle band.
+
+    Each SMA and rolling std is computed once (shared prefix sums) and the
+    positions of all combinations form one matrix, so there is no per-bar
+    Python loop. Bars before `start` only warm up the indicators; the
+    metrics cover `start` onwards. `cost_bps` is charged on every entry and
+    exit. Returns one row per combination (index like "fast=20,slow=50")
+    with the METRICS columns.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Supported: {', '.join(STRATEGIES)}")
+    if not 0 <= start < len(close) - 1:
+        raise ValueError("Not enough bars to backtest after the warm-up period")
+
+    moments = _moments(close)
+    span = close[start:]
+    returns = _bar_returns(span)
+    cost = cost_bps / 10_000
+
+    if strategy == "sma_crossover":
+        combos = [(f, s) for f, s in product(fast, slow) if f < s]
+        if not combos:
+            raise ValueError("No (fast, slow) pair with fast < slow in the grid")
+        means = {w: moments.mean(w)[start:] for w in {*fast, *slow}}
+
+        def signals(chunk):
+            with np.errstate(invalid="ignore"):
+                return np.stack([means[f] > means[s] for f, s in chunk])
+        labels = [f"fast={f},slow={s}" for f, s in combos]
+    else:
+        combos = list(product(windows, num_std))
+        bands = {w: (moments.mean(w)[start:], moments.std(w)[start:]) for w in windows}
+
+        def signals(chunk):
+            with np.errstate(invalid="ignore"):
+                entries = np.stack([span < bands[w][0] - k * bands[w][1] for w, k in chunk])
+                exits = np.stack([span > bands[w][0] for w, _ in chunk])
+            return _hold(entries, exits)
+        labels = [f"window={w},num_std={k:g}" for w, k in combos]
+
+    table = pd.DataFrame(_evaluate(combos, signals, returns, cost), index=labels)
+    table["trades"] = table["trades"].astype(np.int64)
+    return table
+
+
+def buy_and_hold(close: np.ndarray, start: int = 0) -> Dict[str, Any]:
+    """The METRICS of simply holding over the same bars, for comparison."""
+    returns = _bar_returns(np.asarray(close, dtype=np.float64)[start:])
+    positions = np.ones((1, len(returns)), dtype=bool)
+    return {name: values[0].item() for name, values in _metrics(positions, returns, 0.0).items()}
+
+
+def rank_backtests(table: pd.DataFrame, rank_by: str = "sharpe", top_n: Optional[int] = None) -> pd.DataFrame:
+    """Sort by `rank_by` (highest first; volatility lowest first) with a 1-based `rank` column."""
+    if rank_by not in table.columns:
+        raise ValueError(f"Cannot rank by '{rank_by}'. Available: {list(table.columns)}")
+    ascending = rank_by == "volatility"
+    table = table.assign(rank=table[rank_by].rank(ascending=ascending, method="min"))
+    table = table.sort_values("rank", na_position="last")
+    return table.head(top_n) if top_n else table
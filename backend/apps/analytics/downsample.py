@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Positions of the `threshold` points that Largest-Triangle-Three-Buckets
+    keeps from the line (x, y): the first and last point, plus one point per
+    bucket chosen to form the largest triangle with the previous pick and
+    the next bucket's average. Peaks, troughs and gaps survive, unlike
+    evenly spaced thinning. Returns every position when nothing needs
+    dropping. O(n); x must be ascending.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if np.isnan(y).any():
+        y = pd.Series(y).ffill().bfill().to_numpy(dtype=np.float64)
+
+    # threshold - 2 buckets over the interior points; the last edge is the
+    # final point, which doubles as the "next bucket" of the last bucket.
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
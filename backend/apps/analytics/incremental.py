@@ -0,0 +1,218 @@
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_WINDOWS: Tuple[int, ...] = tuple(
+    int(w) for w in os.getenv("INDICATOR_STATE_WINDOWS", "5,20,50,100,200").split(",") if w.strip()
+)
+STATE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class RollingWindow:
+    """
+    Fixed-size window over a stream: running mean and sum of squared
+    deviations (sliding Welford update) plus a ring buffer of the values.
+
+    Each push is O(1). Every `window` pushes the moments are recomputed
+    exactly from the buffer, so rounding error cannot build up over years
+    of appended bars.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer: List[float] = []
+        self.pos = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_exact = 0
+
+    def push(self, x: float) -> None:
+        if len(self.buffer) < self.window:
+            self.buffer.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.buffer)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.buffer[self.pos]
+            self.buffer[self.pos] = x
+            self.pos = (self.pos + 1) % self.window
+            new_mean = self.mean + (x - old) / self.window
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+
+        self._since_exact += 1
+        if self._since_exact >= self.window:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        values = np.asarray(self.buffer, dtype=np.float64)
+        self.mean = float(values.mean())
+        self.m2 = float(((values - self.mean) ** 2).sum())
+        self._since_exact = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.buffer) == self.window
+
+    def sma(self) -> Optional[float]:
+        return self.mean if self.full else None
+
+    def std(self) -> Optional[float]:
+        """Sample (ddof=1) standard deviation of the window."""
+        if not self.full or self.window < 2:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Store the buffer oldest-first so it can be replayed on load.
+        ordered = self.buffer[self.pos:] + self.buffer[:self.pos]
+        return {"window": self.window, "values": ordered}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingWindow":
+        rw = cls(int(data["window"]))
+        rw.buffer = [float(v) for v in data["values"]]
+        rw.pos = 0
+        if rw.buffer:
+            rw._recompute()
+        return rw
+
+
+class RunningStats:
+    """Welford count/mean/M2 plus min/max over every value seen."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def push_many(self, values: np.ndarray) -> None:
+        """Merge a batch (Chan et al. parallel update): O(len(values))."""
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        n_b = values.size
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.count * n_b / n
+        self.count = n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def std(self) -> float:
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStats":
+        rs = cls()
+        rs.count, rs.mean, rs.m2 = int(data["count"]), float(data["mean"]), float(data["m2"])
+        rs.min, rs.max = float(data["min"]), float(data["max"])
+        return rs
+
+
+class IndicatorState:
+    """
+    Per-symbol indicator state at the last stored bar: rolling windows over
+    'close' (SMA and Bollinger std for each tracked window) and running
+    statistics for every OHLCV column. Appending k bars costs O(k).
+    """
+
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS):
+        self.windows: Dict[int, RollingWindow] = {w: RollingWindow(w) for w in sorted(set(windows))}
+        self.stats: Dict[str, RunningStats] = {c: RunningStats() for c in STATE_COLUMNS}
+        self.rows = 0
+        self.first_date: Optional[str] = None
+        self.last_date: Optional[str] = None
+        self.last_close: Optional[float] = None
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame, windows: Iterable[int] = DEFAULT_WINDOWS) -> "IndicatorState":
+        """Full scan of `frame` (DatetimeIndex, OHLCV columns, sorted)."""
+        state = cls(windows)
+        state.append(frame)
+        return state
+
+    def append(self, frame: pd.DataFrame) -> int:
+        """
+        Fold in bars dated after `last_date`; earlier rows are ignored.
+        Returns the number of bars applied.
+        """
+        if self.last_date is not None:
+            start = frame.index.searchsorted(pd.Timestamp(self.last_date), side="right")
+            frame = frame.iloc[start:]
+        if frame.empty:
+            return 0
+
+        for column, stats in self.stats.items():
+            stats.push_many(frame[column].to_numpy(dtype=np.float64))
+
+        closes = frame["close"].to_numpy(dtype=np.float64)
+        for rw in self.windows.values():
+            # Only the last `window` values can still be inside the window.
+            for x in closes[-rw.window:] if closes.size > rw.window else closes:
+                rw.push(float(x))
+
+        if self.first_date is None:
+            self.first_date = frame.index[0].strftime("%Y-%m-%d")
+        self.last_date = frame.index[-1].strftime("%Y-%m-%d")
+        self.last_close = float(closes[-1])
+        self.rows += len(frame)
+        return len(frame)
+
+    def sma(self, window: int) -> Optional[float]:
+        rw = self.windows.get(window)
+        return rw.sma() if rw else None
+
+    def bands(self, window: int, num_std: float) -> Optional[Dict[str, float]]:
+        rw = self.windows.get(window)
+        if rw is None or not rw.full:
+            return None
+        mid, std = rw.sma(), rw.std()
+        return {"sma": mid, "upper": mid + std * num_std, "lower": mid - std * num_std}
+
+    def column_stats(self, column: str) -> Dict[str, Any]:
+        s = self.stats[column]
+        return {
+            "metric": column,
+            "count": s.count,
+            "mean": s.mean,
+            "std": s.std(),
+            "min": s.min,
+            "max": s.max,
+            "start_date": self.first_date,
+            "end_date": self.last_date,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "first_date": self.first_date,
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "windows": [rw.to_dict() for rw in self.windows.values()],
+            "stats": {c: s.to_dict() for c, s in self.stats.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        state = cls(windows=())
+        state.windows = {int(w["window"]): RollingWindow.from_dict(w) for w in data["windows"]}
+        state.stats = {c: RunningStats.from_dict(s) for c, s in data["stats"].items()}
+        state.rows = int(data["rows"])
+        state.first_date = data["first_date"]
+        state.last_date = data["last_date"]
+        state.last_close = data["last_close"]
+        return state
@@ -0,0 +1,240 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Elements per block when rolling deviations are materialised (~8 MB of float64).
+_STD_BLOCK = 1 << 20
+
+
+# Indicator kinds and how many numeric parameters each takes (with defaults).
+SPEC_DEFAULTS: Dict[str, Tuple[float, ...]] = {
+    "sma": (20,),
+    "ema": (20,),
+    "bb": (20, 2.0),
+    "rsi": (14,),
+    "macd": (12, 26, 9),
+    "stats": (),
+}
+STATS_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One requested indicator, e.g. IndicatorSpec("bb", (20, 2.0))."""
+    kind: str
+    params: Tuple[float, ...] = ()
+    column: str = "close"
+
+    @property
+    def key(self) -> str:
+        if self.kind == "stats":
+            return f"stats_{self.column}"
+        parts = [_fmt(p) for p in self.params]
+        return "_".join([self.kind, *parts])
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def parse_specs(text: str) -> List[IndicatorSpec]:
+    """
+    Parse "sma:20,ema:12,bb:20:2,rsi:14,macd:12:26:9,stats:close" into specs.
+    Missing parameters take their defaults; unknown kinds raise ValueError.
+    """
+    specs: List[IndicatorSpec] = []
+    for token in text.split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        kind, *args = [part.strip() for part in token.split(":")]
+        if kind not in SPEC_DEFAULTS:
+            raise ValueError(
+                f"Unknown indicator '{kind}'. Supported: {', '.join(SPEC_DEFAULTS)}"
+            )
+        if kind == "stats":
+            column = args[0] if args else "close"
+            if column not in STATS_COLUMNS:
+                raise ValueError(f"stats column must be one of {STATS_COLUMNS}, got '{column}'")
+            specs.append(IndicatorSpec("stats", (), column))
+            continue
+
+        defaults = SPEC_DEFAULTS[kind]
+        values = [float(a) for a in args[:len(defaults)]] + list(defaults[len(args):])
+        if kind != "bb" and any(v < 1 or not float(v).is_integer() for v in values):
+            raise ValueError(f"'{token}': window lengths must be positive integers")
+        if kind == "bb" and (values[0] < 1 or not float(values[0]).is_integer()):
+            raise ValueError(f"'{token}': window length must be a positive integer")
+        specs.append(IndicatorSpec(kind, tuple(values)))
+    if not specs:
+        raise ValueError("no indicators requested")
+    return specs
+
+
+@dataclass
+class IndicatorResult:
+    """Full-length float64 series keyed by name, plus scalar statistics."""
+    dates: pd.Series
+    series: Dict[str, np.ndarray] = field(default_factory=dict)
+    stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def last_values(self) -> Dict[str, Optional[float]]:
+        """Last non-NaN value of every series."""
+        out: Dict[str, Optional[float]] = {}
+        for name, values in self.series.items():
+            valid = np.flatnonzero(~np.isnan(values))
+            out[name] = float(values[valid[-1]]) if valid.size else None
+        return out
+
+
+class _ColumnMoments:
+    """
+    Rolling means and standard deviations over one column, computed once
+    per window and shared by every indicator using it. Means come from one
+    prefix sum of the (centred) values. Variances are summed from each
+    window's own deviations from its mean: prefix sums of x**2 lose most
+    of their digits to cancellation on long histories spanning a wide
+    price range.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.n = values.size
+        self.shift = float(values.mean()) if self.n else 0.0
+        self.csum = np.concatenate(([0.0], np.cumsum(values - self.shift)))
+        self._means: Dict[int, np.ndarray] = {}
+        self._stds: Dict[int, np.ndarray] = {}
+
+    def mean(self, w: int) -> np.ndarray:
+        if w not in self._means:
+            out = np.full(self.n, np.nan)
+            if w <= self.n:
+                out[w - 1:] = (self.csum[w:] - self.csum[:-w]) / w + self.shift
+            self._means[w] = out
+        return self._means[w]
+
+    def std(self, w: int) -> np.ndarray:
+        """Sample (ddof=1) rolling standard deviation, like pandas' default."""
+        if w not in self._stds:
+            out = np.full(self.n, np.nan)
+            if 1 < w <= self.n:
+                windows = sliding_window_view(self.values, w)
+                means = self.mean(w)[w - 1:]
+                var = np.empty(len(windows))
+                step = max(1, _STD_BLOCK // w)
+                for i in range(0, len(windows), step):
+                    dev = windows[i:i + step] - means[i:i + step, None]
+                    var[i:i + step] = np.einsum("ij,ij->i", dev, dev)
+                out[w - 1:] = np.sqrt(var / (w - 1))
+            self._stds[w] = out
+        return self._stds[w]
+
+
+class _PandasMoments:
+    """Fallback for columns with gaps (NaN), where prefix sums do not apply."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.series = pd.Series(values)
+        self.n = values.size
+
+    def mean(self, w: int) -> np.ndarray:
+        return self.series.rolling(window=w).mean().to_numpy()
+
+    def std(self, w: int) -> np.ndarray:
+        return self.series.rolling(window=w).std().to_numpy()
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(values).ewm(span=span, adjust=False, min_periods=span).mean().to_numpy()
+
+
+def _rsi(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's RSI."""
+    delta = np.diff(values, prepend=np.nan)
+    gains = pd.Series(np.where(delta > 0, delta, 0.0))
+    losses = pd.Series(np.where(delta < 0, -delta, 0.0))
+    gains[0] = losses[0] = np.nan
+    avg_gain = gains.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean().to_numpy()
+    avg_loss = losses.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+
+
+def compute_indicators(frame: pd.DataFrame, specs: Iterable[IndicatorSpec]) -> IndicatorResult:
+    """
+    Compute all `specs` over `frame` (a 'date' column plus OHLCV, sorted by
+    date) in one pass: rolling windows share prefix sums per column, SMAs
+    and EMAs are computed once per window and reused by Bollinger/MACD.
+    The frame is not modified.
+    """
+    result = IndicatorResult(dates=frame["date"])
+    moments: Dict[str, Any] = {}
+    emas: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def column_moments(column: str):
+        if column not in moments:
+            if column not in frame.columns:
+                raise ValueError(f"{column} column not found in data")
+            values = frame[column].to_numpy(dtype=np.float64)
+            moments[column] = (
+                _PandasMoments(values) if np.isnan(values).any() else _ColumnMoments(values)
+            )
+        return moments[column]
+
+    def ema(column: str, span: int) -> np.ndarray:
+        if (column, span) not in emas:
+            emas[(column, span)] = _ema(column_moments(column).values, span)
+        return emas[(column, span)]
+
+    for spec in specs:
+        key = spec.key
+        if spec.kind == "sma":
+            result.series[key] = column_moments(spec.column).mean(int(spec.params[0]))
+        elif spec.kind == "ema":
+            result.series[key] = ema(spec.column, int(spec.params[0]))
+        elif spec.kind == "bb":
+            window, num_std = int(spec.params[0]), float(spec.params[1])
+            m = column_moments(spec.column)
+            mid, std = m.mean(window), m.std(window)
+            result.series[f"{key}_mid"] = mid
+            result.series[f"{key}_upper"] = mid + std * num_std
+            result.series[f"{key}_lower"] = mid - std * num_std
+        elif spec.kind == "rsi":
+            result.series[key] = _rsi(column_moments(spec.column).values, int(spec.params[0]))
+        elif spec.kind == "macd":
+            fast, slow, signal = (int(p) for p in spec.params)
+            macd = ema(spec.column, fast) - ema(spec.column, slow)
+            signal_line = _ema(macd, signal)
+            result.series[key] = macd
+            result.series[f"{key}_signal"] = signal_line
+            result.series[f"{key}_hist"] = macd - signal_line
+        elif spec.kind == "stats":
+            result.stats[key] = column_stats(frame, spec.column)
+    return result
+
+
+def column_stats(frame: pd.DataFrame, column: str) -> Dict[str, Any]:
+    """Descriptive statistics of one column, as returned by calculate_stats."""
+    if column not in frame.columns:
+        raise ValueError(
+            f"Metric '{column}' not found in data. Available columns: {list(frame.columns)}"
+        )
+    values = frame[column].to_numpy(dtype=np.float64)
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        raise ValueError("No data available to compute statistics.")
+    return {
+        "metric": column,
+        "count": int(valid.size),
+        "mean": float(valid.mean()),
+        "std": float(valid.std(ddof=1)) if valid.size > 1 else 0.0,
+        "min": float(valid.min()),
+        "max": float(valid.max()),
+        "start_date": frame["date"].min().strftime("%Y-%m-%d"),
+        "end_date": frame["date"].max().strftime("%Y-%m-%d"),
+    }
@@ -0,0 +1,125 @@
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorSpec
+
+TRADING_DAYS_PER_YEAR = 252
+RETURN_HORIZONS = {"return_1d": 1, "return_5d": 5, "return_21d": 21}
+
+
+def build_panel(frames: Mapping[str, pd.DataFrame], column: str = "close") -> pd.DataFrame:
+    """
+    Align per-symbol frames (DatetimeIndex, OHLCV columns) into one wide
+    date x symbol frame of `column`. Dates missing for a symbol are NaN.
+    """
+    if not frames:
+        return pd.DataFrame()
+    panel = pd.concat({symbol: frame[column] for symbol, frame in frames.items()}, axis=1)
+    return panel.sort_index().astype(np.float64)
+
+
+def _window(filled: pd.DataFrame, window: int) -> pd.DataFrame:
+    """Last `window` rows; columns without `window` valid values are all NaN."""
+    tail = filled.iloc[-window:]
+    complete = (tail.notna().sum() >= window).to_numpy()
+    return tail.loc[:, complete].reindex(columns=filled.columns)
+
+
+def _indicator_columns(filled: pd.DataFrame, last: pd.Series, spec: IndicatorSpec) -> Dict[str, pd.Series]:
+    """Latest value of one indicator for every symbol at once."""
+    key = spec.key
+    if spec.kind == "sma":
+        sma = _window(filled, int(spec.params[0])).mean()
+        return {key: sma, f"close_vs_{key}": last / sma - 1}
+    if spec.kind == "ema":
+        span = int(spec.params[0])
+        ema = filled.ewm(span=span, adjust=False, min_periods=span).mean().iloc[-1]
+        return {key: ema, f"close_vs_{key}": last / ema - 1}
+    if spec.kind == "bb":
+        window, num_std = int(spec.params[0]), float(spec.params[1])
+        tail = _window(filled, window)
+        mid, std = tail.mean(), tail.std(ddof=1)
+        upper, lower = mid + num_std * std, mid - num_std * std
+        return {f"{key}_pct_b": (last - lower) / (upper - lower), f"{key}_width": (upper - lower) / mid}
+    if spec.kind == "rsi":
+        period = int(spec.params[0])
+        delta = filled.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+        avg_gain, avg_loss = gain.iloc[-1], loss.iloc[-1]
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return {key: rsi.where(avg_loss != 0, 100.0).where(avg_gain.notna())}
+    if spec.kind == "macd":
+        fast, slow, signal = (int(p) for p in spec.params)
+        macd = (filled.ewm(span=fast, adjust=False, min_periods=fast).mean()
+                - filled.ewm(span=slow, adjust=False, min_periods=slow).mean())
+        signal_line = macd.ewm(span=signal, adjust=False, min_periods=signal).mean()
+        return {key: macd.iloc[-1], f"{key}_hist": (macd - signal_line).iloc[-1]}
+    # stats: the range columns (volatility, drawdown, returns) already cover it
+    return {}
+
+
+def cross_section(
+    panel: pd.DataFrame,
+    specs: Iterable[IndicatorSpec] = (),
+    start: Optional[pd.Timestamp] = None,
+    rank_by: str = "return_period",
+    ascending: bool = False,
+) -> pd.DataFrame:
+    """
+    One row per symbol: last close and date, returns over fixed horizons and
+    over the period from `start`, annualised volatility, max drawdown, and
+    the latest value of each indicator spec. Every column is computed for
+    all symbols at once on the panel. Indicators use the whole panel (so
+    long windows are warmed up); period statistics only rows from `start`.
+    Sorted by `rank_by` (descending unless `ascending`) with a 1-based
+    `rank` column.
+    """
+    # Fill gaps inside a symbol's history, never before its first bar.
+    filled = panel.ffill()
+    last = filled.iloc[-1]
+    table = pd.DataFrame(index=panel.columns)
+    table["last_close"] = last
+    table["last_date"] = panel.notna().iloc[::-1].idxmax().dt.strftime("%Y-%m-%d")
+
+    for name, horizon in RETURN_HORIZONS.items():
+        table[name] = last / filled.shift(horizon).iloc[-1] - 1 if len(filled) > horizon else np.nan
+
+    ranged = filled if start is None else filled[filled.index >= start]
+    first = ranged.bfill().iloc[0] if len(ranged) else pd.Series(np.nan, index=panel.columns)
+    table["return_period"] = last / first - 1
+    log_returns = np.log(ranged).diff()
+    table["volatility"] = log_returns.std(ddof=1) * math.sqrt(TRADING_DAYS_PER_YEAR)
+    table["max_drawdown"] = (ranged / ranged.cummax() - 1).min()
+
+    for spec in specs:
+        for name, values in _indicator_columns(filled, last, spec).items():
+            table[name] = values
+
+    if rank_by not in table.columns or rank_by == "last_date":
+        available = [c for c in table.columns if c != "last_date"]
+        raise ValueError(f"Cannot rank by '{rank_by}'. Available: {available}")
+    table["rank"] = table[rank_by].rank(ascending=ascending, method="min")
+    return table.sort_values(["rank"], na_position="last")
+
+
+def return_correlation(panel: pd.DataFrame, start: Optional[pd.Timestamp] = None,
+                       min_periods: int = 20) -> pd.DataFrame:
+    """Pairwise correlation of daily returns from `start` on."""
+    ranged = panel if start is None else panel[panel.index >= start]
+    return ranged.pct_change(fill_method=None).corr(min_periods=min_periods)
+
+
+def compact_table(table: pd.DataFrame, digits: int = 4) -> Dict[str, Any]:
+    """{"columns": [...], "rows": [[symbol, ...], ...]} with NaN as None."""
+    columns: List[str] = ["symbol", *table.columns]
+    numeric = table.select_dtypes("number").round(digits)
+    out = table.astype(object)
+    out[numeric.columns] = numeric.astype(object).where(numeric.notna(), None)
+    if "rank" in out.columns:
+        out["rank"] = [None if v is None else int(v) for v in out["rank"]]
+    rows = [[symbol, *values] for symbol, values in zip(out.index, out.itertuples(index=False))]
+    return {"columns": columns, "rows": rows}
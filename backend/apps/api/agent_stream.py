@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from apps.services.response_shaping import dumps
+
+
+# Keep progress events small: long lists become a count, long strings a prefix.
+_MAX_LIST_ITEMS = 5
+_MAX_TEXT_CHARS = 500
+
+_DONE = object()
+
+
+def _preview(value: Any) -> Any:
+    """Compact, JSON-safe preview of a tool input/output for progress events."""
+    if hasattr(value, "content") and not isinstance(value, (str, dict)):
+        # ToolMessage and friends
+        value = value.content
+    if isinstance(value, dict):
+        return {str(k): _preview(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > _MAX_LIST_ITEMS:
+            return f"<{len(value)} items>"
+        return [_preview(v) for v in value]
+    if isinstance(value, str):
+        return value if len(value) <= _MAX_TEXT_CHARS else value[:_MAX_TEXT_CHARS] + "..."
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    return _preview(str(value))
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+class AgentEventStream(AsyncCallbackHandler):
+    """
+    LangChain callback handler that turns an agent run into SSE events.
+
+    Emits `token` for each LLM token, `tool_start` / `tool_end` / `tool_error`
+    around each tool call and `chart` as soon as a tool output contains a
+    chart URL. The endpoint adds the final `result` (or `error`) event.
+    """
+
+    def __init__(self, extract_chart_urls: Callable[[str], List[str]]):
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._extract_chart_urls = extract_chart_urls
+        self._tool_names: Dict[UUID, str] = {}
+        self._charts_sent: set = set()
+
+    def put(self, event: str, data: Dict[str, Any]) -> None:
+        self.queue.put_nowait((event, data))
+
+    def close(self) -> None:
+        self.queue.put_nowait(_DONE)
+
+    async def events(self) -> AsyncIterator[str]:
+        """Yield SSE-formatted chunks until close() is called."""
+        while True:
+            item = await self.queue.get()
+            if item is _DONE:
+                return
+            event, data = item
+            yield format_sse(event, data)
+
+    def emit_charts(self, text: str) -> None:
+        for url in self._extract_chart_urls(text):
+            if url not in self._charts_sent:
+                self._charts_sent.add(url)
+                self.put("chart", {"url": url})
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.put("token", {"text": token})
+
+    async def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        inputs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._tool_names[run_id] = name
+        self.put("tool_start", {"tool": name, "input": _preview(inputs or input_str)})
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tool_names.pop(run_id, kwargs.get("name") or "tool")
+        self.put("tool_end", {"tool": name, "output": _preview(output)})
+        content = getattr(output, "content", output)
+        self.emit_charts(content if isinstance(content, str) else str(content))
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tool_names.pop(run_id, kwargs.get("name") or "tool")
+        self.put("tool_error", {"tool": name, "error": str(error)})
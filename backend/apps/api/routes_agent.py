@@ -1,15 +1,31 @@
 
-import json
+import asyncio
 import logging
 import re
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from google.api_core.exceptions import ServiceUnavailable
 
 from apps.agents.agent import create_stock_agent_executor
+from apps.agents.callbacks import RunOutcomeHandler, TracingCallbackHandler
+from apps.agents.pipeline import AnalysisParams, PipelineError, fast_path_params, run_analysis
+from apps.api.agent_stream import AgentEventStream
+from apps.services.dataset_registry import DatasetRegistry
+from apps.services.query_parser import parse_query
+from apps.services.response_cache import (
+    ResponseCache,
+    dataset_symbols,
+    get_response_cache,
+    latest_bar,
+    response_key,
+)
+from apps.services.response_shaping import get_artifact_store, json_response, shape, to_jsonable
+from apps.services.run_limiter import QueueFullError, RunLimiter
+from apps.services.sessions import Session, get_session_store, session_scope
+from apps.services.tracing import Trace, trace_scope
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +37,15 @@ router = APIRouter(
 
 class AgentQuery(BaseModel):
     input: str
+    # auto: standard single-symbol requests skip the agent loop (see apps.agents.pipeline);
+    # agent: always run the agent; fast: only the pipeline, 422 if it cannot answer.
+    mode: Literal["auto", "agent", "fast"] = "auto"
+    # Attach a per-request breakdown (LLM, tool, upstream and render spans) as "timings".
+    timings: bool = False
+    # Conversation to continue (the "session_id" of an earlier response); a new
+    # one is started when missing or expired. Follow-ups see the earlier turns
+    # and reuse their datasets and indicator results.
+    session_id: Optional[str] = None
 
 
 @lru_cache(maxsize=1)
@@ -29,88 +54,320 @@ def get_agent_executor():
     return create_stock_agent_executor()
 
 
+@lru_cache(maxsize=1)
+def get_run_limiter() -> RunLimiter:
+    # Created on first use so the semaphore binds to the server's event loop
+    return RunLimiter()
+
+
+def _llm_unavailable(error: Exception) -> bool:
+    """
+    True for "overloaded / temporarily unavailable" errors from the LLM
+    client. Matched by name and status code so the Google client libraries
+    (google-api-core's ServiceUnavailable, google-genai's ServerError) need
+    not be imported up front.
+    """
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return type(error).__name__ == "ServiceUnavailable" or status == 503
+
+
 def _extract_chart_urls(text: str):
     """Find any /static/charts/... URLs in the text."""
     pattern = r"/static/charts/[^\s\"']+"
     return list(dict.fromkeys(re.findall(pattern, text)))  # unique, preserve order
 
 
-def _safe_serialize(obj: Any) -> Any:
+def _extract_series_urls(text: str):
+    """Find any /api/series/... URLs (from price_series) in the text."""
+    pattern = r"/api/series/[^\s\"'`),\]]+"
+    return list(dict.fromkeys(re.findall(pattern, text)))
+
+
+def _build_response(result: Any) -> dict:
+    """Shape an AgentExecutor result into the API response body."""
+    # Decide summary (human-friendly) and raw_result (safe serialized)
+    if isinstance(result, dict):
+        summary = (
+            result.get("output")
+            or result.get("result")
+            or result.get("final_answer")
+            or result.get("answer")
+            or result.get("response")
+            or ""
+        )
+        # The executor echoes its inputs back; earlier turns are not part of this answer.
+        result = {k: v for k, v in result.items() if k != "chat_history"}
+        # JSON-safe in one pass, then cut down to the response size budget
+        raw_result = shape(to_jsonable(result))
+        steps = result.get("intermediate_steps", "")
+    else:
+        summary = str(result)
+        raw_result = summary
+        steps = ""
+
+    # Ensure summary is a string
+    if not isinstance(summary, str):
+        summary = str(summary)
+
+    # Extract chart URLs from this turn's answer and tool calls (before shaping)
+    combined_text = summary + "\n" + str(steps)
+    chart_urls = _extract_chart_urls(combined_text)
+    series_urls = _extract_series_urls(combined_text)
+
+    response = {
+        "summary": summary,
+        "raw_result": raw_result,
+        "chart_urls": chart_urls,
+        "series_urls": series_urls,
+    }
+
+    return response
+
+
+def _cache_lookup(payload: AgentQuery, session: Session):
     """
-    Try to return a JSON-serializable version of obj.
-    - If obj is already serializable, return it.
-    - Otherwise, return a string representation.
+    (cache, key, cached response) for a question; key is None if uncacheable.
+    Follow-ups in a session with earlier turns depend on those turns, so
+    they are neither answered from nor stored in the cache.
     """
+    cache = get_response_cache()
+    key = response_key(payload.input) if cache is not None and not session.turns else None
+    if key and payload.mode == "agent":
+        # Answers from the fast path must not satisfy an explicit agent request.
+        key += "|agent"
+    cached = cache.get(key) if key else None
+    if cached is not None:
+        logger.info("Response cache hit: %s", key)
+    return cache, key, cached
+
+
+def _remember(
+    cache: Optional[ResponseCache],
+    key: Optional[str],
+    response: dict,
+    registry: DatasetRegistry,
+    failed: bool,
+) -> None:
+    """Cache a finished run's response unless it is empty or the run hit an error on the way."""
+    if cache is None or not key or failed:
+        return
+    if not (response.get("summary") or "").strip():
+        return
+    datasets = registry.datasets()
+    cache.put(key, response, data_as_of=latest_bar(datasets), symbols=dataset_symbols(datasets))
+
+
+def _route(payload: AgentQuery) -> Optional[AnalysisParams]:
+    """Pipeline parameters if the question should skip the agent, else None."""
+    if payload.mode == "agent":
+        return None
+    params = fast_path_params(parse_query(payload.input))
+    if params is None and payload.mode == "fast":
+        raise HTTPException(
+            status_code=422,
+            detail="This question needs the agent: ask about one symbol over a recent range "
+                   "(no dates) and SMA/Bollinger/stats only.",
+        )
+    return params
+
+
+async def _run_fast_path(
+    payload: AgentQuery,
+    params: AnalysisParams,
+    cache: Optional[ResponseCache],
+    cache_key: Optional[str],
+    session: Session,
+) -> Optional[dict]:
+    """Pipeline response, or None to fall back to the agent (auto mode only)."""
     try:
-        # Try to dump->load to ensure serializable
-        json.dumps(obj)
-        return obj
-    except Exception:
-        try:
-            # If it's a dict-like from LangChain, try to coerce values to strings
-            if isinstance(obj, dict):
-                safe = {}
-                for k, v in obj.items():
-                    try:
-                        json.dumps(v)
-                        safe[k] = v
-                    except Exception:
-                        safe[k] = str(v)
-                return safe
-        except Exception:
-            pass
-    # fallback to string
-    return str(obj)
+        with session_scope(session) as registry:
+            response = await run_analysis(params)
+        # Any failing step raises PipelineError, so a finished pipeline run is clean.
+        _remember(cache, cache_key, response, registry, failed=False)
+        return response
+    except PipelineError as e:
+        if payload.mode == "fast":
+            raise HTTPException(status_code=422, detail=str(e))
+        logger.info("Fast path failed, falling back to agent: %s", e)
+        return None
+
+
+def _agent_input(payload: AgentQuery, session: Session) -> dict:
+    return {"input": payload.input, "chat_history": session.history()}
+
+
+def _finish_turn(session: Session, payload: AgentQuery, response: dict) -> dict:
+    """Add the turn to the session's history and tag the response with its id."""
+    session.add_turn(payload.input, response.get("summary") or "")
+    get_session_store().trim(keep=session)
+    # Copy: the response may be shared with the response cache.
+    return {**response, "session_id": session.id}
+
+
+def _with_timings(payload: AgentQuery, response: dict, trace: Trace) -> dict:
+    """The response, plus the request's timing breakdown when asked for."""
+    if not payload.timings:
+        return response
+    # Copy: the response may be shared with the response cache.
+    return {**response, "timings": trace.summary()}
 
 
 @router.post("/query")
 async def query_agent(payload: AgentQuery):
-    agent_executor = get_agent_executor()
+    session = get_session_store().get_or_create(payload.session_id)
+    with trace_scope() as trace:
+        response = await _answer(payload, session)
+    return json_response(_with_timings(payload, _finish_turn(session, payload, response), trace))
+
+
+@router.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str):
+    """Full value of a part of a response that was cut to fit the size budget."""
+    encoded = get_artifact_store().get(artifact_id)
+    if encoded is None:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired.")
+    return Response(encoded, media_type="application/json")
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def end_session(session_id: str):
+    """Forget a conversation (history, datasets, memoised results)."""
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired.")
+    return Response(status_code=204)
+
+
+async def _answer(payload: AgentQuery, session: Session) -> dict:
+    limiter = get_run_limiter()
+    cache, cache_key, cached = _cache_lookup(payload, session)
+    if cached is not None:
+        return cached
+
+    params = _route(payload)
+    if params is not None:
+        response = await _run_fast_path(payload, params, cache, cache_key, session)
+        if response is not None:
+            return response
 
     try:
-        # Run the agent synchronously (AgentExecutor.invoke)
-        result = agent_executor.invoke({"input": payload.input})
-        logger.debug("Raw agent result: %s", result)
+        # Building the executor is slow the first time; keep it off the loop
+        agent_executor = await asyncio.to_thread(get_agent_executor)
 
-        # Decide summary (human-friendly) and raw_result (safe serialized)
-        if isinstance(result, dict):
-            summary = (
-                result.get("output")
-                or result.get("result")
-                or result.get("final_answer")
-                or result.get("answer")
-                or result.get("response")
-                or ""
+        # Run the agent asynchronously so other requests keep being served;
+        # datasets fetched during this run are only visible to this session.
+        outcome = RunOutcomeHandler()
+        with session_scope(session) as registry:
+            result = await limiter.run(
+                lambda: agent_executor.ainvoke(
+                    _agent_input(payload, session),
+                    config={"callbacks": [TracingCallbackHandler(), outcome]},
+                )
             )
-            # Make raw_result JSON-safe
-            raw_result = _safe_serialize(result)
-        else:
-            summary = str(result)
-            raw_result = summary
-
-        # Ensure summary is a string
-        if not isinstance(summary, str):
-            summary = str(summary)
-
-        # Extract chart URLs from summary + raw_result string
-        combined_text = summary + "\n" + str(raw_result)
-        chart_urls = _extract_chart_urls(combined_text)
-
-        response = {
-            "summary": summary,
-            "raw_result": raw_result,
-            "chart_urls": chart_urls,
-        }
+        logger.debug("Raw agent result: %s", result)
 
+        response = _build_response(result)
+        _remember(cache, cache_key, response, registry, failed=outcome.failed)
         return response
 
-    except ServiceUnavailable as e:
-        # LLM temporarily down / overloaded
-        logger.warning("LLM ServiceUnavailable: %s", e)
-        raise HTTPException(status_code=503, detail=f"LLM service temporarily unavailable: {e}")
+    except QueueFullError as e:
+        logger.warning("Agent queue full: %s", limiter.stats())
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    except asyncio.TimeoutError:
+        logger.warning("Agent run exceeded %.0fs", limiter.timeout)
+        raise HTTPException(
+            status_code=504,
+            detail=f"Agent did not finish within {limiter.timeout:.0f} seconds.",
+        )
 
     except Exception as e:
+        if _llm_unavailable(e):
+            # LLM temporarily down / overloaded
+            logger.warning("LLM service unavailable: %s", e)
+            raise HTTPException(status_code=503, detail=f"LLM service temporarily unavailable: {e}")
         logger.exception("Error while calling agent")
         # Return a cleaner error message but log full traceback
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+
+@router.post("/query/stream")
+async def query_agent_stream(payload: AgentQuery):
+    """
+    Same as /query, but streams progress as Server-Sent Events:
+    `token`, `tool_start`, `tool_end`, `tool_error` and `chart` while the
+    agent runs, then a final `result` (same body as /query) or `error`.
+    """
+    limiter = get_run_limiter()
+    stream = AgentEventStream(_extract_chart_urls)
+    trace = Trace()
+    session = get_session_store().get_or_create(payload.session_id)
+    cache, cache_key, cached = _cache_lookup(payload, session)
+
+    ready = cached
+    if ready is None:
+        params = _route(payload)
+        if params is not None:
+            with trace_scope(trace):
+                ready = await _run_fast_path(payload, params, cache, cache_key, session)
+    if ready is not None:
+        stream.emit_charts("\n".join(ready["chart_urls"]))
+        stream.put("result", _with_timings(payload, _finish_turn(session, payload, ready), trace))
+        stream.close()
+        return StreamingResponse(
+            stream.events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        agent_executor = await asyncio.to_thread(get_agent_executor)
+    except Exception as e:
+        logger.exception("Error while creating agent")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    async def run_agent():
+        outcome = RunOutcomeHandler()
+        try:
+            with trace_scope(trace), session_scope(session) as registry:
+                result = await limiter.run(
+                    lambda: agent_executor.ainvoke(
+                        _agent_input(payload, session),
+                        config={"callbacks": [stream, TracingCallbackHandler(trace), outcome]},
+                    )
+                )
+            response = _build_response(result)
+            _remember(cache, cache_key, response, registry, failed=outcome.failed)
+            stream.emit_charts("\n".join(response["chart_urls"]))
+            stream.put("result", _with_timings(payload, _finish_turn(session, payload, response), trace))
+        except QueueFullError as e:
+            stream.put("error", {"status": 429, "detail": str(e)})
+        except asyncio.TimeoutError:
+            stream.put("error", {
+                "status": 504,
+                "detail": f"Agent did not finish within {limiter.timeout:.0f} seconds.",
+            })
+        except Exception as e:
+            if _llm_unavailable(e):
+                logger.warning("LLM service unavailable: %s", e)
+                stream.put("error", {"status": 503, "detail": f"LLM service temporarily unavailable: {e}"})
+            else:
+                logger.exception("Error while streaming agent")
+                stream.put("error", {"status": 500, "detail": f"Internal server error: {str(e)}"})
+        finally:
+            stream.close()
+
+    async def event_source():
+        task = asyncio.create_task(run_agent())
+        try:
+            async for chunk in stream.events():
+                yield chunk
+        finally:
+            # Client went away: stop the agent instead of finishing unseen work
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
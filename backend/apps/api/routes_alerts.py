@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from apps.api.agent_stream import format_sse
+from apps.services.alerts import get_alert_engine, scan_alerts
+from apps.services.response_shaping import json_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/alerts",
+    tags=["alerts"],
+)
+
+# How often an open SSE stream looks for new signals, and sends a keep-alive.
+STREAM_POLL_SECONDS = 1.0
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+class RulesRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1)
+    # e.g. "close crosses above sma:50", "close below bb:20:2:lower", "close above 250"
+    rules: List[str] = Field(..., min_length=1)
+
+
+@router.post("/rules")
+async def add_rules(payload: RulesRequest):
+    """Register every rule for every symbol; 422 (nothing added) if one is malformed."""
+    try:
+        created = get_alert_engine().add_rules(
+            (symbol, rule) for symbol in payload.symbols for rule in payload.rules
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"rules": created}
+
+
+@router.get("/rules")
+async def list_rules(symbol: Optional[str] = None):
+    return json_response({"rules": get_alert_engine().rules(symbol)})
+
+
+@router.delete("/rules/{rule_id}", status_code=204)
+async def delete_rule(rule_id: int):
+    if not get_alert_engine().remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail="Rule not found.")
+    return Response(status_code=204)
+
+
+@router.post("/scan")
+async def scan():
+    """
+    Evaluate all rules against the latest bars now. The after-close job
+    does this automatically; symbols whose last bar was already evaluated
+    are skipped.
+    """
+    try:
+        return json_response(await asyncio.to_thread(scan_alerts))
+    except Exception as e:
+        logger.exception("Error while scanning alerts")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/signals")
+async def list_signals(after: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """
+    Fired signals with id greater than `after`, oldest first. Poll with the
+    returned `last_id` to receive each signal once.
+    """
+    engine = get_alert_engine()
+    signals = engine.signals(after, limit)
+    return {"signals": signals, "last_id": signals[-1]["id"] if signals else after}
+
+
+@router.get("/stream")
+async def stream_signals(request: Request, after: Optional[int] = Query(None, ge=0)):
+    """
+    Fired signals as Server-Sent Events (`signal`), from id `after` on
+    (default: only new ones). Sends a `ping` comment when idle.
+    """
+    engine = get_alert_engine()
+    last = engine.last_signal_id if after is None else after
+
+    async def events():
+        nonlocal last
+        idle = 0.0
+        while not await request.is_disconnected():
+            signals = engine.signals(last, limit=1000)
+            for signal in signals:
+                yield format_sse("signal", signal)
+            if signals:
+                last, idle = signals[-1]["id"], 0.0
+                continue
+            if idle >= STREAM_KEEPALIVE_SECONDS:
+                yield ": ping\n\n"
+                idle = 0.0
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+            idle += STREAM_POLL_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from apps.agents.pipeline import AnalysisParams, PipelineError, run_analysis
+from apps.agents.tools.batch_analysis import analyze_batch
+from apps.services.dataset_registry import dataset_scope
+from apps.services.response_shaping import json_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/analysis",
+    tags=["analysis"],
+)
+
+
+class BatchRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1)
+    indicators: str = "sma:20,sma:50,rsi:14"
+    range_days: int = Field(90, ge=1, le=365 * 25)
+    rank_by: str = "return_period"
+    ascending: bool = False
+    top_n: Optional[int] = Field(None, ge=1)
+    correlation: bool = False
+
+
+def _parse_windows(text: str):
+    try:
+        windows = tuple(int(w) for w in text.split(",") if w.strip())
+    except ValueError:
+        windows = ()
+    if not windows or any(w < 2 for w in windows):
+        raise HTTPException(status_code=422, detail="windows must be comma-separated integers >= 2")
+    return windows
+
+
+@router.post("/batch")
+async def analyze_batch_endpoint(payload: BatchRequest):
+    """
+    Cross-sectional analysis of a watchlist: all symbols are fetched
+    concurrently (within the Alpha Vantage quota), aligned into one
+    date x symbol panel and ranked. Returns a compact table
+    ({"columns": [...], "rows": [[...], ...]}) plus per-symbol errors and
+    the uncached symbols "deferred" for lack of upstream slots (ask again).
+    """
+    try:
+        return json_response(await asyncio.to_thread(analyze_batch, **payload.model_dump()))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("Error while running batch analysis")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/{symbol}")
+async def analyze_symbol(
+    symbol: str,
+    range_days: int = Query(90, ge=1, le=365 * 25),
+    windows: str = "5,20,50",
+    band_window: int = Query(20, ge=2),
+    num_std: float = Query(2.0, gt=0),
+    chart: bool = False,
+    summary: bool = True,
+):
+    """
+    Standard analysis of one symbol without the agent loop: price fetch,
+    SMAs, Bollinger Bands, period statistics and a link to the interactive
+    series (`chart=true` also renders a PNG), then at most one LLM call for
+    the written summary (`summary=false` skips it and returns a template
+    summary). Same response body as /api/agent/query.
+    """
+    params = AnalysisParams(
+        symbol=symbol,
+        range_days=range_days,
+        windows=_parse_windows(windows),
+        band_window=band_window,
+        num_std=num_std,
+        chart=chart,
+        summarize=summary,
+    )
+    try:
+        with dataset_scope():
+            return json_response(await run_analysis(params))
+    except PipelineError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("Error while running analysis pipeline")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -1,4 +1,14 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from apps.services.alerts import get_alert_engine
+from apps.services.alpha_vantage_client import client_metrics
+from apps.services.chart_cache import get_chart_cache
+from apps.services.response_cache import get_response_cache
+from apps.services.scheduler import get_scheduler
+from apps.services.sessions import get_session_store
+from apps.services.tracing import METRICS, render_gauges
+from apps.services.warmup import READINESS
 
 router = APIRouter(tags=["health"])
 
@@ -6,7 +16,58 @@ router = APIRouter(tags=["health"])
 @router.get("/health")
 async def health_check():
     """
-    Simple health-check endpoint so you can verify the API is up.
+    Liveness plus warm-up state: `ready` turns true once the background
+    warm-up (agent executor, HTTP pool, render workers) has finished.
     Does NOT touch the LLM or Alpha Vantage.
     """
-    return {"status": "ok"}
+    return {"status": "ok", **READINESS.snapshot()}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 while the worker is still warming up."""
+    snapshot = READINESS.snapshot()
+    if not snapshot["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **snapshot})
+    return {"status": "ready", **snapshot}
+
+
+@router.get("/health/upstream")
+async def upstream_metrics():
+    """
+    Alpha Vantage request counters, quota usage and queueing time.
+    Reads in-process counters only; makes no upstream call.
+    """
+    return client_metrics()
+
+
+@router.get("/health/scheduler")
+async def scheduler_status():
+    """
+    Watchlist job: symbols, whether a run is in progress, when the next
+    one is due, and the latest runs' per-symbol outcome, duration and
+    upstream calls used.
+    """
+    return get_scheduler().status()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus text exposition: duration histograms, error counts and
+    payload/token totals for LLM, tool, upstream and render spans, plus
+    the upstream, quota, cache, watchlist job, session and alert counters.
+    """
+    upstream = client_metrics()
+    response_cache = get_response_cache()
+    gauges = render_gauges({
+        "alpha_vantage": {k: v for k, v in upstream.items() if not isinstance(v, dict)},
+        "alpha_vantage_quota": upstream["quota"],
+        "alpha_vantage_single_flight": upstream["single_flight"],
+        "chart_cache": get_chart_cache().stats(),
+        "response_cache": response_cache.stats() if response_cache is not None else {},
+        "watchlist": get_scheduler().gauges(),
+        "sessions": get_session_store().stats(),
+        "alerts": get_alert_engine().stats(),
+    })
+    return PlainTextResponse(METRICS.render() + gauges, media_type="text/plain; version=0.0.4")
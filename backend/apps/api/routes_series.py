@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query
+
+from apps.agents.pipeline import PipelineError, fetch_dataset, output_size_for
+from apps.agents.tools.price_series import (
+    DEFAULT_POINTS,
+    DEFAULT_SERIES_INDICATORS,
+    MAX_POINTS,
+    series_payload,
+    warmup_rows,
+)
+from apps.analytics import parse_specs
+from apps.services.dataset_registry import dataset_scope
+from apps.services.market_calendar import last_session_date
+from apps.services.response_shaping import json_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/series",
+    tags=["series"],
+)
+
+
+def _series(symbol: str, start: date, end: date, interval: str, indicators: str, points: int):
+    specs = parse_specs(indicators)
+    output_size = output_size_for(start, end, warmup_rows(specs)) if interval == "daily" else "full"
+    with dataset_scope():
+        dataset = fetch_dataset(symbol, output_size, interval)
+    payload = series_payload(
+        dataset.frame, specs, points,
+        start=pd.Timestamp(start), end=pd.Timestamp(end + timedelta(days=1)),
+    )
+    return {"symbol": symbol, "interval": interval, **payload}
+
+
+@router.get("/{symbol}")
+async def get_series(
+    symbol: str,
+    range_days: int = Query(365, ge=1, le=365 * 25),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: Literal["daily", "daily_adjusted", "weekly", "1min", "5min", "15min", "30min", "60min"] = "daily",
+    indicators: str = DEFAULT_SERIES_INDICATORS,
+    points: int = Query(DEFAULT_POINTS, ge=3, le=MAX_POINTS),
+):
+    """
+    Close price and indicator lines for the browser to draw, as compact
+    columnar JSON ({"series": {"dates": [...], "close": [...], "sma_20": [...]}}).
+    Longer ranges are downsampled with Largest-Triangle-Three-Buckets to at
+    most `points` points, so a 25-year history still draws as ~1000 points
+    with its peaks and troughs intact. `start` / `end` (inclusive) override
+    `range_days`.
+    """
+    end = end or last_session_date()
+    start = start or end - timedelta(days=range_days)
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    try:
+        return json_response(await asyncio.to_thread(
+            _series, symbol.upper(), start, end, interval, indicators, points
+        ))
+    except (PipelineError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("Error while building price series")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,66 @@
+"""
+Offline benchmark suite: per-tool latency and /api/agent/query under load.
+
+    python -m apps.benchmarks                       # tools + endpoint
+    python -m apps.benchmarks tools --repeat 50
+    python -m apps.benchmarks --save-baseline bench.json
+    python -m apps.benchmarks --compare bench.json  # exit 1 on regressions
+
+Baselines are machine-specific: record one on the machine you compare on.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from apps.benchmarks.harness import compare, report, save_baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark suite.")
+    parser.add_argument("suite", nargs="?", choices=("all", "tools", "endpoint"), default="all")
+    parser.add_argument("--sizes", default="compact,full,synthetic_50k", help="fixtures for the tool suite")
+    parser.add_argument("--repeat", type=int, default=20, help="calls per tool scenario")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint scenario")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--modes", default="agent,fast", help="query modes for the endpoint suite")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--upstream-latency", type=float, default=0.0,
+                        help="simulated seconds per Alpha Vantage call")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = []
+    if args.suite in ("all", "tools"):
+        from apps.benchmarks.tools import tool_scenarios
+
+        results += tool_scenarios(sizes=args.sizes.split(","), repeat=args.repeat)
+    if args.suite in ("all", "endpoint"):
+        from apps.benchmarks.endpoint import endpoint_scenarios
+
+        results += asyncio.run(endpoint_scenarios(
+            requests=args.requests,
+            concurrency=[int(c) for c in args.concurrency.split(",")],
+            modes=args.modes.split(","),
+            llm_latency=args.llm_latency,
+            upstream_latency=args.upstream_latency,
+        ))
+
+    print(report(results))
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"baseline written to {args.save_baseline}")
+    if args.compare:
+        problems = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        if problems:
+            print("\nREGRESSIONS:\n" + "\n".join(f"  {p}" for p in problems))
+            return 1
+        print(f"\nno regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+/api/agent/query under concurrent load, in-process through httpx's ASGI
+transport, with Alpha Vantage served from fixtures and the LLM replaced
+by ScriptedChatModel. The response cache is disabled so every request
+does the full work.
+"""
+import os
+from typing import Iterable, List
+
+import httpx
+
+from apps.benchmarks.fake_llm import ScriptedChatModel
+from apps.benchmarks.fixtures import offline
+from apps.benchmarks.harness import Result, run_concurrent
+
+QUERIES = {
+    "agent": "How has IBM done over the last year? Compare its 20 and 50 day SMA and plot it.",
+    "fast": "IBM 1 year 20 and 50 day SMA with bollinger bands",
+}
+
+
+async def endpoint_scenarios(
+    requests: int = 100,
+    concurrency: Iterable[int] = (1, 8, 32),
+    modes: Iterable[str] = ("agent", "fast"),
+    llm_latency: float = 0.0,
+    upstream_latency: float = 0.0,
+) -> List[Result]:
+    saved_cache_flag = os.environ.get("RESPONSE_CACHE_ENABLED")
+    os.environ["RESPONSE_CACHE_ENABLED"] = "0"
+
+    from apps.agents import agent
+    from apps.api import routes_agent
+    from apps.main import app
+
+    saved_llm = agent._get_llm
+    agent._get_llm = lambda: ScriptedChatModel(latency=llm_latency)
+    routes_agent.get_agent_executor.cache_clear()
+    results: List[Result] = []
+    try:
+        with offline(latency=upstream_latency):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+                for mode in modes:
+                    payload = {"input": QUERIES[mode], "mode": mode}
+
+                    async def query() -> bool:
+                        response = await client.post("/api/agent/query", json=payload)
+                        return response.status_code == 200
+
+                    for level in concurrency:
+                        results.append(await run_concurrent(
+                            f"query[{mode},c={level}]", query, requests, level
+                        ))
+    finally:
+        agent._get_llm = saved_llm
+        routes_agent.get_agent_executor.cache_clear()
+        if saved_cache_flag is None:
+            os.environ.pop("RESPONSE_CACHE_ENABLED", None)
+        else:
+            os.environ["RESPONSE_CACHE_ENABLED"] = saved_cache_flag
+    return results
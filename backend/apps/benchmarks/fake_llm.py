@@ -0,0 +1,84 @@
+"""A chat model that replays a scripted conversation, for offline agent benchmarks."""
+import asyncio
+import re
+import time
+from typing import Any, List, Optional, Sequence, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_HANDLE = re.compile(r"\bds_[0-9a-f]{12}\b")
+_CHART = re.compile(r"/static/charts/[^\s\"']+")
+
+# One step per agent turn: a list of (tool, args) calls, or the final answer.
+# "{dataset}" / "{chart}" are replaced with the latest handle / chart URL
+# returned by a tool.
+DEFAULT_SCRIPT: List[Union[str, List[tuple]]] = [
+    [("fetch_stock_prices", {"symbol": "IBM", "output_size": "full", "start_date": "2023-10-01"})],
+    [
+        ("moving_averages", {"csv_data": "{dataset}", "windows": "20,50", "last_n": 5}),
+        ("bollinger_bands", {"csv_data": "{dataset}", "window": 20, "last_n": 5}),
+        ("calculate_stats", {"csv_data": "{dataset}"}),
+    ],
+    [("generate_plot", {"csv_data": "{dataset}"})],
+    "IBM trended higher over the last year; the 20-day SMA is above the 50-day. Chart: {chart}",
+]
+
+SUMMARY_REPLY = "Scripted summary of the computed facts."
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Replays `script` one step per call, chosen by how many AI turns the
+    conversation already has, so concurrent runs do not share state.
+    Models that were never given tools (the fast path's summary call)
+    answer with `reply`. `latency` simulates the provider round trip.
+    """
+
+    script: List[Any] = DEFAULT_SCRIPT
+    reply: str = SUMMARY_REPLY
+    latency: float = 0.0
+    tools_bound: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ScriptedChatModel":
+        return self.model_copy(update={"tools_bound": True})
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        if not self.tools_bound:
+            return AIMessage(content=self.reply)
+
+        step = min(sum(isinstance(m, AIMessage) for m in messages), len(self.script) - 1)
+        outputs = " ".join(str(m.content) for m in messages if isinstance(m, ToolMessage))
+        handles, charts = _HANDLE.findall(outputs), _CHART.findall(outputs)
+        fill = {"dataset": handles[-1] if handles else "", "chart": charts[-1] if charts else ""}
+
+        action = self.script[step]
+        if isinstance(action, str):
+            return AIMessage(content=action.format(**fill))
+        calls = [
+            {
+                "name": name,
+                "args": {k: v.format(**fill) if isinstance(v, str) else v for k, v in args.items()},
+                "id": f"call_{step}_{i}",
+                "type": "tool_call",
+            }
+            for i, (name, args) in enumerate(action)
+        ]
+        return AIMessage(content="", tool_calls=calls)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
@@ -0,0 +1,184 @@
+"""
+Offline Alpha Vantage responses for the benchmarks.
+
+Fixture bodies live in FIXTURE_DIR as `<name>.json` (compact, full,
+synthetic_50k). `record` saves real responses for a symbol (needs the
+ALPHA_VANTAGE key); any fixture that has not been recorded is generated in
+the upstream format with the same number of bars, so runs stay
+reproducible without network access.
+
+    python -m apps.benchmarks.fixtures record IBM
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.services import alpha_vantage_client, chart_cache
+from apps.services.alpha_vantage_client import BASE_URL, SERIES, AlphaVantageClient
+from apps.services.chart_cache import ChartCache
+from apps.services.market_calendar import last_session_date
+from apps.services.price_store import PriceStore
+from apps.services.rate_limiter import RateLimiter
+from apps.services.series_parser import INTEGER_COLUMNS, SeriesLayout, parse_series
+
+FIXTURE_DIR = Path(os.getenv("BENCH_FIXTURE_DIR") or Path(__file__).resolve().parent / "fixtures")
+
+# fixture name -> bars
+FIXTURE_ROWS: Dict[str, int] = {"compact": 100, "full": 6500, "synthetic_50k": 50_000}
+# Symbols that always get a specific fixture; others follow outputsize.
+SYMBOL_FIXTURES: Dict[str, str] = {"SYN50K": "synthetic_50k"}
+
+DAILY = SERIES["daily"][1]
+
+
+def synthetic_body(layout: SeriesLayout, rows: int = 6500, seed: int = 7) -> bytes:
+    """A response body in the upstream format with `rows` bars up to the last session."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(last_session_date())
+    intraday = "min)" in layout.key
+    if intraday:
+        stamps = pd.date_range(end=end + pd.Timedelta(hours=16), periods=rows, freq="min")
+        fmt = "%Y-%m-%d %H:%M:%S"
+    else:
+        stamps = pd.bdate_range(end=end, periods=rows)
+        fmt = "%Y-%m-%d"
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02 if rows < 20_000 else 0.005, rows)))
+    values = {
+        "open": close * (1 + rng.normal(0, 0.005, rows)),
+        "high": close * 1.01, "low": close * 0.99, "close": close, "adjusted_close": close * 0.98,
+        "volume": rng.integers(100_000, 50_000_000, rows),
+        "dividend": np.zeros(rows), "split_coefficient": np.ones(rows),
+    }
+    series = {}
+    for i in range(rows - 1, -1, -1):
+        series[stamps[i].strftime(fmt)] = {
+            f"{n}. {column.replace('_', ' ')}": (
+                str(values[column][i]) if column in INTEGER_COLUMNS else f"{values[column][i]:.4f}"
+            )
+            for n, column in enumerate(layout.columns, start=1)
+        }
+    body = {"Meta Data": {"1. Information": "Synthetic benchmark fixture"}, layout.key: series}
+    return json.dumps(body, indent=4).encode()
+
+
+@lru_cache(maxsize=None)
+def fixture_body(name: str) -> bytes:
+    """The recorded body for `name`, or a generated one of the same size."""
+    path = FIXTURE_DIR / f"{name}.json"
+    if path.exists():
+        return path.read_bytes()
+    return synthetic_body(DAILY, FIXTURE_ROWS[name])
+
+
+def record(symbol: str, client: Optional[AlphaVantageClient] = None) -> Dict[str, int]:
+    """Save live compact and full daily responses for `symbol`; returns bars per fixture."""
+    client = client or AlphaVantageClient(store=None)
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    saved = {}
+    for name in ("compact", "full"):
+        params = {"function": "TIME_SERIES_DAILY", "symbol": symbol.upper(),
+                  "outputsize": name, "apikey": client.api_key}
+        client.limiter.acquire()
+        response = client.session.get(BASE_URL, params=params, timeout=60)
+        response.raise_for_status()
+        frame, head = parse_series([response.content], DAILY)
+        if frame.empty:
+            raise RuntimeError(f"No bars in the {name} response: {head[:200]!r}")
+        (FIXTURE_DIR / f"{name}.json").write_bytes(response.content)
+        saved[name] = len(frame)
+    fixture_body.cache_clear()
+    return saved
+
+
+class _FixtureResponse:
+    status_code = 200
+    raw = None
+
+    def __init__(self, body: bytes):
+        self.content = body
+
+    def iter_content(self, chunk_size: int):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+class FixtureSession:
+    """
+    Stands in for the requests.Session used by AlphaVantageClient: every
+    GET is answered with a fixture body after `latency` seconds.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.calls += 1
+        params = params or {}
+        name = SYMBOL_FIXTURES.get(params.get("symbol", "")) or (
+            "full" if params.get("outputsize") == "full" else "compact"
+        )
+        if self.latency:
+            time.sleep(self.latency)
+        return _FixtureResponse(fixture_body(name))
+
+
+def fixture_client(store: Optional[PriceStore] = None, latency: float = 0.0) -> AlphaVantageClient:
+    """A client answered from fixtures, with no quota limits."""
+    return AlphaVantageClient(
+        api_key="fixture",
+        store=store,
+        session=FixtureSession(latency),
+        limiter=RateLimiter(per_minute=10 ** 9, per_day=10 ** 9),
+    )
+
+
+@contextmanager
+def offline(store: Optional[PriceStore] = None, latency: float = 0.0) -> Iterator[AlphaVantageClient]:
+    """
+    Serve the process-wide client from fixtures and write charts to a
+    temporary directory for the duration of the block.
+    """
+    saved_client, saved_charts = alpha_vantage_client._client, chart_cache._default_cache
+    saved_provider = os.environ.get("PRICE_PROVIDER")
+    with tempfile.TemporaryDirectory() as charts:
+        alpha_vantage_client._client = fixture_client(store, latency)
+        chart_cache._default_cache = ChartCache(Path(charts))
+        os.environ["PRICE_PROVIDER"] = "alpha_vantage"
+        try:
+            yield alpha_vantage_client._client
+        finally:
+            alpha_vantage_client._client = saved_client
+            chart_cache._default_cache = saved_charts
+            if saved_provider is None:
+                os.environ.pop("PRICE_PROVIDER", None)
+            else:
+                os.environ["PRICE_PROVIDER"] = saved_provider
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record Alpha Vantage fixtures for the benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="save live compact/full daily responses")
+    rec.add_argument("symbol")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        for name, rows in record(args.symbol).items():
+            print(f"{FIXTURE_DIR / (name + '.json')}: {rows} bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Timing, reporting and baseline comparison shared by the benchmark scenarios."""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return float("nan")
+    rank = q / 100 * (len(ordered) - 1)
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+@dataclass
+class Result:
+    name: str
+    samples: List[float]
+    wall: float
+    errors: int = 0
+    peak_rss_mb: Optional[float] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        ms = [s * 1000 for s in self.samples]
+        return {
+            "n": len(ms),
+            "errors": self.errors,
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p90_ms": round(percentile(ms, 90), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+            "mean_ms": round(statistics.fmean(ms), 3) if ms else None,
+            "throughput_per_s": round(len(ms) / self.wall, 2) if self.wall else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            **self.extra,
+        }
+
+
+def run_serial(name: str, fn: Callable[[], Any], repeat: int, warmup: int = 1,
+               check: Optional[Callable[[Any], bool]] = None) -> Result:
+    """Call `fn` `repeat` times in a row; `check` marks a return value as an error."""
+    for _ in range(warmup):
+        fn()
+    samples, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        value = fn()
+        samples.append(time.perf_counter() - t0)
+        if check is not None and not check(value):
+            errors += 1
+    wall = time.perf_counter() - started
+    return Result(name, samples, wall, errors, peak_rss_mb())
+
+
+async def run_concurrent(name: str, fn: Callable[[], Awaitable[bool]], requests: int,
+                         concurrency: int) -> Result:
+    """Issue `requests` calls of `fn` with at most `concurrency` in flight; fn returns success."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                ok = await fn()
+            except Exception:
+                ok = False
+            samples.append(time.perf_counter() - t0)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - started
+    return Result(name, samples, wall, errors, peak_rss_mb(), {"concurrency": concurrency})
+
+
+def report(results: List[Result]) -> str:
+    lines = [f"{'scenario':<40} {'n':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+             f"{'req/s':>9} {'err':>4} {'rss MB':>8}"]
+    for result in results:
+        s = result.summary()
+        lines.append(
+            f"{result.name:<40} {s['n']:>5} {s['p50_ms']:>9.2f} {s['p90_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+            f"{s['throughput_per_s'] or 0:>9.1f} {s['errors']:>4} {s['peak_rss_mb'] or 0:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(results: List[Result], path: Path) -> None:
+    data = {r.name: r.summary() for r in results}
+    path.write_text(json.dumps(data, indent=2, sort_keys=True))
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float = 0.2) -> List[str]:
+    """
+    Regressions against a stored baseline: p50/p90 latency more than
+    `tolerance` slower, throughput more than `tolerance` lower, or new
+    errors. Scenarios missing from the baseline are skipped.
+    """
+    problems = []
+    for result in results:
+        before = baseline.get(result.name)
+        if not before:
+            continue
+        now = result.summary()
+        for key in ("p50_ms", "p90_ms"):
+            if before.get(key) and now[key] > before[key] * (1 + tolerance):
+                problems.append(f"{result.name}: {key} {before[key]:.2f} -> {now[key]:.2f}")
+        if before.get("throughput_per_s") and now["throughput_per_s"] is not None \
+                and now["throughput_per_s"] < before["throughput_per_s"] / (1 + tolerance):
+            problems.append(f"{result.name}: throughput {before['throughput_per_s']:.1f} "
+                            f"-> {now['throughput_per_s']:.1f}/s")
+        if now["errors"] > before.get("errors", 0):
+            problems.append(f"{result.name}: errors {before.get('errors', 0)} -> {now['errors']}")
+    return problems
@@ -0,0 +1,102 @@
+"""
+Parse time and peak memory of decoding an Alpha Vantage time-series body.
+
+Compares the previous decoder (response.json() -> DataFrame.from_dict ->
+to_datetime -> astype), the same dict-based path with orjson when it is
+installed, and the streaming SeriesParser fed in CHUNK_BYTES chunks.
+
+    python -m apps.benchmarks.parse_series                  # synthetic full history
+    python -m apps.benchmarks.parse_series --fixture ibm_full.json --series daily
+
+Without --fixture a response is generated in the upstream format (newest
+bar first, 4-space indented), sized like a full daily history.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from apps.benchmarks.fixtures import synthetic_body
+from apps.services.alpha_vantage_client import SERIES
+from apps.services.series_parser import CHUNK_BYTES, INTEGER_COLUMNS, SeriesLayout, parse_series
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+def _from_dict(data: Dict, layout: SeriesLayout) -> pd.DataFrame:
+    df = pd.DataFrame.from_dict(data[layout.key], orient="index")
+    df.columns = list(layout.columns)
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index()
+    return df.astype({c: (int if c in INTEGER_COLUMNS else float) for c in layout.columns})
+
+
+def decode_json(body: bytes, layout: SeriesLayout) -> pd.DataFrame:
+    """The decoder fetch_daily used before the streaming parser."""
+    return _from_dict(json.loads(body), layout)
+
+
+def decode_orjson(body: bytes, layout: SeriesLayout) -> pd.DataFrame:
+    return _from_dict(orjson.loads(body), layout)
+
+
+def decode_streamed(body: bytes, layout: SeriesLayout) -> pd.DataFrame:
+    chunks = (body[i:i + CHUNK_BYTES] for i in range(0, len(body), CHUNK_BYTES))
+    return parse_series(chunks, layout)[0]
+
+
+def measure(decode: Callable, body: bytes, layout: SeriesLayout, repeat: int) -> Dict[str, float]:
+    decode(body, layout)  # warm-up
+    times: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(body, layout)
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        decode(body, layout)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ms": statistics.median(times) * 1000, "peak_mb": peak / 1e6}
+
+
+def run(body: bytes, layout: SeriesLayout, repeat: int = 10) -> Dict[str, Dict[str, float]]:
+    decoders = {"json+from_dict": decode_json, "streamed": decode_streamed}
+    if orjson is not None:
+        decoders["orjson+from_dict"] = decode_orjson
+
+    reference = decode_json(body, layout)
+    results = {}
+    for name, decode in decoders.items():
+        pd.testing.assert_frame_equal(decode(body, layout), reference, check_freq=False)
+        results[name] = measure(decode, body, layout, repeat)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixture", type=Path, help="recorded response body (JSON)")
+    parser.add_argument("--series", default="daily", choices=sorted(SERIES))
+    parser.add_argument("--rows", type=int, default=6500, help="bars in the synthetic body")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    layout = SERIES[args.series][1]
+    body = args.fixture.read_bytes() if args.fixture else synthetic_body(layout, args.rows)
+    print(f"{args.series}: {len(body) / 1e6:.2f} MB body")
+    for name, result in run(body, layout, args.repeat).items():
+        print(f"  {name:<18} {result['ms']:8.1f} ms  {result['peak_mb']:8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Cold-start budget: import time of the app and latency of the first
+requests a fresh worker serves.
+
+    python -m apps.benchmarks.startup
+    python -m apps.benchmarks.startup --no-prewarm     # compare against lazy start-up
+    python -m apps.benchmarks.startup --import-budget 1.5 --first-request-budget 1.0
+
+Each measurement runs in a fresh interpreter. First requests use the
+offline fixtures and the scripted LLM (see apps.benchmarks.endpoint), so
+they measure our start-up work, not Gemini or Alpha Vantage. Exits 1
+when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "1.5"))
+FIRST_REQUEST_BUDGET = float(os.getenv("STARTUP_FIRST_REQUEST_BUDGET_SECONDS", "1.0"))
+
+_IMPORT_PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def _python(args: List[str], env: Dict[str, str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, **(env or {})}, check=True,
+    )
+
+
+def import_seconds(module: str = "apps.main", runs: int = 3) -> float:
+    """Median wall time of `import module` in a fresh interpreter."""
+    return statistics.median(
+        float(_python(["-c", _IMPORT_PROBE.format(module=module)]).stdout.strip().splitlines()[-1])
+        for _ in range(runs)
+    )
+
+
+def slowest_imports(module: str = "apps.main", top: int = 10) -> List[Dict[str, Any]]:
+    """Top-level packages by cumulative import time (python -X importtime)."""
+    stderr = _python(["-X", "importtime", "-c", f"import {module}"]).stderr
+    # Children are listed (indented one level deeper) before their parent.
+    children: Dict[str, int] = {}
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            children[name.strip()] = int(cumulative)
+        elif level == 0:
+            if name.strip() == module:
+                packages = children
+            children = {}
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return [{"module": name, "seconds": round(us / 1e6, 3)} for name, us in ranked]
+
+
+def _first_requests() -> Dict[str, Any]:
+    """Runs in the child: start the app, wait for readiness, time the first requests."""
+    started = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from apps.agents import agent
+    from apps.benchmarks.endpoint import QUERIES
+    from apps.benchmarks.fake_llm import ScriptedChatModel
+    from apps.benchmarks.fixtures import offline
+    from apps.main import app
+
+    imported = time.perf_counter() - started
+    agent._get_llm = lambda: ScriptedChatModel()
+    result: Dict[str, Any] = {"import_seconds": round(imported, 3)}
+
+    with offline(), TestClient(app) as client:
+        t0 = time.perf_counter()
+        while client.get("/health/ready").status_code != 200 and time.perf_counter() - t0 < 120:
+            time.sleep(0.05)
+        health = client.get("/health").json()
+        result["ready_seconds"] = round(time.perf_counter() - started, 3)
+        result["components"] = health["components"]
+
+        t0 = time.perf_counter()
+        response = client.get("/api/analysis/IBM", params={"summary": "false", "range_days": 365})
+        result["first_analysis"] = {"seconds": round(time.perf_counter() - t0, 3),
+                                    "status": response.status_code}
+
+        executor = health["components"].get("agent_executor", {})
+        if executor.get("state") == "failed":
+            result["first_agent_query"] = {"skipped": executor.get("error")}
+        else:
+            t0 = time.perf_counter()
+            response = client.post("/api/agent/query", json={"input": QUERIES["agent"], "mode": "agent"})
+            result["first_agent_query"] = {"seconds": round(time.perf_counter() - t0, 3),
+                                           "status": response.status_code}
+    return result
+
+
+def first_requests(prewarm: bool = True) -> Dict[str, Any]:
+    env = {"PREWARM": "1" if prewarm else "0", "RESPONSE_CACHE_ENABLED": "0"}
+    out = _python(["-m", "apps.benchmarks.startup", "--child"], env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold-start budget check.")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET)
+    parser.add_argument("--first-request-budget", type=float, default=FIRST_REQUEST_BUDGET)
+    parser.add_argument("--no-prewarm", action="store_true", help="start without the warm-up hook")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_first_requests()))
+        return 0
+
+    problems = []
+    seconds = import_seconds()
+    print(f"import apps.main: {seconds:.3f}s (budget {args.import_budget:.2f}s)")
+    for entry in slowest_imports():
+        print(f"  {entry['module']:<45} {entry['seconds']:.3f}s")
+    if seconds > args.import_budget:
+        problems.append(f"import time {seconds:.3f}s > {args.import_budget:.2f}s")
+
+    result = first_requests(prewarm=not args.no_prewarm)
+    print(f"ready after {result['ready_seconds']:.3f}s "
+          f"({'prewarmed' if not args.no_prewarm else 'no prewarm'})")
+    for name, state in result["components"].items():
+        print(f"  {name:<20} {state['state']:<8} {state.get('seconds', 0):.3f}s {state.get('error', '')[:60]}")
+    for name in ("first_analysis", "first_agent_query"):
+        entry = result[name]
+        if "skipped" in entry:
+            print(f"{name}: skipped ({entry['skipped'][:80]})")
+            continue
+        print(f"{name}: {entry['seconds']:.3f}s (HTTP {entry['status']}, budget {args.first_request_budget:.2f}s)")
+        if entry["status"] != 200 or entry["seconds"] > args.first_request_budget:
+            problems.append(f"{name} {entry['seconds']:.3f}s, HTTP {entry['status']}")
+
+    if problems:
+        print("\nOVER BUDGET:\n" + "\n".join(f"  {p}" for p in problems))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Per-tool latency on the offline fixtures."""
+import tempfile
+from pathlib import Path
+from typing import Iterable, List
+
+from apps.agents.tools import (
+    backtest_strategy,
+    bollinger_bands,
+    calculate_stats,
+    fetch_stock_prices,
+    generate_plot,
+    moving_averages,
+)
+from apps.benchmarks.fixtures import offline
+from apps.benchmarks.harness import Result, run_serial
+from apps.services import chart_cache
+from apps.services.chart_cache import ChartCache
+from apps.services.dataset_registry import dataset_scope
+from apps.services.price_store import PriceStore
+
+SIZES = ("compact", "full", "synthetic_50k")
+
+
+def _ok(value) -> bool:
+    if isinstance(value, dict):
+        return "error" not in value
+    return not str(value).startswith("ERROR")
+
+
+def _fetch_args(size: str) -> dict:
+    return {
+        "symbol": "SYN50K" if size == "synthetic_50k" else "IBM",
+        "output_size": "compact" if size == "compact" else "full",
+    }
+
+
+def tool_scenarios(sizes: Iterable[str] = SIZES, repeat: int = 20, plot_repeat: int = 5) -> List[Result]:
+    """
+    Time every tool on each fixture size. fetch_stock_prices is measured
+    uncached (decode every call) and from the price store; generate_plot
+    both rendering and served from the chart cache.
+    """
+    results: List[Result] = []
+    with offline(), dataset_scope():
+        for size in sizes:
+            fetch = _fetch_args(size)
+            results.append(run_serial(
+                f"fetch_stock_prices[{size}]", lambda: fetch_stock_prices.invoke(fetch), repeat, check=_ok
+            ))
+            handle = fetch_stock_prices.invoke(fetch).split()[1]
+
+            for name, tool, args in (
+                ("moving_averages", moving_averages, {"windows": "5,20,50"}),
+                ("moving_averages[last_n=5]", moving_averages, {"windows": "5,20,50", "last_n": 5}),
+                ("bollinger_bands", bollinger_bands, {"window": 20}),
+                ("calculate_stats", calculate_stats, {}),
+                # Grids sized to fit the 100-bar compact series.
+                ("backtest_strategy[crossover]", backtest_strategy,
+                 {"fast_windows": "2-20:2", "slow_windows": "10-60:2", "top_n": 5}),
+                ("backtest_strategy[bands]", backtest_strategy,
+                 {"strategy": "bollinger_reversion", "band_windows": "5-50:5", "top_n": 5}),
+            ):
+                call = {"csv_data": handle, **args}
+                results.append(run_serial(f"{name}[{size}]", lambda: tool.invoke(call), repeat, check=_ok))
+
+            def render_cold():
+                # A fresh cache directory per call forces a render.
+                shared = chart_cache._default_cache
+                with tempfile.TemporaryDirectory() as tmp:
+                    chart_cache._default_cache = ChartCache(Path(tmp))
+                    try:
+                        return generate_plot.invoke({"csv_data": handle})
+                    finally:
+                        chart_cache._default_cache = shared
+
+            results.append(run_serial(f"generate_plot[{size},render]", render_cold, plot_repeat, check=_ok))
+            results.append(run_serial(
+                f"generate_plot[{size},cached]", lambda: generate_plot.invoke({"csv_data": handle}),
+                repeat, check=_ok,
+            ))
+
+    with tempfile.TemporaryDirectory() as tmp, offline(store=PriceStore(Path(tmp))), dataset_scope():
+        for size in (s for s in sizes if s != "compact"):
+            fetch = _fetch_args(size)
+            results.append(run_serial(
+                f"fetch_stock_prices[{size},stored]", lambda: fetch_stock_prices.invoke(fetch),
+                repeat, check=_ok,
+            ))
+    return results
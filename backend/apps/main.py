@@ -1,19 +1,66 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from pathlib import Path
 
 from apps.api.routes_health import router as health_router
-from apps.api.routes_agent import router as agent_router
+from apps.api.routes_agent import get_agent_executor, router as agent_router
+from apps.api.routes_alerts import router as alerts_router
+from apps.api.routes_analysis import router as analysis_router
+from apps.api.routes_series import router as series_router
+from apps.services.alpha_vantage_client import warm_session
+from apps.services.chart_renderer import warm_pool
+from apps.services.price_store import get_price_store
+from apps.services.scheduler import scheduler_task
+from apps.services.warmup import warm_task
 
 # Load environment variables from .env once at startup
 load_dotenv()
 
-app = FastAPI(title="AI Stock Analytics API")
+
+def _prewarm_components():
+    """Slow-to-build parts to prepare in the background (PREWARM=0 to skip)."""
+    if os.getenv("PREWARM", "1").lower() in ("0", "false", "no"):
+        return {}
+    return {
+        "agent_executor": get_agent_executor,
+        "http_pool": warm_session,
+        "render_pool": warm_pool,
+        "price_store": get_price_store,
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve immediately; /health reports when warm-up has finished.
+    task = warm_task(_prewarm_components())
+    # Watchlist precomputation and alert scan after each market close.
+    watchlist = scheduler_task()
+    yield
+    for background in (task, watchlist):
+        if background is not None and not background.done():
+            background.cancel()
+
+
+app = FastAPI(
+    title="AI Stock Analytics API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# Compress JSON bodies; SSE streams are left alone by the middleware.
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")))
 
 
 app.include_router(health_router)
 app.include_router(agent_router)
+app.include_router(analysis_router)
+app.include_router(series_router)
+app.include_router(alerts_router)
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
@@ -0,0 +1,496 @@
+"""
+Price alert rules evaluated against new daily bars.
+
+A rule compares two operands of one symbol: a price column, an indicator
+line or a constant, e.g. "close crosses above sma:50", "close below
+bb:20:2:lower" or "close above 250". Rules are stored as NumPy columns
+(symbol, operands, operator, last outcome), not objects. For each symbol
+the engine keeps the current and previous bar's value of every operand its
+rules use; a new bar recomputes those once per symbol, over only the last
+bars the longest window needs, with the same indicator code as the
+moving_averages / bollinger_bands tools. Checking then covers every rule
+at once with array comparisons: about a millisecond for 10k rules.
+
+Fired signals go into a bounded, sequence-numbered log that clients poll
+(`GET /api/alerts/signals?after=<id>`) or stream as SSE.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apps.analytics import IndicatorSpec, compute_indicators
+
+logger = logging.getLogger(__name__)
+
+ALERT_MAX_RULES = int(os.getenv("ALERT_MAX_RULES", "100000"))
+ALERT_MAX_SIGNALS = int(os.getenv("ALERT_MAX_SIGNALS", "10000"))
+
+PRICE_OPERANDS = ("open", "high", "low", "close", "volume")
+BANDS = ("upper", "mid", "lower")
+# Operator codes, in the order of the comparison stack in `evaluate`.
+OPERATORS = ("above", "below", "crosses_above", "crosses_below")
+_OPERATOR_ALIASES = {">": "above", "<": "below"}
+_RULE = re.compile(
+    r"^\s*(\S+)\s+(crosses[ _-]?above|crosses[ _-]?below|above|below|>|<)\s+(\S+)\s*$",
+    re.IGNORECASE,
+)
+_CONSTANT = -1
+
+
+@dataclass(frozen=True)
+class Operand:
+    """One side of a rule: a price column, an indicator line, or a constant."""
+    key: str
+    spec: Optional[IndicatorSpec] = None
+    value: float = float("nan")
+
+    @property
+    def constant(self) -> bool:
+        return self.key == ""
+
+    @property
+    def lookback(self) -> int:
+        return int(self.spec.params[0]) if self.spec is not None else 1
+
+
+def parse_operand(text: str) -> Operand:
+    """'close', 'sma:50', 'bb:20:2:lower' or a number."""
+    token = text.strip().lower()
+    try:
+        return Operand("", value=float(token))
+    except ValueError:
+        pass
+    if token in PRICE_OPERANDS:
+        return Operand(token)
+    kind, *args = token.split(":")
+    if kind == "sma" and len(args) == 1 and args[0].isdigit() and int(args[0]) >= 1:
+        spec = IndicatorSpec("sma", (float(args[0]),))
+        return Operand(spec.key, spec)
+    if kind == "bb" and len(args) == 3 and args[0].isdigit() and int(args[0]) >= 2 and args[2] in BANDS:
+        try:
+            num_std = float(args[1])
+        except ValueError:
+            num_std = 0.0
+        if num_std > 0:
+            spec = IndicatorSpec("bb", (float(args[0]), num_std))
+            return Operand(f"{spec.key}_{args[2]}", spec)
+    raise ValueError(
+        f"Bad operand '{text}': expected a number, one of {', '.join(PRICE_OPERANDS)}, "
+        "sma:<window> or bb:<window>:<num_std>:<upper|mid|lower>"
+    )
+
+
+def parse_rule(text: str) -> Tuple[Operand, str, Operand]:
+    """'close crosses above sma:50' -> (close, 'crosses_above', sma_50)."""
+    match = _RULE.match(text)
+    if not match:
+        raise ValueError(
+            f"Bad rule '{text}': expected '<operand> <above|below|crosses above|crosses below> <operand>'"
+        )
+    lhs, op, rhs = parse_operand(match.group(1)), match.group(2).lower(), parse_operand(match.group(3))
+    op = _OPERATOR_ALIASES.get(op) or re.sub(r"[ _-]?(above|below)$", r"_\1", op).lstrip("_")
+    if lhs.constant and rhs.constant:
+        raise ValueError(f"Bad rule '{text}': at least one side must be a price or indicator")
+    if lhs.constant:
+        # Keep constants on the right: "100 below close" is "close above 100".
+        swapped = {"above": "below", "below": "above",
+                   "crosses_above": "crosses_below", "crosses_below": "crosses_above"}
+        lhs, op, rhs = rhs, swapped[op], lhs
+    return lhs, op, rhs
+
+
+class AlertEngine:
+    """
+    Rules grouped by symbol and operand, evaluated a bar at a time.
+
+    Level rules ("above" / "below") fire when they become true, crossing
+    rules when the relation flips between the previous and the current bar,
+    so a condition that stays true does not fire on every bar. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_rules: int = ALERT_MAX_RULES,
+        max_signals: int = ALERT_MAX_SIGNALS,
+        path: Optional[Path] = None,
+    ):
+        self.max_rules = max_rules
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._symbols: Dict[str, int] = {}
+        self._operands: Dict[str, Operand] = {}
+        self._operand_index: Dict[str, int] = {}
+        # Operand indices each symbol's rules use, and the last bar evaluated.
+        # A rule adding an operand resets the bar so on_bar computes it for
+        # the current bar too, remembering the bar in _replay meanwhile.
+        self._needed: List[set] = []
+        self._bar: List[Optional[str]] = []
+        self._replay: List[Optional[str]] = []
+        self._prev = np.empty((0, 0))
+        self._curr = np.empty((0, 0))
+        self._updated = np.zeros(0, dtype=bool)
+        self._replaying = np.zeros(0, dtype=bool)
+        # Rule columns.
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._sym = np.zeros(0, dtype=np.int32)
+        self._lhs = np.zeros(0, dtype=np.int32)
+        self._rhs = np.zeros(0, dtype=np.int32)
+        self._const = np.zeros(0, dtype=np.float64)
+        self._op = np.zeros(0, dtype=np.int8)
+        self._state = np.zeros(0, dtype=bool)
+        self._fresh = np.zeros(0, dtype=bool)  # not evaluated yet
+        self._text: Dict[int, Tuple[str, str]] = {}
+        self._next_id = 1
+        self._signals: "deque[Dict[str, Any]]" = deque(maxlen=max_signals)
+        self._next_signal = 1
+        self._counters = {"bars": 0, "evaluations": 0, "fired": 0}
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    # -- registration -------------------------------------------------
+
+    def _symbol(self, symbol: str) -> int:
+        if symbol not in self._symbols:
+            self._symbols[symbol] = len(self._symbols)
+            self._needed.append(set())
+            self._bar.append(None)
+            self._replay.append(None)
+            self._grow()
+        return self._symbols[symbol]
+
+    def _operand(self, operand: Operand) -> int:
+        if operand.constant:
+            return _CONSTANT
+        if operand.key not in self._operand_index:
+            self._operand_index[operand.key] = len(self._operand_index)
+            self._operands[operand.key] = operand
+            self._grow()
+        return self._operand_index[operand.key]
+
+    def _grow(self) -> None:
+        """Resize the (symbol x operand) value matrices; new cells are NaN."""
+        shape = (len(self._symbols), len(self._operand_index))
+        if self._curr.shape == shape:
+            return
+        for name in ("_prev", "_curr"):
+            old = getattr(self, name)
+            new = np.full(shape, np.nan)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+        grown = np.zeros(shape[0] - len(self._updated), dtype=bool)
+        self._updated = np.concatenate([self._updated, grown])
+        self._replaying = np.concatenate([self._replaying, grown])
+
+    def add_rules(self, rules: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Register (symbol, rule text) pairs in one batch; all or none are
+        added. Raises ValueError for a bad rule or when over `max_rules`.
+        """
+        parsed = [(symbol.strip().upper(), text.strip(), *parse_rule(text)) for symbol, text in rules]
+        with self._lock:
+            if len(self._ids) + len(parsed) > self.max_rules:
+                raise ValueError(f"At most {self.max_rules} alert rules can be registered")
+            ids = range(self._next_id, self._next_id + len(parsed))
+            self._next_id += len(parsed)
+            self._append(list(zip(ids, parsed)))
+            created = [self._describe(i) for i in ids]
+        self._save()
+        return created
+
+    def _append(self, rules: List[Tuple[int, Tuple[str, str, Operand, str, Operand]]]) -> None:
+        """Add parsed rules under the given ids to the rule columns. Caller holds the lock."""
+        rows = []
+        for rule_id, (symbol, text, lhs, op, rhs) in rules:
+            sym = self._symbol(symbol)
+            left, right = self._operand(lhs), self._operand(rhs)
+            new = {left, right} - {_CONSTANT} - self._needed[sym]
+            if new:
+                self._needed[sym].update(new)
+                if self._bar[sym] is not None:
+                    # Not computed for the latest bar yet: have on_bar redo it.
+                    self._replay[sym], self._bar[sym] = self._bar[sym], None
+            rows.append((rule_id, sym, left, right, rhs.value, OPERATORS.index(op)))
+            self._text[rule_id] = (symbol, text)
+        if rows:
+            ids, sym, lhs_i, rhs_i, const, op = (np.array(c) for c in zip(*rows))
+            self._ids = np.concatenate([self._ids, ids.astype(np.int64)])
+            self._sym = np.concatenate([self._sym, sym.astype(np.int32)])
+            self._lhs = np.concatenate([self._lhs, lhs_i.astype(np.int32)])
+            self._rhs = np.concatenate([self._rhs, rhs_i.astype(np.int32)])
+            self._const = np.concatenate([self._const, const.astype(np.float64)])
+            self._op = np.concatenate([self._op, op.astype(np.int8)])
+            self._state = np.concatenate([self._state, np.zeros(len(rows), dtype=bool)])
+            self._fresh = np.concatenate([self._fresh, np.ones(len(rows), dtype=bool)])
+
+    def remove_rule(self, rule_id: int) -> bool:
+        with self._lock:
+            keep = self._ids != rule_id
+            if keep.all():
+                return False
+            for name in ("_ids", "_sym", "_lhs", "_rhs", "_const", "_op", "_state", "_fresh"):
+                setattr(self, name, getattr(self, name)[keep])
+            self._text.pop(rule_id, None)
+            # Operands no rule of the symbol uses any more are left in place;
+            # they only cost one recomputed value per bar.
+        self._save()
+        return True
+
+    def _describe(self, rule_id: int) -> Dict[str, Any]:
+        symbol, text = self._text[rule_id]
+        return {"id": rule_id, "symbol": symbol, "rule": text}
+
+    def rules(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = [int(i) for i in self._ids]
+            described = [self._describe(i) for i in ids]
+        return [r for r in described if symbol is None or r["symbol"] == symbol.upper()]
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one rule."""
+        with self._lock:
+            active = set(np.unique(self._sym).tolist())
+            return [s for s, i in self._symbols.items() if i in active]
+
+    def lookback(self, symbol: str) -> int:
+        """Bars `on_bar` needs for `symbol`: its longest window plus the previous bar."""
+        with self._lock:
+            sym = self._symbols.get(symbol.upper())
+            needed = self._needed[sym] if sym is not None else ()
+            keys = [k for k, i in self._operand_index.items() if i in needed]
+            return max((self._operands[k].lookback for k in keys), default=1) + 1
+
+    # -- evaluation ---------------------------------------------------
+
+    def on_bar(self, symbol: str, frame: pd.DataFrame) -> bool:
+        """
+        Refresh `symbol`'s operand values from its bars (DatetimeIndex, OHLCV
+        columns, sorted) if the last bar is new. Only the last `lookback`
+        bars are read. Returns whether there was a new bar.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            sym = self._symbols.get(symbol)
+            if sym is None or frame.empty:
+                return False
+            last = frame.index[-1].strftime("%Y-%m-%d")
+            if self._bar[sym] == last:
+                return False
+            columns = sorted(self._needed[sym])
+            operands = [self._operands[k] for k, i in sorted(self._operand_index.items(), key=lambda kv: kv[1])]
+
+        used = [operands[i] for i in columns]
+        lookback = max((o.lookback for o in used), default=1) + 1
+        # A small frame of just the columns used: cheaper than slicing the full one.
+        prices = {
+            column: frame[column].to_numpy(np.float64)[-lookback:]
+            for column in {o.spec.column if o.spec is not None else o.key for o in used}
+        }
+        specs = list(dict.fromkeys(o.spec for o in used if o.spec is not None))
+        series = {}
+        if specs:
+            tail = pd.DataFrame({"date": frame.index[-lookback:], **prices}, copy=False)
+            series = compute_indicators(tail, specs).series
+        values = np.full((2, len(columns)), np.nan)
+        for j, operand in enumerate(used):
+            line = series[operand.key] if operand.spec is not None else prices[operand.key]
+            values[:, j] = line[-2:] if len(line) >= 2 else (np.nan, line[-1])
+
+        with self._lock:
+            self._prev[sym, columns] = values[0]
+            self._curr[sym, columns] = values[1]
+            self._bar[sym] = last
+            self._updated[sym] = True
+            # The bar was evaluated before: only rules added since are checked again.
+            self._replaying[sym] = self._replay[sym] == last
+            self._replay[sym] = None
+            self._counters["bars"] += 1
+        return True
+
+    def evaluate(self) -> List[Dict[str, Any]]:
+        """
+        Check every rule of the symbols that got a new bar since the last
+        call, all in one vectorized pass. Returns the signals fired.
+        """
+        with self._lock:
+            rules = np.flatnonzero(self._updated[self._sym] & (self._fresh | ~self._replaying[self._sym]))
+            self._updated[:] = False
+            self._replaying[:] = False
+            self._fresh[rules] = False
+            if rules.size == 0:
+                return []
+            sym, op = self._sym[rules], self._op[rules]
+            lhs, rhs = self._lhs[rules], self._rhs[rules]
+            constant = rhs == _CONSTANT
+            rhs_col = np.where(constant, 0, rhs)
+            lhs_now, lhs_then = self._curr[sym, lhs], self._prev[sym, lhs]
+            rhs_now = np.where(constant, self._const[rules], self._curr[sym, rhs_col])
+            rhs_then = np.where(constant, self._const[rules], self._prev[sym, rhs_col])
+
+            above, below = lhs_now > rhs_now, lhs_now < rhs_now
+            outcome = np.stack([
+                above,
+                below,
+                above & (lhs_then <= rhs_then),
+                below & (lhs_then >= rhs_then),
+            ])[op, np.arange(rules.size)]
+            # Level rules fire on the bar they become true; crossings are edges already.
+            level = op < 2
+            fired = outcome & ~(level & self._state[rules])
+            self._state[rules] = outcome
+            self._counters["evaluations"] += int(rules.size)
+
+            hits = np.flatnonzero(fired)
+            symbols = {i: s for s, i in self._symbols.items()}
+            now = datetime.now().astimezone().isoformat(timespec="seconds")
+            signals = []
+            for k in hits:
+                rule_id = int(self._ids[rules[k]])
+                signals.append({
+                    "id": self._next_signal,
+                    "rule_id": rule_id,
+                    "symbol": symbols[int(sym[k])],
+                    "rule": self._text[rule_id][1],
+                    "date": self._bar[int(sym[k])],
+                    "value": float(lhs_now[k]),
+                    "threshold": float(rhs_now[k]),
+                    "fired_at": now,
+                })
+                self._next_signal += 1
+            self._signals.extend(signals)
+            self._counters["fired"] += len(signals)
+        return signals
+
+    def scan(self, frames: Mapping[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+        """on_bar for every symbol in `frames`, then one evaluate()."""
+        for symbol, frame in frames.items():
+            self.on_bar(symbol, frame)
+        return self.evaluate()
+
+    # -- delivery -----------------------------------------------------
+
+    def signals(self, after: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Signals with id > `after`, oldest first (older ones may have been dropped)."""
+        with self._lock:
+            if not self._signals or self._signals[-1]["id"] <= after:
+                return []
+            newer = [s for s in self._signals if s["id"] > after]
+        return newer[:limit]
+
+    @property
+    def last_signal_id(self) -> int:
+        with self._lock:
+            return self._next_signal - 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "rules": len(self._ids),
+                "symbols": len(np.unique(self._sym)),
+                "operands": len(self._operand_index),
+                "signals": len(self._signals),
+            }
+
+    # -- persistence --------------------------------------------------
+
+    def _save(self) -> None:
+        """Write the rules to `path` (if set) so they survive restarts."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"next_id": self._next_id,
+                    "rules": [self._describe(int(i)) for i in self._ids]}
+        tmp = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Could not save alert rules: %s", e)
+            tmp.unlink(missing_ok=True)
+
+    def _load(self) -> None:
+        """Rebuild the rule columns from `path` in one batch (nothing is saved)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            rules = data["rules"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable alert rules %s: %s", self.path, e)
+            return
+        parsed: Dict[int, Tuple[str, str, Operand, str, Operand]] = {}
+        for rule in rules:
+            try:
+                symbol, text = rule["symbol"].strip().upper(), rule["rule"].strip()
+                parsed[int(rule["id"])] = (symbol, text, *parse_rule(text))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.warning("Skipping stored alert rule %s: %s", rule, e)
+        loaded = sorted(parsed.items())
+        if len(loaded) > self.max_rules:
+            logger.warning("Loading only the first %d of %d stored alert rules", self.max_rules, len(loaded))
+            loaded = loaded[:self.max_rules]
+        with self._lock:
+            self._append(loaded)
+            last_id = loaded[-1][0] if loaded else 0
+            try:
+                stored_next = int(data.get("next_id", 1))
+            except (ValueError, TypeError):
+                stored_next = 1
+            self._next_id = max(last_id + 1, stored_next)
+
+
+def scan_alerts(engine: Optional["AlertEngine"] = None) -> Dict[str, Any]:
+    """
+    Load the latest bars of every symbol with rules (from the price store;
+    upstream at most once per market close) and evaluate all rules.
+    """
+    from apps.services.alpha_vantage_client import COMPACT_ROWS, get_client
+
+    engine = engine or get_alert_engine()
+    symbols = engine.symbols()
+    started = time.perf_counter()
+    frames, errors = {}, {}
+    if symbols:
+        client = get_client()
+        compact = [s for s in symbols if engine.lookback(s) <= COMPACT_ROWS]
+        full = [s for s in symbols if s not in set(compact)]
+        for group, size in ((compact, "compact"), (full, "full")):
+            fetched, failed = client.fetch_many(group, size)
+            frames.update(fetched)
+            errors.update(failed)
+    fetched_at = time.perf_counter()
+    signals = engine.scan(frames)
+    return {
+        "symbols": len(symbols),
+        "fired": signals,
+        "errors": errors,
+        "fetch_seconds": round(fetched_at - started, 3),
+        "evaluate_seconds": round(time.perf_counter() - fetched_at, 4),
+    }
+
+
+_engine: Optional[AlertEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine() -> AlertEngine:
+    """Process-wide engine; rules persist to ALERT_RULES_PATH when it is set."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            path = os.getenv("ALERT_RULES_PATH")
+            _engine = AlertEngine(path=Path(path) if path else None)
+        return _engine
@@ -1,60 +1,478 @@
 import os
+import logging
+import random
+import threading
+import time
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
 import requests
 import pandas as pd
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from apps.services.market_calendar import last_session_date, trading_days_between
+from apps.services.price_store import PriceStore, date_slice, get_price_store
+from apps.services.rate_limiter import QuotaExceededError, RateLimiter
+from apps.services.series_parser import ADJUSTED_OHLCV, CHUNK_BYTES, OHLCV, SeriesLayout, parse_series
+from apps.services.single_flight import SingleFlight
+from apps.services.tracing import span
 
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE")
 
 BASE_URL = "https://www.alphavantage.co/query"
 
+# Number of most recent bars returned by outputsize=compact.
+COMPACT_ROWS = 100
+
+CONNECT_TIMEOUT = float(os.getenv("ALPHA_VANTAGE_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("ALPHA_VANTAGE_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("ALPHA_VANTAGE_MAX_RETRIES", "3"))
+# Longest a call may queue for a per-minute slot before giving up.
+MAX_QUEUE_WAIT = float(os.getenv("ALPHA_VANTAGE_MAX_QUEUE_WAIT", "60"))
+# Concurrent fetches in fetch_many; upstream calls are still paced by the quota scheduler.
+BATCH_WORKERS = int(os.getenv("ALPHA_VANTAGE_BATCH_WORKERS", "8"))
+# Queue wait for calls made by the current fetch_many (None: MAX_QUEUE_WAIT).
+_queue_wait: ContextVar[Optional[float]] = ContextVar("alpha_vantage_queue_wait", default=None)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 20.0
+
+INTRADAY_INTERVALS = ("1min", "5min", "15min", "30min", "60min")
+# series name -> (API function, response layout)
+SERIES: Dict[str, Tuple[str, SeriesLayout]] = {
+    "daily": ("TIME_SERIES_DAILY", SeriesLayout("Time Series (Daily)", OHLCV)),
+    "daily_adjusted": (
+        "TIME_SERIES_DAILY_ADJUSTED", SeriesLayout("Time Series (Daily)", ADJUSTED_OHLCV)
+    ),
+    "weekly": ("TIME_SERIES_WEEKLY", SeriesLayout("Weekly Time Series", OHLCV)),
+    **{
+        interval: ("TIME_SERIES_INTRADAY", SeriesLayout(f"Time Series ({interval})", OHLCV))
+        for interval in INTRADAY_INTERVALS
+    },
+}
+
+T = TypeVar("T")
+
+_DEFAULT_STORE = object()
+
+_shared_lock = threading.Lock()
+_shared_session: Optional[requests.Session] = None
+_shared_limiter: Optional[RateLimiter] = None
+_client: Optional["AlphaVantageClient"] = None
+
+
+class ClientMetrics:
+    """Thread-safe counters for upstream traffic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "rate_limited_replies": 0,
+            "request_seconds_total": 0.0,
+            "response_bytes_total": 0,
+        }
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.counters)
+
+
+METRICS = ClientMetrics()
+
+# Concurrent fetch_daily calls for the same (symbol, output_size) share one call.
+DAILY_FLIGHTS = SingleFlight()
+
+
+def get_shared_session() -> requests.Session:
+    """Process-wide keep-alive session so calls reuse TCP+TLS connections."""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            pool_size = int(os.getenv("ALPHA_VANTAGE_POOL_SIZE", "10"))
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=pool_size))
+            _shared_session = session
+        return _shared_session
+
+
+def warm_session() -> None:
+    """
+    Create the shared session and open a keep-alive connection to Alpha
+    Vantage, so the first fetch skips the TCP+TLS handshake. Uses the site
+    root, not the query endpoint, so no API quota is spent.
+    """
+    session = get_shared_session()
+    response = session.head(BASE_URL.rsplit("/", 1)[0] + "/", timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    response.close()
+
+
+def get_shared_limiter() -> RateLimiter:
+    """Process-wide quota scheduler shared by every client instance."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
+
+
+def get_client() -> "AlphaVantageClient":
+    """Process-wide client (shared session, limiter and price store)."""
+    global _client
+    if _client is None:
+        client = AlphaVantageClient()
+        with _shared_lock:
+            if _client is None:
+                _client = client
+    return _client
+
+
+def client_metrics() -> Dict[str, Any]:
+    """Upstream request counters plus quota usage, for monitoring."""
+    return {
+        **METRICS.snapshot(),
+        "quota": get_shared_limiter().snapshot(),
+        "single_flight": DAILY_FLIGHTS.stats(),
+    }
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with jitter, so retrying workers spread out."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+def _daily_key(
+    symbol: str, output_size: str, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]
+) -> Tuple[str, str, Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """Single-flight key for a daily fetch; also the arguments of _fetch_daily."""
+    return symbol.strip().upper(), output_size, start, end
+
+
 class AlphaVantageClient:
-    def __init__(self,api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        store: PriceStore = _DEFAULT_STORE,
+        session: Optional[requests.Session] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
         self.api_key = api_key or ALPHA_VANTAGE_API_KEY
         if not self.api_key:
             raise ValueError("ALPHA_VANTAGE_API_KEY not found in environment variables.")
-        
-    def fetch_daily(self, symbol:str, output_size:str = "compact") -> pd.DataFrame:
-        params = {
-            "function": "TIME_SERIES_DAILY",
-            "symbol": symbol,
-            "outputsize": output_size,
-            "apikey": self.api_key
-        }
+        # Pass store=None to always go upstream.
+        self.store = get_price_store() if store is _DEFAULT_STORE else store
+        self.session = session or get_shared_session()
+        self.limiter = limiter or get_shared_limiter()
+
+    def fetch_daily(
+        self,
+        symbol: str,
+        output_size: str = "compact",
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Daily OHLCV bars for `symbol`, served from the local price store.
+
+        Upstream is only asked for bars newer than the last stored date, and
+        only once per market close. 'compact' returns the latest ~100 bars,
+        'full' the whole stored history (fetching it once if needed);
+        `start`/`end` keep only the bars in [start, end), read from the
+        store as a range. Concurrent calls for the same arguments share one
+        fetch, so the returned frame may be shared: treat it as read-only.
+        """
+        key = _daily_key(symbol, output_size, start, end)
+        return DAILY_FLIGHTS.do(key, self._fetch_daily, *key)
+
+    async def afetch_daily(self, symbol: str, output_size: str = "compact") -> pd.DataFrame:
+        """fetch_daily for asyncio callers; joins in-flight calls from threads too."""
+        key = _daily_key(symbol, output_size, None, None)
+        return await DAILY_FLIGHTS.ado(key, self._fetch_daily, *key)
+
+    def needs_upstream(self, symbol: str, output_size: str = "compact") -> bool:
+        """Whether fetch_daily(symbol, output_size) would call upstream (not fresh in the store)."""
+        if self.store is None:
+            return True
+        meta = self.store.meta(symbol.strip().upper())
+        if meta is None or not self.store.is_fresh(meta):
+            return True
+        return output_size == "full" and not meta.has_full_history
+
+    def fetch_many(
+        self,
+        symbols: Iterable[str],
+        output_size: str = "compact",
+        max_workers: int = BATCH_WORKERS,
+        max_wait: Optional[float] = None,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        fetch_daily for several symbols at once. Stored symbols come back
+        immediately; upstream fetches share the quota scheduler, so a batch
+        larger than the quota fails per symbol rather than as a whole.
+        `max_wait` caps how long each upstream call queues for a slot
+        (default MAX_QUEUE_WAIT; 0 fails at once when the quota is busy).
+        Returns ({symbol: frame}, {symbol: error message}).
+        """
+        unique = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+        if not unique:
+            return frames, errors
+
+        token = _queue_wait.set(max_wait)
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+                # One context copy per task, so the worker threads see max_wait.
+                futures = {
+                    s: pool.submit(copy_context().run, self.fetch_daily, s, output_size) for s in unique
+                }
+                for symbol, future in futures.items():
+                    try:
+                        frames[symbol] = future.result()
+                    except (ValueError, RuntimeError) as e:
+                        errors[symbol] = str(e)
+        finally:
+            _queue_wait.reset(token)
+        return frames, errors
+
+    def _fetch_daily(
+        self,
+        symbol: str,
+        output_size: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        if self.store is None:
+            return self._select(self._fetch_daily_upstream(symbol, output_size), output_size, start, end)
+
+        tail = COMPACT_ROWS if output_size == "compact" else None
+        with self.store.lock(symbol):
+            meta = self.store.meta(symbol)
+            needs_full = output_size == "full" and not (meta and meta.has_full_history)
+
+            if meta is not None and not needs_full and self.store.is_fresh(meta):
+                df = self.store.load(symbol, start, end, tail=tail)
+                if df is not None:
+                    return df
+
+            if meta is None or needs_full:
+                upstream_size = output_size
+            else:
+                gap = trading_days_between(meta.last_bar, last_session_date())
+                upstream_size = "compact" if gap < COMPACT_ROWS else "full"
+
+            try:
+                fresh = self._fetch_daily_upstream(symbol, upstream_size)
+            except RuntimeError as e:
+                # Quota or transient upstream trouble: stale bars beat no bars.
+                stale = self.store.load(symbol, start, end, tail=tail) if meta is not None else None
+                if stale is None:
+                    raise
+                logger.warning("Serving stored bars for %s after upstream error: %s", symbol, e)
+                return stale
+
+            if meta is not None and not needs_full and not fresh.empty \
+                    and fresh.index[-1].strftime("%Y-%m-%d") <= meta.last_date:
+                self.store.mark_checked(symbol)
+            else:
+                self.store.write(symbol, fresh, full_history=(upstream_size == "full"))
+
+            df = self.store.load(symbol, start, end, tail=tail)
+            if df is None:
+                logger.warning("Stored bars for %s could not be read; serving the upstream response", symbol)
+                return self._select(fresh, output_size, start, end)
+            return df
 
-        response = requests.get(BASE_URL,params=params)
-        data = response.json()
-        if "Error Message" in data:
-            raise ValueError(f"Invalid symbol or API error: {data['Error Message']}")
+    @staticmethod
+    def _trim(df: pd.DataFrame, output_size: str) -> pd.DataFrame:
+        return df.tail(COMPACT_ROWS) if output_size == "compact" else df
 
-        if "Note" in data:
-            raise RuntimeError(
-                "API rate limit exceeded. Alpha Vantage free tier allows ~25 calls/day."
-            )
+    @classmethod
+    def _select(
+        cls,
+        df: pd.DataFrame,
+        output_size: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """The bars of `output_size`, then only those in [start, end)."""
+        df = cls._trim(df, output_size)
+        if start is None and end is None:
+            return df
+        return df.iloc[date_slice(df.index.values, start, end)]
 
-        if "Time Series (Daily)" not in data:
+    def _get_json(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        GET the Alpha Vantage query endpoint through the quota scheduler.
+
+        Connection errors, timeouts, 5xx/429 responses and per-minute
+        rate-limit notes are retried with jittered backoff. A daily-limit
+        note stops further calls until the quota resets; any other note
+        (premium endpoint, invalid key) fails at once.
+        """
+        return self._request(params, lambda response: _checked(response.json()))
+
+    def _get_series(self, params: Dict[str, str], layout: SeriesLayout) -> pd.DataFrame:
+        """
+        Like _get_json, but streams the body through a SeriesParser so the
+        bars are decoded into typed columns chunk by chunk.
+        """
+        def parse(response: requests.Response) -> pd.DataFrame:
+            frame, head = parse_series(response.iter_content(CHUNK_BYTES), layout)
+            if len(frame):
+                return frame
+            try:
+                data = json.loads(head)
+            except ValueError:
+                raise RuntimeError("Unexpected API response format.")
+            _checked(data)
             raise RuntimeError("Unexpected API response format.")
-        
 
-        ts = data["Time Series (Daily)"]
+        return self._request(params, parse)
+
+    def _request(self, params: Dict[str, str], parse: Callable[[requests.Response], T]) -> T:
+        params = {**params, "apikey": self.api_key}
+        last_error = "unknown error"
+
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                METRICS.inc("retries")
+                time.sleep(_backoff(attempt - 1))
+
+            try:
+                queue_wait = _queue_wait.get()
+                self.limiter.acquire(max_wait=MAX_QUEUE_WAIT if queue_wait is None else queue_wait)
+            except QuotaExceededError as e:
+                METRICS.inc("failures")
+                raise RuntimeError(f"API rate limit exceeded. {e}") from e
+
+            METRICS.inc("requests")
+            with span("http", "alpha_vantage", function=params.get("function", "")) as attrs:
+                started = time.perf_counter()
+                try:
+                    response = self.session.get(
+                        BASE_URL, params=params, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    METRICS.inc("request_seconds_total", time.perf_counter() - started)
+                    last_error = attrs["outcome"] = f"network error: {e}"
+                    continue
+
+                try:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        last_error = attrs["outcome"] = f"HTTP {response.status_code}"
+                        continue
+                    if response.status_code >= 400:
+                        METRICS.inc("failures")
+                        raise RuntimeError(f"Alpha Vantage returned HTTP {response.status_code}.")
+                    result = parse(response)
+                    if isinstance(result, pd.DataFrame):
+                        attrs["rows"] = len(result)
+                    return result
+                except _RateLimited:
+                    self.limiter.penalize()
+                    last_error = attrs["outcome"] = "rate limited"
+                    continue
+                except _DailyLimit:
+                    self.limiter.exhaust_day()
+                    METRICS.inc("failures")
+                    raise RuntimeError(
+                        "API rate limit exceeded. Alpha Vantage free tier allows ~25 calls/day."
+                    )
+                except _Notice as e:
+                    METRICS.inc("failures")
+                    attrs["outcome"] = "notice"
+                    raise RuntimeError(f"Alpha Vantage declined the request: {e}")
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    # Dropped while streaming the body
+                    last_error = attrs["outcome"] = f"network error: {e}"
+                    continue
+                finally:
+                    received = response.raw.tell() if response.raw else 0
+                    attrs["bytes"] = received
+                    METRICS.inc("request_seconds_total", time.perf_counter() - started)
+                    METRICS.inc("response_bytes_total", received)
+                    response.close()
+
+        METRICS.inc("failures")
+        raise RuntimeError(f"Alpha Vantage request failed after {MAX_RETRIES + 1} attempts ({last_error}).")
+
+    def fetch_series(
+        self,
+        symbol: str,
+        series: str = "daily",
+        output_size: str = "compact",
+        month: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Bars of any supported series straight from upstream (no price store):
+        'daily', 'daily_adjusted', 'weekly' or an intraday interval
+        ('1min', '5min', '15min', '30min', '60min'). For intraday, `month`
+        ('YYYY-MM') selects a historical month instead of the latest bars.
+        """
+        if series not in SERIES:
+            raise ValueError(f"Unsupported series '{series}'. Supported: {', '.join(SERIES)}")
+        function, layout = SERIES[series]
+        params = {"function": function, "symbol": symbol.strip().upper()}
+        if series != "weekly":
+            params["outputsize"] = output_size
+        if series in INTRADAY_INTERVALS:
+            params["interval"] = series
+            if month:
+                params["month"] = month
+        return self._get_series(params, layout)
+
+    def _fetch_daily_upstream(self, symbol: str, output_size: str = "compact") -> pd.DataFrame:
+        return self.fetch_series(symbol, "daily", output_size)
+
+
+class _RateLimited(Exception):
+    """Per-minute rate-limit note: retry after backing off."""
+
+
+class _DailyLimit(Exception):
+    """Daily quota note: stop calling until the quota resets."""
+
 
-        df = pd.DataFrame.from_dict(ts,orient="index")
+class _Notice(Exception):
+    """Any other note (premium endpoint, invalid or demo key): retrying cannot help."""
 
-        df.index = pd.to_datetime(df.index)
 
-        df.columns = ["open","high","low","close","volume"]
+# Alpha Vantage sends all of these as "Note" or "Information". The old
+# per-minute note also mentions the daily allowance ("5 calls per minute and
+# 500 calls per day"), so it is matched first.
+_MINUTE_LIMIT_NOTE = re.compile(
+    r"calls? per minute|requests? per second|spreading out your free api requests", re.IGNORECASE
+)
+_DAY_LIMIT_NOTE = re.compile(r"requests? per day|daily rate limits?", re.IGNORECASE)
 
-        df = df.astype({
-            "open": float,
-            "high": float,
-            "low": float,
-            "close": float,
-            "volume": int
-        })
 
-        # Sort by date
-        df = df.sort_index()
+def _checked(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise for error and rate-limit payloads; return `data` otherwise."""
+    if "Error Message" in data:
+        raise ValueError(f"Invalid symbol or API error: {data['Error Message']}")
 
-        return df
+    note = data.get("Note") or data.get("Information")
+    if note and not any(key.startswith("Time Series") or key.endswith("Time Series") for key in data):
+        if _MINUTE_LIMIT_NOTE.search(note):
+            METRICS.inc("rate_limited_replies")
+            raise _RateLimited(note)
+        if _DAY_LIMIT_NOTE.search(note):
+            METRICS.inc("rate_limited_replies")
+            raise _DailyLimit(note)
+        raise _Notice(note)
+    return data
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Base folder: apps/static/charts (relative to this file)
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../backend/apps
+DEFAULT_CHARTS_DIR = BASE_DIR / "static" / "charts"
+
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CHART_CACHE_MAX_AGE = float(os.getenv("CHART_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+
+CHART_PREFIX = "chart_"
+
+
+def chart_key(frame: pd.DataFrame, x: str, y: str, chart_type: str, style: Dict[str, Any]) -> str:
+    """
+    Content hash of everything that determines a chart's pixels: the plotted
+    columns (values, not object identity), axis names, chart type and style.
+    """
+    h = hashlib.blake2b(digest_size=12)
+    h.update(json.dumps([x, y, chart_type, style], sort_keys=True, default=str).encode())
+    h.update(pd.util.hash_pandas_object(frame[[x, y]], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class ChartCache:
+    """
+    Content-addressed PNG directory served under /static/charts.
+
+    Files are named after their chart key, so a repeat request maps to the
+    same file. A hit refreshes the file's mtime; eviction removes files not
+    used within `max_age` seconds, then least recently used files until the
+    directory is under `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: int = CHART_CACHE_MAX_BYTES,
+        max_age: float = CHART_CACHE_MAX_AGE,
+    ):
+        self.root = Path(root or os.getenv("CHART_CACHE_DIR") or DEFAULT_CHARTS_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{CHART_PREFIX}{key}.png"
+
+    @staticmethod
+    def url_for(path: Path) -> str:
+        return f"/static/charts/{path.name}"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        with self._lock:
+            self._counters["hits"] += 1
+        return path
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Apply the age and size limits. Returns the number of files removed."""
+        now = time.time() if now is None else now
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.name.startswith(CHART_PREFIX) or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        if removed:
+            with self._lock:
+                self._counters["evicted"] += removed
+            logger.info("Evicted %d cached charts from %s", removed, self.root)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
+
+
+_default_cache: Optional[ChartCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> ChartCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ChartCache()
+        return _default_cache
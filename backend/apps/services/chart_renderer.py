@@ -0,0 +1,128 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from apps.services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT_SECONDS", "30"))
+
+# Anything that changes the pixels belongs here: it is part of the cache key.
+CHART_STYLE: Dict[str, Any] = {
+    "version": 1,
+    "figsize": (8, 4),
+    "dpi": 100,
+}
+
+
+def render_chart(
+    path: str,
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    x_label: str,
+    y_label: str,
+    chart_type: str,
+    style: Dict[str, Any],
+) -> str:
+    """
+    Render one chart to `path` with the object-oriented Agg API.
+
+    No pyplot global state is touched, so this is safe to run from several
+    threads or in a worker process. The PNG is written to a temporary file
+    and renamed, so readers never see a partial image.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=style["figsize"], dpi=style["dpi"])
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    if chart_type == "line":
+        ax.plot(x_values, y_values)
+    else:
+        ax.plot(x_values, y_values)
+
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(f"{y_label} over time")
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    fig.savefig(tmp, format="png")
+    os.replace(tmp, path)
+    return path
+
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[Executor]:
+    global _pool
+    if RENDER_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is not safe.
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _reset_pool(broken: Executor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _preload() -> bool:
+    """Import the plotting stack (in a render worker, or inline)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: F401
+    from matplotlib.figure import Figure  # noqa: F401
+    return True
+
+
+def warm_pool() -> None:
+    """Start every render worker and load matplotlib in it, so the first chart renders at full speed."""
+    pool = _get_pool()
+    if pool is None:
+        _preload()
+        return
+    # One task per worker: the pool starts processes as tasks queue up.
+    for future in [pool.submit(_preload) for _ in range(RENDER_WORKERS)]:
+        future.result(timeout=RENDER_TIMEOUT * 2)
+
+
+@traced("render", "chart")
+def render(path: Path, *args: Any) -> str:
+    """
+    Run `render_chart(path, *args)` in the render process pool, or inline
+    when CHART_RENDER_WORKERS=0. A crashed pool is replaced and the render
+    retried once inline.
+    """
+    pool = _get_pool()
+    if pool is None:
+        return render_chart(str(path), *args)
+    try:
+        return pool.submit(render_chart, str(path), *args).result(timeout=RENDER_TIMEOUT)
+    except BrokenProcessPool:
+        logger.warning("Chart render pool died; rendering inline")
+        _reset_pool(pool)
+        return render_chart(str(path), *args)
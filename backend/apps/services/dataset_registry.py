@@ -0,0 +1,120 @@
+import io
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+
+HANDLE_PATTERN = re.compile(r"^ds_[0-9a-f]{12}$")
+
+
+@dataclass
+class Dataset:
+    """A typed OHLCV frame ('date' column, sorted ascending) plus where it came from."""
+    handle: str
+    frame: pd.DataFrame
+    symbol: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+class DatasetRegistry:
+    """
+    Bounded in-process map of dataset handles to frames.
+
+    Tools pass the short handle around instead of a CSV string, so the frame
+    is parsed once and never travels through the LLM context. Frames are
+    shared, not copied: consumers must treat them as read-only.
+    """
+
+    def __init__(self, max_items: int = 32):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, Dataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, frame: pd.DataFrame, symbol: Optional[str] = None, **meta: Any) -> Dataset:
+        dataset = Dataset(
+            handle=f"ds_{uuid.uuid4().hex[:12]}",
+            frame=frame,
+            symbol=symbol,
+            meta=meta,
+        )
+        with self._lock:
+            self._items[dataset.handle] = dataset
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return dataset
+
+    def get(self, handle: str) -> Optional[Dataset]:
+        with self._lock:
+            dataset = self._items.get(handle)
+            if dataset is not None:
+                self._items.move_to_end(handle)
+            return dataset
+
+    def datasets(self) -> List[Dataset]:
+        with self._lock:
+            return list(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Fallback registry for code running outside a request scope (scripts, tests).
+_process_registry = DatasetRegistry(max_items=64)
+_current_registry: ContextVar[Optional[DatasetRegistry]] = ContextVar(
+    "current_dataset_registry", default=None
+)
+
+
+def current_registry() -> DatasetRegistry:
+    registry = _current_registry.get()
+    return _process_registry if registry is None else registry
+
+
+@contextmanager
+def dataset_scope(registry: Optional[DatasetRegistry] = None) -> Iterator[DatasetRegistry]:
+    """Give the enclosed agent run its own registry (a fresh one by default)."""
+    if registry is None:
+        registry = DatasetRegistry()
+    token = _current_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _current_registry.reset(token)
+
+
+def is_handle(data: str) -> bool:
+    return bool(HANDLE_PATTERN.match(data.strip()))
+
+
+def resolve_dataset(data: str) -> Dataset:
+    """
+    Turn a tool's `csv_data` argument into a Dataset.
+
+    Accepts either a handle returned by fetch_stock_prices or a raw CSV
+    string with a 'date' column (parsed and sorted, but not registered).
+    """
+    text = data.strip()
+    if is_handle(text):
+        dataset = current_registry().get(text)
+        if dataset is None:
+            dataset = _process_registry.get(text)
+        if dataset is None:
+            raise ValueError(
+                f"Unknown or expired dataset handle '{text}'. Fetch the data again."
+            )
+        return dataset
+
+    df = pd.read_csv(io.StringIO(data), parse_dates=["date"])
+    df = df.sort_values("date").reset_index(drop=True)
+    return Dataset(handle="", frame=df)
+
+
+def resolve_frame(data: str) -> pd.DataFrame:
+    return resolve_dataset(data).frame
@@ -0,0 +1,71 @@
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = time(16, 0)
+
+# Alpha Vantage publishes the daily bar a little after the bell.
+CLOSE_GRACE = timedelta(minutes=int(os.getenv("MARKET_CLOSE_GRACE_MINUTES", "30")))
+
+
+def _now(now: Optional[datetime] = None) -> datetime:
+    """Return `now` (or the current time) as an aware datetime in market time."""
+    if now is None:
+        return datetime.now(MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=MARKET_TZ)
+    return now.astimezone(MARKET_TZ)
+
+
+def _is_weekday(d: date) -> bool:
+    return d.weekday() < 5
+
+
+def _close_at(d: date) -> datetime:
+    """Moment at which the bar for session `d` is expected to be available."""
+    return datetime.combine(d, MARKET_CLOSE, tzinfo=MARKET_TZ) + CLOSE_GRACE
+
+
+def last_session_date(now: Optional[datetime] = None) -> date:
+    """
+    Date of the most recent trading session whose daily bar should be published.
+
+    Weekends are skipped; exchange holidays are not modelled, the store handles
+    them by remembering when it last checked upstream (see `last_market_close`).
+    """
+    now = _now(now)
+    d = now.date()
+    if not (_is_weekday(d) and now >= _close_at(d)):
+        d -= timedelta(days=1)
+    while not _is_weekday(d):
+        d -= timedelta(days=1)
+    return d
+
+
+def last_market_close(now: Optional[datetime] = None) -> datetime:
+    """Publication time of the most recent daily bar (close + grace)."""
+    return _close_at(last_session_date(now))
+
+
+def next_market_close(now: Optional[datetime] = None) -> datetime:
+    """Publication time of the next daily bar after `now`."""
+    d = last_session_date(now) + timedelta(days=1)
+    while not _is_weekday(d):
+        d += timedelta(days=1)
+    return _close_at(d)
+
+
+def trading_days_between(start: date, end: date) -> int:
+    """Number of weekdays in the half-open interval (start, end]."""
+    if end <= start:
+        return 0
+    days = (end - start).days
+    weeks, extra = divmod(days, 7)
+    count = weeks * 5
+    for i in range(1, extra + 1):
+        if _is_weekday(start + timedelta(days=i)):
+            count += 1
+    return count
@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apps.services.alpha_vantage_client import (
+    COMPACT_ROWS,
+    INTRADAY_INTERVALS,
+    SERIES,
+    AlphaVantageClient,
+    get_client,
+)
+from apps.services.price_store import date_slice
+from apps.services.series_parser import INTEGER_COLUMNS, OHLCV
+
+SERIES_NAMES: Tuple[str, ...] = tuple(SERIES)
+
+
+def _in_range(df: pd.DataFrame, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """Rows of `df` (sorted DatetimeIndex) in [start, end), as a view."""
+    if start is None and end is None:
+        return df
+    return df.iloc[date_slice(df.index.values, start, end)]
+
+
+class PriceProvider(ABC):
+    """
+    A source of OHLCV bars. Every provider returns a DataFrame indexed by
+    bar timestamp (ascending) with float open/high/low/close and integer
+    volume columns; adjusted series add adjusted_close, dividend and
+    split_coefficient.
+    """
+
+    name: str = ""
+
+    @property
+    def series(self) -> Tuple[str, ...]:
+        """Series names this provider can serve."""
+        return SERIES_NAMES
+
+    @abstractmethod
+    def fetch(
+        self,
+        symbol: str,
+        series: str = "daily",
+        output_size: str = "compact",
+        month: Optional[str] = None,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Bars for `symbol`. `series` is 'daily', 'daily_adjusted', 'weekly' or
+        an intraday interval ('1min' ... '60min'); 'compact' keeps the latest
+        ~100 bars. `month` ('YYYY-MM') selects one month of intraday bars.
+        `start`/`end` then keep only the bars in [start, end).
+        Raises ValueError for unknown symbols/series, RuntimeError when the
+        source is unavailable.
+        """
+
+    def fetch_history(self, symbol: str, series: str, months: Iterable[str]) -> pd.DataFrame:
+        """Several months of intraday bars, fetched a page at a time."""
+        pages = [self.fetch(symbol, series, "full", month=m) for m in months]
+        pages = [p for p in pages if len(p)]
+        if not pages:
+            return pd.DataFrame(columns=list(OHLCV), index=pd.DatetimeIndex([]))
+        history = pd.concat(pages)
+        return history[~history.index.duplicated(keep="last")].sort_index()
+
+    def _check_series(self, series: str) -> None:
+        if series not in self.series:
+            raise ValueError(f"Unsupported series '{series}'. Supported: {', '.join(self.series)}")
+
+
+class AlphaVantageProvider(PriceProvider):
+    """
+    Alpha Vantage time series. Plain daily bars go through the price store
+    (see AlphaVantageClient.fetch_daily); other series are fetched directly
+    and parsed while the response streams in.
+    """
+
+    name = "alpha_vantage"
+
+    def __init__(self, client: Optional[AlphaVantageClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> AlphaVantageClient:
+        return self._client or get_client()
+
+    def fetch(self, symbol, series="daily", output_size="compact", month=None, start=None, end=None):
+        self._check_series(series)
+        if series == "daily":
+            # Stored daily bars are read as a range, without loading the rest.
+            return self.client.fetch_daily(symbol, output_size, start, end)
+        return _in_range(self.client.fetch_series(symbol, series, output_size, month=month), start, end)
+
+
+class LocalFileProvider(PriceProvider):
+    """
+    Bars from a directory of CSV or Parquet files, for offline use and tests.
+
+    Files are looked up as `<SYMBOL>_<series>.parquet|csv` (e.g.
+    `AAPL_5min.csv`), and for daily bars also `<SYMBOL>.parquet|csv`. The
+    first column is the timestamp; column names are matched loosely, so
+    both `close` and Alpha Vantage's `4. close` work. Parquet needs pyarrow
+    or fastparquet installed.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("PRICE_DATA_DIR") or ".")
+
+    def _path(self, symbol: str, series: str) -> Path:
+        stems = [f"{symbol}_{series}"] + ([symbol] if series == "daily" else [])
+        for stem in stems:
+            for suffix in (".parquet", ".csv"):
+                path = self.root / f"{stem}{suffix}"
+                if path.exists():
+                    return path
+        raise ValueError(f"No local {series} data for {symbol} in {self.root}")
+
+    @staticmethod
+    def _column_name(name: str) -> str:
+        return re.sub(r"^\d+\.\s*", "", str(name)).strip().lower().replace(" ", "_")
+
+    def _read(self, path: Path) -> pd.DataFrame:
+        if path.suffix == ".parquet":
+            try:
+                df = pd.read_parquet(path)
+            except ImportError as e:
+                raise RuntimeError(f"Reading {path.name} needs pyarrow or fastparquet: {e}") from e
+            if not isinstance(df.index, pd.DatetimeIndex):
+                df = df.set_index(df.columns[0])
+        else:
+            df = pd.read_csv(path, index_col=0)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.index, format="ISO8601"))
+        df.columns = [self._column_name(c) for c in df.columns]
+        df = df.rename(columns={"dividend_amount": "dividend"})
+
+        missing = [c for c in OHLCV if c not in df.columns]
+        if missing:
+            raise ValueError(f"{path.name} is missing columns {missing}")
+        dtypes = {c: (np.int64 if c in INTEGER_COLUMNS else np.float64) for c in df.columns}
+        return df.astype(dtypes).sort_index()
+
+    def fetch(self, symbol, series="daily", output_size="compact", month=None, start=None, end=None):
+        self._check_series(series)
+        df = self._read(self._path(symbol.strip().upper(), series))
+        if month and series in INTRADAY_INTERVALS:
+            first = pd.Timestamp(f"{month}-01")
+            df = df[(df.index >= first) & (df.index < first + pd.offsets.MonthBegin(1))]
+        return _in_range(df.tail(COMPACT_ROWS) if output_size == "compact" else df, start, end)
+
+    def symbols(self, series: str = "daily") -> List[str]:
+        """Symbols with a local file for `series`."""
+        names = set()
+        for path in self.root.glob("*"):
+            if path.suffix not in (".csv", ".parquet"):
+                continue
+            stem = path.stem
+            if stem.endswith(f"_{series}"):
+                names.add(stem[: -len(series) - 1])
+            elif series == "daily" and "_" not in stem:
+                names.add(stem)
+        return sorted(names)
+
+
+_FACTORIES: Dict[str, Callable[[], PriceProvider]] = {
+    AlphaVantageProvider.name: AlphaVantageProvider,
+    LocalFileProvider.name: LocalFileProvider,
+}
+_providers: Dict[str, PriceProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: Callable[[], PriceProvider]) -> None:
+    """Make another provider available to get_provider / PRICE_PROVIDER."""
+    with _providers_lock:
+        _FACTORIES[name] = factory
+        _providers.pop(name, None)
+
+
+def get_provider(name: Optional[str] = None) -> PriceProvider:
+    """Provider by name; defaults to PRICE_PROVIDER (alpha_vantage)."""
+    name = name or os.getenv("PRICE_PROVIDER", AlphaVantageProvider.name)
+    with _providers_lock:
+        if name not in _providers:
+            if name not in _FACTORIES:
+                raise ValueError(f"Unknown price provider '{name}'. Available: {', '.join(_FACTORIES)}")
+            _providers[name] = _FACTORIES[name]()
+        return _providers[name]
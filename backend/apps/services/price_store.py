@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.analytics.incremental import IndicatorState
+from apps.services.market_calendar import last_market_close
+
+logger = logging.getLogger(__name__)
+
+# Base folder: apps/data/prices (relative to this file)
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../backend/apps
+DEFAULT_STORE_DIR = BASE_DIR / "data" / "prices"
+
+PRICE_COLUMNS = {
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.int64,
+}
+
+_SAFE_SYMBOL = re.compile(r"[^A-Z0-9._-]")
+
+MMAP_ENABLED = os.getenv("PRICE_STORE_MMAP", "1").lower() not in ("0", "false", "no")
+# How long a replaced version stays on disk for readers that loaded the old meta.
+VERSION_GRACE_SECONDS = float(os.getenv("PRICE_STORE_VERSION_GRACE_SECONDS", "300"))
+RETIRED_MARKER = ".retired"
+
+
+def date_slice(
+    dates: np.ndarray,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> slice:
+    """Rows of the sorted datetime64 array `dates` in [start, end), by binary search."""
+    lo = int(np.searchsorted(dates, np.datetime64(start, "ns"), side="left")) if start is not None else 0
+    hi = int(np.searchsorted(dates, np.datetime64(end, "ns"), side="left")) if end is not None else len(dates)
+    return slice(lo, max(lo, hi))
+
+
+@dataclass
+class StoreMeta:
+    symbol: str
+    version: str
+    rows: int
+    first_date: str
+    last_date: str
+    has_full_history: bool
+    checked_at: float
+
+    @property
+    def last_bar(self) -> date:
+        return date.fromisoformat(self.last_date)
+
+
+class PriceStore:
+    """
+    Persistent on-disk OHLCV bar store, one directory per symbol.
+
+    Each write goes to a fresh version directory holding one `.npy` file per
+    column and the symbol's incremental indicator state (`indicators.json`);
+    `meta.json` is then swapped atomically to point at it. Readers therefore
+    never see a half-written symbol. The replaced version is only marked
+    retired and deleted by a later write once `VERSION_GRACE_SECONDS` have
+    passed, so a reader (in any process) that read the old meta still finds
+    its files.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("PRICE_STORE_DIR") or DEFAULT_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / _SAFE_SYMBOL.sub("_", symbol.upper())
+
+    def lock(self, symbol: str) -> threading.RLock:
+        """Per-symbol lock, so a read-check-fetch-write sequence is not interleaved."""
+        key = symbol.upper()
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.RLock())
+
+    def meta(self, symbol: str) -> Optional[StoreMeta]:
+        path = self._symbol_dir(symbol) / "meta.json"
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                return StoreMeta(**json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring corrupt price store metadata %s: %s", path, e)
+            return None
+
+    def is_fresh(self, meta: StoreMeta, now: Optional[datetime] = None) -> bool:
+        """
+        The stored series is fresh if upstream was checked after the latest
+        bar publication time. Checking (rather than comparing bar dates) also
+        covers exchange holidays, when no new bar ever arrives.
+        """
+        return meta.checked_at >= last_market_close(now).timestamp()
+
+    def load(
+        self,
+        symbol: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        tail: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Stored bars for `symbol`, optionally only those in [start, end) and
+        among the last `tail` stored bars. None if nothing is stored.
+
+        Column files are memory-mapped (unless PRICE_STORE_MMAP=0), so every
+        worker process shares one page-cache copy and nothing is parsed; the
+        range is found by binary search on the sorted date file and the
+        frame's columns are read-only views of just that slice.
+        """
+        for attempt in range(2):
+            meta = self.meta(symbol)
+            if meta is None:
+                return None
+            version_dir = self._symbol_dir(symbol) / meta.version
+            mmap_mode = "r" if MMAP_ENABLED else None
+            try:
+                dates = np.load(version_dir / "date.npy", mmap_mode=mmap_mode)
+                columns = {
+                    name: np.load(version_dir / f"{name}.npy", mmap_mode=mmap_mode)
+                    for name in PRICE_COLUMNS
+                }
+                break
+            except FileNotFoundError:
+                # Pruned between reading meta and opening the files: meta has
+                # moved on to a newer version, so read it again once.
+                if attempt:
+                    logger.warning("Price store version %s for %s is missing", meta.version, symbol)
+                    return None
+        rows = date_slice(dates, start, end)
+        if tail is not None:
+            first = max(rows.start, len(dates) - tail)
+            rows = slice(first, max(first, rows.stop))
+        # Versions written before dates were stored at ns resolution are
+        # converted here (a copy of the date slice only).
+        index = pd.DatetimeIndex(np.asarray(dates[rows]).astype("datetime64[ns]", copy=False))
+        return pd.DataFrame(
+            {name: np.asarray(values[rows]) for name, values in columns.items()},
+            index=index,
+            copy=False,
+        )
+
+    def write(self, symbol: str, df: pd.DataFrame, full_history: bool = False) -> StoreMeta:
+        """
+        Merge `df` (DatetimeIndex, OHLCV columns) into the stored series and
+        persist it. Newer rows win over stored rows with the same date.
+        """
+        with self.lock(symbol):
+            previous = self.meta(symbol)
+            existing = self.load(symbol) if previous else None
+            if existing is not None and not existing.empty:
+                merged = pd.concat([existing, df])
+                merged = merged[~merged.index.duplicated(keep="last")]
+            else:
+                merged = df
+            merged = merged.sort_index()
+
+            symbol_dir = self._symbol_dir(symbol)
+            version = uuid.uuid4().hex[:12]
+            version_dir = symbol_dir / version
+            version_dir.mkdir(parents=True, exist_ok=True)
+
+            np.save(version_dir / "date.npy", merged.index.values.astype("datetime64[ns]"))
+            for name, dtype in PRICE_COLUMNS.items():
+                np.save(version_dir / f"{name}.npy", merged[name].to_numpy(dtype=dtype))
+
+            state = self._next_state(symbol, previous, existing, df, merged)
+            with open(version_dir / "indicators.json", "w", encoding="utf-8") as fh:
+                json.dump(state.to_dict(), fh)
+
+            meta = StoreMeta(
+                symbol=symbol.upper(),
+                version=version,
+                rows=len(merged),
+                first_date=merged.index[0].strftime("%Y-%m-%d") if len(merged) else "",
+                last_date=merged.index[-1].strftime("%Y-%m-%d") if len(merged) else "",
+                has_full_history=full_history or bool(previous and previous.has_full_history),
+                checked_at=time.time(),
+            )
+            self._write_meta(symbol_dir, meta)
+
+            if previous and previous.version != version:
+                (symbol_dir / previous.version / RETIRED_MARKER).touch()
+            self._prune(symbol_dir)
+            return meta
+
+    @staticmethod
+    def _prune(symbol_dir: Path, now: Optional[float] = None) -> None:
+        """Delete versions retired more than VERSION_GRACE_SECONDS ago."""
+        now = time.time() if now is None else now
+        for marker in symbol_dir.glob(f"*/{RETIRED_MARKER}"):
+            try:
+                retired_at = marker.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if retired_at + VERSION_GRACE_SECONDS <= now:
+                # Mappings made before the unlink stay valid on POSIX.
+                shutil.rmtree(marker.parent, ignore_errors=True)
+
+    def indicator_state(self, symbol: str) -> Optional[IndicatorState]:
+        """Indicator state as of the last stored bar, or None if not stored."""
+        meta = self.meta(symbol)
+        if meta is None:
+            return None
+        path = self._symbol_dir(symbol) / meta.version / "indicators.json"
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                return IndicatorState.from_dict(json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring corrupt indicator state %s: %s", path, e)
+            return None
+
+    def _next_state(
+        self,
+        symbol: str,
+        previous: Optional[StoreMeta],
+        existing: Optional[pd.DataFrame],
+        incoming: pd.DataFrame,
+        merged: pd.DataFrame,
+    ) -> IndicatorState:
+        """
+        Advance the stored indicator state by the newly appended bars. Falls
+        back to a full rebuild when upstream revised or back-filled history.
+        """
+        state = self.indicator_state(symbol) if previous else None
+        if state is None or existing is None or state.last_date != previous.last_date:
+            return IndicatorState.build(merged)
+
+        overlap = incoming[incoming.index <= pd.Timestamp(previous.last_date)]
+        if len(overlap):
+            stored = existing.reindex(overlap.index)
+            if stored.isna().any().any() or not np.array_equal(
+                stored[list(PRICE_COLUMNS)].to_numpy(dtype=np.float64),
+                overlap[list(PRICE_COLUMNS)].to_numpy(dtype=np.float64),
+            ):
+                return IndicatorState.build(merged)
+
+        state.append(merged)
+        return state
+
+    def mark_checked(self, symbol: str) -> None:
+        """Record that upstream was consulted even though nothing new was stored."""
+        with self.lock(symbol):
+            meta = self.meta(symbol)
+            if meta is None:
+                return
+            meta.checked_at = time.time()
+            self._write_meta(self._symbol_dir(symbol), meta)
+
+    @staticmethod
+    def _write_meta(symbol_dir: Path, meta: StoreMeta) -> None:
+        tmp = symbol_dir / f"meta.json.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(asdict(meta), fh)
+        os.replace(tmp, symbol_dir / "meta.json")
+
+
+_default_store: Optional[PriceStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_price_store() -> Optional[PriceStore]:
+    """Process-wide store, or None when disabled with PRICE_STORE_ENABLED=0."""
+    global _default_store
+    if os.getenv("PRICE_STORE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
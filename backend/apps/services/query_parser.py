@@ -0,0 +1,250 @@
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+# Common company names users type instead of tickers.
+COMPANY_TICKERS = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "amazon": "AMZN",
+    "meta": "META",
+    "facebook": "META",
+    "tesla": "TSLA",
+    "nvidia": "NVDA",
+    "netflix": "NFLX",
+    "amd": "AMD",
+    "intel": "INTC",
+    "ibm": "IBM",
+    "oracle": "ORCL",
+    "salesforce": "CRM",
+    "adobe": "ADBE",
+    "disney": "DIS",
+    "walmart": "WMT",
+    "coca cola": "KO",
+    "coca-cola": "KO",
+    "pepsi": "PEP",
+    "jpmorgan": "JPM",
+    "visa": "V",
+    "mastercard": "MA",
+    "boeing": "BA",
+    "berkshire": "BRK.B",
+    "spy": "SPY",
+    "qqq": "QQQ",
+}
+KNOWN_TICKERS = set(COMPANY_TICKERS.values())
+
+# Upper-case words that look like tickers but are not.
+NOT_TICKERS = {
+    "I", "A", "AN", "AND", "OR", "THE", "ME", "MY", "US", "USD", "ETF", "AI", "OK",
+    "SMA", "EMA", "MA", "RSI", "MACD", "BB", "YTD", "PE", "EPS", "IPO", "CEO", "TA",
+    "VS", "Q", "D", "W", "M", "Y", "CSV", "API", "PNG", "UTC", "ET", "EST", "NYSE",
+}
+
+# Everyday words that are also listed tickers ("How is IT doing?"). Written
+# in capitals they are ambiguous: taken as a symbol only with a "$" prefix,
+# otherwise left in `unparsed` so the question goes to the agent.
+AMBIGUOUS_TICKERS = {
+    "IT", "IS", "ON", "AT", "BE", "DO", "GO", "SO", "NO", "UP", "ALL", "ARE", "FOR",
+    "NOW", "HAS", "CAN", "ONE", "NEW", "BIG", "LOW", "OUT", "ANY", "SEE", "RUN", "KEY",
+    "CAR", "FUN", "HIGH", "REAL", "GOOD", "BEST", "FAST", "TRUE", "WELL", "LIFE", "LOVE",
+    "CASH", "PLAY", "SAFE", "WORK", "HOPE", "HEAR", "NEXT", "OPEN", "EDIT", "PEAK",
+}
+_NON_SYMBOLS = NOT_TICKERS | AMBIGUOUS_TICKERS
+
+_TICKER = re.compile(r"(?<![\w.])\$?([A-Z]{1,5}(?:\.[A-Z])?)(?![\w.])")
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "eighteen": 18,
+}
+_UNIT_DAYS = {"d": 1, "day": 1, "w": 7, "week": 7, "m": 30, "month": 30, "y": 365, "year": 365}
+_COUNT = r"(\d+|a|an|one|two|three|four|five|six|seven|eight|nine|ten|twelve|eighteen)"
+_RANGE = re.compile(
+    rf"\b(?:last|past|previous|over the|for the|in the)\s+(?:{_COUNT}[\s-]*)?(day|week|month|year)s?\b"
+)
+# "3 months", "6-month" -- but not "50-day SMA", which is a window.
+_BARE_RANGE = re.compile(
+    r"\b(\d+)[\s-]*(day|week|month|year)s?\b(?![\s-]*(?:sma|ma|moving|ema|rsi))"
+)
+_SHORT_RANGE = re.compile(r"\b(\d+)\s?([dwmy])\b")
+# "20 and 50-day SMA", "sma 20", "sma:50", "20/50 crossover"
+_SMA_WINDOWS = re.compile(
+    r"\b((?:\d{1,3}[\s-]*(?:days?|d)?[\s,/&-]*(?:and\s+)?)+)(?:sma|ma|moving averages?|crossover)\b"
+    r"|\b(?:sma|ma)[\s:]*(\d{1,3})\b"
+)
+
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+# "2020-01-01", "1/5/2023", "jan 5, 2023", "5th march", "march 2023", "in 2020"
+_DATE = re.compile(
+    r"\b\d{4}-\d{1,2}(?:-\d{1,2})?\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    rf"|\b{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?\b(?:,?\s+\d{{4}}\b)?"
+    rf"|\b\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}\b(?:,?\s+\d{{4}}\b)?"
+    rf"|\b{_MONTH}\.?\s+\d{{4}}\b|\b(?:19|20)\d{{2}}\b"
+)
+# Bar intervals other than the default daily series.
+_INTERVAL = re.compile(r"\b(?:(intraday|hourly|weekly|monthly)|\d+[\s-]?min(?:ute)?s?|daily)\b")
+_WORD = re.compile(r"[^\W_]+(?:['\u2019][^\W_]+)?")
+# Words that ask for nothing beyond the symbol, range and indicators
+# ("show me apple for the past 3 months"). Any other word left over after
+# parsing is kept in `unparsed`: it may change what the answer should be.
+_FILLER = {
+    "show", "me", "give", "get", "see", "let", "lets", "let's", "please", "can", "could",
+    "you", "i", "i'd", "i'm", "like", "want", "what", "what's", "whats", "how", "how's",
+    "is", "are", "was", "were", "be", "been", "has", "have", "had", "do", "does", "did",
+    "doing", "done", "performing", "performed", "performance", "look", "looking", "at",
+    "display", "draw", "plot", "chart", "charts", "graph", "price", "prices", "stock",
+    "stocks", "share", "shares", "ticker", "data", "history", "historical", "analysis",
+    "analyze", "analyse", "overview", "summary", "summarize", "the", "a", "an", "of",
+    "for", "on", "in", "to", "with", "and", "plus", "also", "its", "over", "last", "past",
+    "previous", "recent", "recently", "trend", "trends", "trending", "close", "closing",
+    "bars", "candles", "indicator", "indicators", "along", "including", "about",
+}
+
+# Indicator keywords -> canonical names used in the cache key / fast path.
+_INDICATORS: List[Tuple[str, re.Pattern]] = [
+    ("sma", re.compile(r"\b(?:sma|moving averages?|ma\d*)\b")),
+    ("ema", re.compile(r"\b(?:ema|exponential)\b")),
+    ("bb", re.compile(r"\bbollinger|\bbands?\b")),
+    ("rsi", re.compile(r"\b(?:rsi|relative strength)\b")),
+    ("macd", re.compile(r"\bmacd\b")),
+    ("stats", re.compile(r"\b(?:stats|statistics|volatil(?:e|ity)|std|standard deviation|mean|average price)\b")),
+    ("backtest", re.compile(r"\b(?:backtest\w*|crossover|strateg(?:y|ies)|(?:would|could) have worked)\b")),
+]
+
+
+@dataclass
+class ParsedQuery:
+    """What a free-text question asks for, as far as can be told without the LLM."""
+    symbols: List[str] = field(default_factory=list)
+    range_days: Optional[int] = None
+    ytd: bool = False
+    indicators: List[str] = field(default_factory=list)
+    sma_windows: List[int] = field(default_factory=list)
+    # Explicit dates as written ("2020-01-01", "march 2023"), in order.
+    dates: List[str] = field(default_factory=list)
+    # Requested bar interval when not the default daily series ("weekly", "5min").
+    interval: Optional[str] = None
+    # Words the parser could not account for ("why", "drop", "sell"), in order.
+    unparsed: List[str] = field(default_factory=list)
+
+    @property
+    def range_label(self) -> str:
+        if self.ytd:
+            return "ytd"
+        return f"{self.range_days}d" if self.range_days else "default"
+
+    def cache_key(self) -> Optional[str]:
+        """
+        Stable key for equivalent questions; None if no symbol was recognised.
+        Dates, the interval and unparsed words are part of the key, so "why
+        did AAPL drop?" never shares an answer with a plain "AAPL".
+        """
+        if not self.symbols:
+            return None
+        return json.dumps({
+            "symbols": sorted(self.symbols),
+            "range": self.range_label,
+            "indicators": sorted(self.indicators),
+            "sma": sorted(self.sma_windows),
+            "dates": self.dates,
+            "interval": self.interval,
+            "unparsed": self.unparsed,
+        }, separators=(",", ":"))
+
+
+Span = Tuple[int, int]
+
+
+def _lower(text: str) -> str:
+    # Character by character, so match offsets in the result are valid in `text`.
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _symbols(text: str, lowered: str) -> Tuple[List[str], List[Span]]:
+    found: List[str] = []
+    spans: List[Span] = []
+    for match in _TICKER.finditer(text):
+        token = match.group(1)
+        if match.group(0).startswith("$") or token not in _NON_SYMBOLS:
+            found.append(token)
+            spans.append(match.span())
+    for name, ticker in COMPANY_TICKERS.items():
+        for match in re.finditer(rf"\b{re.escape(name)}\b", lowered):
+            found.append(ticker)
+            spans.append(match.span())
+    # Lower-cased tickers, only where they cannot be ordinary words.
+    for match in re.finditer(r"\b[a-z]{4,5}\b", lowered):
+        if match.group(0).upper() in KNOWN_TICKERS:
+            found.append(match.group(0).upper())
+            spans.append(match.span())
+    return list(dict.fromkeys(found)), spans
+
+
+def _range_days(text: str) -> Tuple[Optional[int], List[Span]]:
+    for pattern in (_RANGE, _BARE_RANGE, _SHORT_RANGE):
+        match = pattern.search(text)
+        if match:
+            count = match.group(1)
+            n = int(count) if count and count.isdigit() else _NUMBER_WORDS.get(count or "a", 1)
+            return n * _UNIT_DAYS[match.group(2)], [match.span()]
+    return None, []
+
+
+def _spans(pattern: re.Pattern, text: str) -> List[Span]:
+    return [match.span() for match in pattern.finditer(text)]
+
+
+def _unparsed(text: str, spans: List[Span]) -> List[str]:
+    """Words of `text` outside the consumed spans that are not filler."""
+    chars = list(text)
+    for start, end in spans:
+        chars[start:end] = " " * (end - start)
+    return [w for w in _WORD.findall("".join(chars)) if w.replace("\u2019", "'") not in _FILLER]
+
+
+def parse_query(text: str) -> ParsedQuery:
+    """
+    Cheap, rule-based reading of a user question: ticker symbols (or common
+    company names), the requested look-back, indicators, explicit dates and
+    interval. Phrasings of the same request ("AAPL last 3 months", "show me
+    apple for the past 3 months") parse to the same result; words that fit
+    none of these and are not filler end up in `unparsed`.
+    """
+    lowered = _lower(text)
+    symbols, consumed = _symbols(text, lowered)
+    parsed = ParsedQuery(symbols=symbols)
+    ytd = _spans(re.compile(r"\b(?:ytd|year[\s-]to[\s-]date)\b"), lowered)
+    if ytd:
+        parsed.ytd = True
+        consumed += ytd
+    else:
+        parsed.range_days, spans = _range_days(lowered)
+        consumed += spans
+
+    for name, pattern in _INDICATORS:
+        spans = _spans(pattern, lowered)
+        if spans:
+            parsed.indicators.append(name)
+            consumed += spans
+    windows = {int(n) for run, single in _SMA_WINDOWS.findall(lowered)
+               for n in re.findall(r"\d+", run or single)}
+    consumed += _spans(_SMA_WINDOWS, lowered)
+    parsed.sma_windows = sorted(w for w in windows if w > 1)
+    if parsed.sma_windows and "sma" not in parsed.indicators:
+        parsed.indicators.insert(0, "sma")
+
+    for match in _DATE.finditer(lowered):
+        parsed.dates.append(match.group(0))
+        consumed.append(match.span())
+    for match in _INTERVAL.finditer(lowered):
+        if parsed.interval is None and match.group(0) != "daily":
+            parsed.interval = match.group(1) or re.sub(r"\D", "", match.group(0)) + "min"
+        consumed.append(match.span())
+    parsed.unparsed = _unparsed(lowered, consumed)
+    return parsed
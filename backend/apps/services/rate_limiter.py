@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a call cannot be made within the configured quota."""
+
+
+class RateLimiter:
+    """
+    Token bucket for the per-minute quota plus a counter for the per-day one.
+
+    `acquire()` blocks until a call may be made (up to `max_wait` seconds)
+    instead of letting the upstream reject it. The daily counter resets at
+    midnight UTC.
+    """
+
+    def __init__(
+        self,
+        per_minute: Optional[int] = None,
+        per_day: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.per_minute = per_minute or int(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+        self.per_day = per_day or int(os.getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "25"))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.per_minute)
+        self._updated = clock()
+        self._day = self._today()
+        self._day_used = 0
+        self._wait_seconds_total = 0.0
+        self._waits = 0
+        self._rejected = 0
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).date()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        rate = self.per_minute / 60.0
+        self._tokens = min(float(self.per_minute), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._day_used = 0
+
+    def acquire(self, max_wait: float = 60.0) -> float:
+        """Take one call from both quotas; return how long we waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._day_used >= self.per_day:
+                    self._rejected += 1
+                    raise QuotaExceededError(
+                        f"Alpha Vantage daily quota of {self.per_day} calls is used up."
+                    )
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self._day_used += 1
+                    if waited:
+                        self._waits += 1
+                        self._wait_seconds_total += waited
+                    return waited
+                delay = (1.0 - self._tokens) * 60.0 / self.per_minute
+                if waited + delay > max_wait:
+                    self._rejected += 1
+                    raise QuotaExceededError(
+                        f"Alpha Vantage per-minute quota busy; next slot in {delay:.0f}s."
+                    )
+            self._sleep(delay)
+            waited += delay
+
+    def penalize(self) -> None:
+        """Upstream said we are over the minute quota: empty the bucket."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+    def exhaust_day(self) -> None:
+        """Upstream said the daily quota is gone: stop calling until tomorrow."""
+        with self._lock:
+            self._refill()
+            self._day_used = max(self._day_used, self.per_day)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill()
+            return {
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "tokens_available": round(self._tokens, 3),
+                "day_used": self._day_used,
+                "day_remaining": max(0, self.per_day - self._day_used),
+                "waits": self._waits,
+                "wait_seconds_total": round(self._wait_seconds_total, 3),
+                "rejected": self._rejected,
+            }
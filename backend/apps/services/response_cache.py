@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from apps.services.chart_cache import get_chart_cache
+from apps.services.dataset_registry import Dataset
+from apps.services.market_calendar import next_market_close
+from apps.services.price_store import PriceStore, get_price_store
+from apps.services.query_parser import parse_query
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_MAX_ITEMS = int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", "256"))
+
+
+@dataclass
+class CachedResponse:
+    key: str
+    response: Dict[str, Any]
+    created_at: float
+    expires_at: float
+    data_as_of: Optional[str] = None
+    # Symbols whose bars the response was computed from.
+    symbols: List[str] = field(default_factory=list)
+
+
+def response_key(text: str) -> Optional[str]:
+    """Cache key for a user question, or None if it should not be cached."""
+    return parse_query(text).cache_key()
+
+
+def latest_bar(datasets: Iterable[Dataset]) -> Optional[str]:
+    """Most recent bar date (YYYY-MM-DD) across the datasets an agent run used."""
+    dates = [d.frame["date"].iloc[-1] for d in datasets if len(d.frame) and "date" in d.frame]
+    return max(dates).strftime("%Y-%m-%d") if dates else None
+
+
+def dataset_symbols(datasets: Iterable[Dataset]) -> List[str]:
+    """Symbols of the datasets an agent run used, in first-use order."""
+    return list(dict.fromkeys(d.symbol.upper() for d in datasets if d.symbol))
+
+
+class ResponseCache:
+    """
+    Agent responses keyed by normalised question (see `parse_query`).
+
+    An entry lives until the next daily bar is published, since that is
+    when the same question can get a different answer; with `store` set,
+    it is also dropped as soon as a bar newer than its `data_as_of` is
+    stored for one of its symbols (early publication, a back-fill, a
+    refresh by another worker). The in-memory map
+    is LRU-bounded; with `root` set, entries are also written there as JSON
+    so they survive restarts. Entries whose charts have been evicted from
+    the chart cache are treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_items: int = RESPONSE_CACHE_MAX_ITEMS,
+        root: Optional[Path] = None,
+        charts_dir: Optional[Path] = None,
+        store: Optional[PriceStore] = None,
+    ):
+        self.max_items = max_items
+        self.root = Path(root) if root else None
+        self.charts_dir = charts_dir
+        self.store = store
+        self._items: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+        if self.root:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        """Delete persisted entries that expired while the server was down."""
+        now = time.time()
+        for path in self.root.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    expired = json.load(fh)["expires_at"] <= now
+            except (OSError, ValueError, KeyError, TypeError):
+                expired = True
+            if expired:
+                path.unlink(missing_ok=True)
+
+    def _file_for(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()[:24]}.json"
+
+    def _valid(self, entry: CachedResponse, now: float) -> bool:
+        if entry.expires_at <= now:
+            return False
+        if self._superseded(entry):
+            return False
+        if self.charts_dir is None:
+            return True
+        return all(
+            (self.charts_dir / url.rsplit("/", 1)[-1]).exists()
+            for url in entry.response.get("chart_urls", [])
+        )
+
+    def _superseded(self, entry: CachedResponse) -> bool:
+        """Whether a bar newer than the one the response was computed from is stored."""
+        if self.store is None or not entry.data_as_of:
+            return False
+        for symbol in entry.symbols:
+            meta = self.store.meta(symbol)
+            if meta is not None and meta.last_date > entry.data_as_of:
+                return True
+        return False
+
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        if self.root is None:
+            return None
+        path = self._file_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = CachedResponse(**json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring corrupt cached response %s: %s", path, e)
+            return None
+        return entry if entry.key == key else None
+
+    def _drop(self, key: str) -> None:
+        self._items.pop(key, None)
+        if self.root is not None:
+            try:
+                self._file_for(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                entry = self._load(key)
+            if entry is None or not self._valid(entry, now):
+                if entry is not None:
+                    self._drop(key)
+                self._counters["misses"] += 1
+                return None
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            self._evict()
+            self._counters["hits"] += 1
+            return entry.response
+
+    def put(
+        self,
+        key: str,
+        response: Dict[str, Any],
+        data_as_of: Optional[str] = None,
+        now: Optional[datetime] = None,
+        symbols: Iterable[str] = (),
+    ) -> None:
+        created = now or datetime.now().astimezone()
+        entry = CachedResponse(
+            key=key,
+            response=response,
+            created_at=created.timestamp(),
+            expires_at=next_market_close(created).timestamp(),
+            data_as_of=data_as_of,
+            symbols=[s.upper() for s in symbols],
+        )
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            self._evict()
+            self._counters["stores"] += 1
+        if self.root is not None:
+            self._persist(entry)
+
+    def _persist(self, entry: CachedResponse) -> None:
+        path = self._file_for(entry.key)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(asdict(entry), fh)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not persist cached response: %s", e)
+            tmp.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        # Memory bound only; files on disk expire on their own TTL.
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "items": len(self._items)}
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, or None when disabled with RESPONSE_CACHE_ENABLED=0."""
+    global _default_cache
+    if os.getenv("RESPONSE_CACHE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            root = os.getenv("RESPONSE_CACHE_DIR")
+            _default_cache = ResponseCache(
+                root=Path(root) if root else None,
+                charts_dir=get_chart_cache().root,
+                store=get_price_store(),
+            )
+        return _default_cache
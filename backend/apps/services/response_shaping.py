@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# Largest JSON size (bytes) of a response's raw_result; 0 disables shaping.
+RESPONSE_MAX_BYTES = int(os.getenv("RESPONSE_MAX_BYTES", "65536"))
+ARTIFACT_MAX_ITEMS = int(os.getenv("ARTIFACT_MAX_ITEMS", "128"))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(64 * 1024 * 1024)))
+PREVIEW_CHARS = 500
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(value: Any) -> bytes:
+    """JSON bytes via orjson; anything it cannot encode is written as str()."""
+    return orjson.dumps(value, default=str, option=_OPTIONS)
+
+
+def json_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    """
+    Encode `content` with orjson directly. Returning a Response from a route
+    skips FastAPI's jsonable_encoder pass over the whole body.
+    """
+    return ORJSONResponse(content, status_code=status_code)
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    JSON-safe copy of `obj` in one pass: containers are walked, primitives
+    kept, numpy scalars unwrapped and anything else (LangChain messages,
+    tool actions) replaced by its str().
+    """
+    if isinstance(obj, np.generic):  # before float: np.float64 is a float subclass
+        return obj.item()
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    return str(obj)
+
+
+class ArtifactStore:
+    """
+    Full versions of values cut out of API responses, as encoded JSON,
+    so clients can fetch them on demand. In-process and bounded by item
+    count and total bytes; least recently used artifacts are dropped first.
+    Keys are content hashes, so a repeated value is stored once. A value
+    larger than the whole byte budget is not stored at all.
+    """
+
+    def __init__(self, max_items: int = ARTIFACT_MAX_ITEMS, max_bytes: int = ARTIFACT_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, encoded: bytes) -> Optional[str]:
+        """Store `encoded` and return its id, or None if it cannot fit in the store."""
+        if len(encoded) > self.max_bytes:
+            return None
+        artifact_id = hashlib.sha1(encoded).hexdigest()[:16]
+        with self._lock:
+            if artifact_id in self._items:
+                self._items.move_to_end(artifact_id)
+                return artifact_id
+            self._items[artifact_id] = encoded
+            self._bytes += len(encoded)
+            while self._items and (len(self._items) > self.max_items or self._bytes > self.max_bytes):
+                _, dropped = self._items.popitem(last=False)
+                self._bytes -= len(dropped)
+        return artifact_id
+
+    def get(self, artifact_id: str) -> Optional[bytes]:
+        with self._lock:
+            encoded = self._items.get(artifact_id)
+            if encoded is not None:
+                self._items.move_to_end(artifact_id)
+            return encoded
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._bytes}
+
+
+_default_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _default_store
+    with _store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore()
+        return _default_store
+
+
+def artifact_url(artifact_id: str) -> str:
+    return f"/api/agent/artifacts/{artifact_id}"
+
+
+def _reference(value: Any, encoded: bytes, store: ArtifactStore) -> Dict[str, Any]:
+    """
+    Stand-in for a value that was cut: size, a short preview and where to
+    get it (no artifact_url when the value is too large to keep).
+    """
+    text = value if isinstance(value, str) else encoded.decode("utf-8", errors="replace")
+    ref: Dict[str, Any] = {
+        "truncated": True,
+        "bytes": len(encoded),
+        "preview": text[:PREVIEW_CHARS],
+    }
+    artifact_id = store.put(encoded)
+    if artifact_id is not None:
+        ref["artifact_url"] = artifact_url(artifact_id)
+    if isinstance(value, (list, tuple)):
+        ref["items"] = len(value)
+    return ref
+
+
+def _shrink(value: Any, limit: int, store: ArtifactStore) -> Any:
+    """Replace every non-dict part larger than `limit` bytes by a reference."""
+    if isinstance(value, dict):
+        return {key: _shrink(item, limit, store) for key, item in value.items()}
+    if isinstance(value, (str, list, tuple)):
+        encoded = dumps(value)
+        if len(encoded) > limit:
+            return _reference(value, encoded, store)
+    return value
+
+
+def shape(value: Any, budget: int = RESPONSE_MAX_BYTES, store: Optional[ArtifactStore] = None) -> Any:
+    """
+    `value` made to fit `budget` bytes of JSON. Oversized strings and lists
+    (echoed CSV, per-row indicator arrays) become a preview plus an
+    artifact URL for the full data; if that is still too large, the whole
+    value is referenced. Values already within budget are returned as is.
+    """
+    if budget <= 0:
+        return value
+    encoded = dumps(value)
+    if len(encoded) <= budget:
+        return value
+
+    store = store or get_artifact_store()
+    # A quarter of the budget per field leaves room for the rest of the payload.
+    shaped = _shrink(value, max(budget // 4, PREVIEW_CHARS * 2), store)
+    if len(dumps(shaped)) > budget:
+        return _reference(value, encoded, store)
+    return shaped
@@ -0,0 +1,61 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when too many runs are already waiting for a slot."""
+
+
+class RunLimiter:
+    """
+    Bounded concurrency for long-running agent calls on the event loop.
+
+    At most `max_concurrency` runs execute at once, at most `max_queue` wait
+    for a slot (further callers get QueueFullError straight away), and each
+    run is cancelled after `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("AGENT_MAX_QUEUE", "16"))
+        self.timeout = timeout or float(os.getenv("AGENT_TIMEOUT_SECONDS", "120"))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._running = 0
+
+    async def run(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await `factory()` once a slot is free, subject to the queue bound and timeout."""
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise QueueFullError(
+                f"Too many queued requests ({self._waiting}); try again shortly."
+            )
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            return await asyncio.wait_for(factory(), timeout=self.timeout)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+        }
@@ -0,0 +1,308 @@
+"""
+Watchlist precomputation and alert scan after each market close.
+
+Most questions at the open are about the same few large caps. After every
+close (plus the publication grace period) the job refreshes each watchlist
+symbol's stored bars, which also rolls its incremental indicator state
+forward, then runs the standard analysis pipeline once and stores its
+response under every cache key a plain question about the symbol maps to.
+The first questions of the day are then answered from the response cache,
+and tools and /api/series read warm bars from the price store. Finally the
+alert rules are checked against the new bars (see apps.services.alerts).
+
+Runs as a separate worker, or in-process (started from the app lifespan)
+with WATCHLIST_IN_PROCESS=1:
+
+    python -m apps.services.scheduler            # loop
+    python -m apps.services.scheduler --once     # one run now
+
+Every loop takes a leader lock (a file lock next to the price store) before
+each run, so with several API workers, or workers plus a separate process,
+only one of them spends upstream calls on the job. A separate worker shares
+the price store directory; it only shares responses with the API workers
+when RESPONSE_CACHE_DIR is set.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from itertools import combinations
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, every loop runs the job
+    fcntl = None
+
+from apps.agents.pipeline import FAST_PATH_INDICATORS, AnalysisParams, run_analysis
+from apps.services.alerts import get_alert_engine, scan_alerts
+from apps.services.alpha_vantage_client import get_client
+from apps.services.dataset_registry import dataset_scope
+from apps.services.market_calendar import last_market_close, next_market_close
+from apps.services.price_store import get_price_store
+from apps.services.query_parser import ParsedQuery
+from apps.services.response_cache import get_response_cache, latest_bar
+from apps.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Share of the upstream calls left for the day that one run may spend.
+WATCHLIST_QUOTA_SHARE = float(os.getenv("WATCHLIST_QUOTA_SHARE", "0.5"))
+WATCHLIST_SUMMARIZE = os.getenv("WATCHLIST_SUMMARIZE", "1").lower() not in ("0", "false", "no")
+# Longest single sleep, so clock jumps and suspends are noticed.
+MAX_SLEEP = 3600.0
+HISTORY = 10
+
+IDLE, RUNNING, STANDBY = "idle", "running", "standby"
+OK, PARTIAL, FAILED, SKIPPED = "ok", "partial", "failed", "skipped"
+
+
+def watchlist_symbols(text: Optional[str] = None) -> List[str]:
+    """Symbols from WATCHLIST ("AAPL,MSFT,..."), upper-cased, in order, without duplicates."""
+    text = os.getenv("WATCHLIST", "") if text is None else text
+    return list(dict.fromkeys(s.strip().upper() for s in text.split(",") if s.strip()))
+
+
+def leader_lock_path() -> Path:
+    """Lock file shared by every process using the same price store."""
+    store = get_price_store()
+    return (store.root if store is not None else Path(tempfile.gettempdir())) / ".scheduler.lock"
+
+
+def try_leader_lock(path: Path) -> Optional[IO[str]]:
+    """
+    Take an exclusive, non-blocking lock on `path`. The returned file holds
+    it until closed or the process exits; None if another process holds it.
+    """
+    fh = open(path, "a")
+    if fcntl is None:
+        return fh
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fh.close()
+        return None
+    return fh
+
+
+def cache_keys(symbol: str) -> List[str]:
+    """
+    Response cache keys of the questions the default pipeline run answers
+    in full: the symbol with any subset of the fast-path indicators, the
+    default range and the default SMA windows, and nothing else (no dates,
+    interval or unparsed words, so "should I sell AAPL?" is not among them).
+    """
+    indicators = sorted(FAST_PATH_INDICATORS)
+    return [
+        ParsedQuery(symbols=[symbol], indicators=list(subset)).cache_key()
+        for size in range(len(indicators) + 1)
+        for subset in combinations(indicators, size)
+    ]
+
+
+class WatchlistScheduler:
+    """
+    Runs the watchlist job once per market close and keeps the status of
+    recent runs (per-symbol outcome, duration, upstream calls used).
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        quota_share: float = WATCHLIST_QUOTA_SHARE,
+        summarize: bool = WATCHLIST_SUMMARIZE,
+    ):
+        self.symbols = list(symbols)
+        self.quota_share = quota_share
+        self.summarize = summarize
+        self._lock = threading.Lock()
+        self._state = IDLE
+        self._next_run: Optional[datetime] = None
+        self._runs: "deque[Dict[str, Any]]" = deque(maxlen=HISTORY)
+        self._leader: Optional[IO[str]] = None
+
+    async def _refresh(self, symbol: str) -> Dict[str, Any]:
+        """Refresh one symbol's bars and precompute its default analysis."""
+        client = get_client()
+        await client.afetch_daily(symbol, "full")
+        with dataset_scope() as registry:
+            response = await run_analysis(AnalysisParams(symbol, summarize=self.summarize))
+        cache = get_response_cache()
+        if cache is not None:
+            as_of = latest_bar(registry.datasets())
+            for key in cache_keys(symbol):
+                cache.put(key, response, data_as_of=as_of, symbols=[symbol])
+        return {"end_date": response["raw_result"]["end_date"]}
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Refresh every watchlist symbol in order, then scan the alert rules.
+        Symbols whose fresh bars are already stored cost no upstream call and
+        always run; the others stop once the run has used its share of the
+        calls left for the day.
+        """
+        client = get_client()
+        quota = client.limiter.snapshot()
+        budget = int(quota["day_remaining"] * self.quota_share)
+        run: Dict[str, Any] = {
+            "started_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "quota_budget": budget,
+            "quota_used": 0,
+            "symbols": {},
+        }
+        with self._lock:
+            self._state = RUNNING
+        started = time.perf_counter()
+        try:
+            for symbol in self.symbols:
+                used = client.limiter.snapshot()["day_used"] - quota["day_used"]
+                run["quota_used"] = used
+                if used >= budget and client.needs_upstream(symbol, "full"):
+                    run["symbols"][symbol] = {"state": SKIPPED, "error": "quota budget used"}
+                    continue
+                symbol_started = time.perf_counter()
+                try:
+                    with span("job", "watchlist", symbol=symbol):
+                        outcome = {"state": OK, **await self._refresh(symbol)}
+                except Exception as e:
+                    logger.warning("Watchlist refresh of %s failed: %s", symbol, e)
+                    outcome = {"state": FAILED, "error": str(e)}
+                outcome["seconds"] = round(time.perf_counter() - symbol_started, 3)
+                run["symbols"][symbol] = outcome
+            if get_alert_engine().symbols():
+                scanned = await asyncio.to_thread(scan_alerts)
+                run["alerts"] = {"symbols": scanned["symbols"], "fired": len(scanned["fired"]),
+                                 "errors": scanned["errors"]}
+        finally:
+            run["quota_used"] = client.limiter.snapshot()["day_used"] - quota["day_used"]
+            run["seconds"] = round(time.perf_counter() - started, 3)
+            states = [s["state"] for s in run["symbols"].values()]
+            run["state"] = OK if all(s == OK for s in states) else (
+                FAILED if not any(s == OK for s in states) else PARTIAL
+            )
+            with self._lock:
+                self._state = IDLE
+                self._runs.append(run)
+        logger.info("Watchlist run %s in %.1fs, %d upstream calls",
+                    run["state"], run["seconds"], run["quota_used"])
+        return run
+
+    def _last_started(self) -> Optional[float]:
+        with self._lock:
+            if not self._runs:
+                return None
+            return datetime.fromisoformat(self._runs[-1]["started_at"]).timestamp()
+
+    def _is_leader(self) -> bool:
+        """Hold (or take) the leader lock; once taken it is kept for the process's life."""
+        if self._leader is None:
+            self._leader = try_leader_lock(leader_lock_path())
+            if self._leader is not None:
+                logger.info("This process runs the after-close job")
+        with self._lock:
+            if self._leader is None:
+                self._state = STANDBY
+            elif self._state == STANDBY:
+                self._state = IDLE
+        return self._leader is not None
+
+    async def loop(self) -> None:
+        """
+        Run now if no run has covered the latest close, then after every
+        close; runs are skipped while another process holds the leader lock.
+        """
+        while True:
+            last = self._last_started()
+            due_now = last is None or last < last_market_close().timestamp()
+            if due_now and (self.symbols or get_alert_engine().symbols()) and self._is_leader():
+                try:
+                    await self.run_once()
+                except Exception:
+                    logger.exception("Watchlist run failed")
+            due = next_market_close()
+            with self._lock:
+                self._next_run = due
+            while (wait := due.timestamp() - time.time()) > 0:
+                await asyncio.sleep(min(wait, MAX_SLEEP))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = list(self._runs)
+            return {
+                "enabled": bool(self.symbols),
+                "symbols": self.symbols,
+                "state": self._state,
+                "next_run_at": self._next_run.isoformat(timespec="seconds") if self._next_run else None,
+                "last_run": runs[-1] if runs else None,
+                "history": [
+                    {k: r[k] for k in ("started_at", "state", "seconds", "quota_used")} for r in runs
+                ],
+            }
+
+    def gauges(self) -> Dict[str, Any]:
+        """Numeric status of the latest run, for /metrics."""
+        with self._lock:
+            last = self._runs[-1] if self._runs else None
+            running = self._state == RUNNING
+        if last is None:
+            return {"running": int(running)}
+        states = [s["state"] for s in last["symbols"].values()]
+        return {
+            "running": int(running),
+            "last_run_seconds": last["seconds"],
+            "last_run_quota_used": last["quota_used"],
+            "last_run_symbols_ok": states.count(OK),
+            "last_run_symbols_failed": states.count(FAILED),
+            "last_run_symbols_skipped": states.count(SKIPPED),
+            "last_run_timestamp": datetime.fromisoformat(last["started_at"]).timestamp(),
+        }
+
+
+_scheduler: Optional[WatchlistScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> WatchlistScheduler:
+    """Process-wide scheduler for the WATCHLIST symbols (disabled when empty)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WatchlistScheduler(watchlist_symbols())
+        return _scheduler
+
+
+def scheduler_task() -> Optional["asyncio.Task[None]"]:
+    """Start the in-process after-close loop when WATCHLIST_IN_PROCESS=1, else None."""
+    if os.getenv("WATCHLIST_IN_PROCESS", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return asyncio.create_task(get_scheduler().loop())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute watchlist analytics after each market close.")
+    parser.add_argument("--once", action="store_true", help="run the job once now and exit")
+    parser.add_argument("--symbols", help="comma-separated symbols (default: WATCHLIST)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    scheduler = WatchlistScheduler(watchlist_symbols(args.symbols))
+    if not scheduler.symbols and not get_alert_engine().symbols():
+        parser.error("nothing to do: set WATCHLIST (or pass --symbols) or ALERT_RULES_PATH")
+    if args.once:
+        run = asyncio.run(scheduler.run_once())
+        for symbol, outcome in run["symbols"].items():
+            print(f"{symbol}: {outcome['state']} {outcome.get('error', '')}".rstrip())
+    else:
+        asyncio.run(scheduler.loop())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SeriesLayout:
+    """
+    One Alpha Vantage time-series response format: the JSON key holding the
+    bars and the column each numbered field maps to, in upstream order.
+    """
+    key: str
+    columns: Tuple[str, ...]
+
+
+OHLCV = ("open", "high", "low", "close", "volume")
+ADJUSTED_OHLCV = ("open", "high", "low", "close", "adjusted_close", "volume",
+                  "dividend", "split_coefficient")
+INTEGER_COLUMNS = {"volume"}
+
+# Chunk size used when reading a streamed response body.
+CHUNK_BYTES = 64 * 1024
+# Bytes kept to explain a response without bars (error or rate-limit note).
+HEAD_BYTES = 16 * 1024
+
+_UNEXPECTED = "Unexpected API response format."
+
+
+def _dtype(column: str) -> type:
+    return np.int64 if column in INTEGER_COLUMNS else np.float64
+
+
+class SeriesParser:
+    """
+    Incremental parser for a time-series response body.
+
+    Bytes are fed as they arrive. Complete bars are cut at the last `}`,
+    split on quotes (every quoted token of a bar is the timestamp, then
+    alternating field names and values) and each column is converted with
+    one `np.fromstring` call into preallocated float64/int64/datetime64
+    arrays, so neither the JSON dict nor a Python float per value is built.
+    Anything before the bars (the "Meta Data" block, or an error note when
+    there are no bars) is kept in `head` for diagnostics.
+    """
+
+    def __init__(self, layout: SeriesLayout, capacity: int = 256):
+        self.layout = layout
+        self._stride = 2 * len(layout.columns) + 1
+        self._buffer = b""
+        self._seen_key = False
+        self.head = b""
+        self.rows = 0
+        self._dates = np.empty(capacity, dtype="datetime64[ns]")
+        self._columns: Dict[str, np.ndarray] = {
+            c: np.empty(capacity, dtype=_dtype(c)) for c in layout.columns
+        }
+
+    def feed(self, chunk: bytes) -> None:
+        if len(self.head) < HEAD_BYTES:
+            self.head += chunk[:HEAD_BYTES - len(self.head)]
+        self._buffer += chunk
+        if not self._seen_key:
+            start = self._buffer.find(f'"{self.layout.key}"'.encode())
+            if start < 0:
+                return
+            self._seen_key = True
+            self._buffer = self._buffer[start + len(self.layout.key) + 2:]
+
+        # Bars hold no nested objects, so the last `}` ends a complete bar
+        # (or the series itself); keep the unfinished rest for the next chunk.
+        end = self._buffer.rfind(b"}") + 1
+        if end:
+            segment, self._buffer = self._buffer[:end], self._buffer[end:]
+            self._decode(segment)
+
+    def _decode(self, segment: bytes) -> None:
+        tokens = segment.split(b'"')[1::2]
+        if not tokens:
+            return
+        stride = self._stride
+        names = tokens[1:stride:2]
+        if len(tokens) % stride or not all(name[:1].isdigit() for name in names):
+            raise RuntimeError(_UNEXPECTED)
+
+        count = len(tokens) // stride
+        lo, hi = self.rows, self.rows + count
+        self._reserve(hi)
+        try:
+            self._dates[lo:hi] = np.array(tokens[0::stride]).astype("datetime64[ns]")
+        except ValueError as e:
+            raise RuntimeError(_UNEXPECTED) from e
+        for i, column in enumerate(self.layout.columns):
+            text = b" ".join(tokens[2 + 2 * i::stride])
+            with warnings.catch_warnings():
+                # NumPy warns (future: raises) on a value it cannot parse.
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    values = np.fromstring(text, dtype=np.float64, sep=" ")
+                except (DeprecationWarning, ValueError) as e:
+                    raise RuntimeError(_UNEXPECTED) from e
+            if len(values) != count:
+                raise RuntimeError(_UNEXPECTED)
+            self._columns[column][lo:hi] = values
+        self.rows = hi
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._dates)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity)
+        self._dates = np.resize(self._dates, capacity)
+        self._columns = {c: np.resize(a, capacity) for c, a in self._columns.items()}
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Bars parsed so far, oldest first, indexed by timestamp. The frame
+        is built over the parser's arrays without copying them.
+        """
+        dates = self._dates[:self.rows]
+        columns = {c: a[:self.rows] for c, a in self._columns.items()}
+        # Upstream lists newest first: reverse as views.
+        if self.rows > 1 and dates[0] > dates[-1]:
+            dates = dates[::-1]
+            columns = {c: a[::-1] for c, a in columns.items()}
+        df = pd.DataFrame(columns, index=pd.DatetimeIndex(dates), copy=False)
+        return df if df.index.is_monotonic_increasing else df.sort_index(kind="stable")
+
+
+def parse_series(chunks: Iterable[bytes], layout: SeriesLayout) -> Tuple[pd.DataFrame, bytes]:
+    """Parse a whole streamed body; returns (bars, first bytes of the body)."""
+    parser = SeriesParser(layout)
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+    return parser.frame(), parser.head
+
@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from apps.services.dataset_registry import Dataset, DatasetRegistry, dataset_scope
+
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+SESSION_MAX_ITEMS = int(os.getenv("SESSION_MAX_ITEMS", "1000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "10"))
+# Per-session bounds: datasets kept, memoised results, characters of an answer in history.
+SESSION_MAX_DATASETS = 16
+SESSION_MAX_MEMO = 32
+SESSION_MAX_ANSWER_CHARS = 4000
+
+def _nbytes(value: Any) -> int:
+    """Approximate memory held by a frame, array, indicator result or dict of them."""
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(index=True).sum())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "series"):
+        return sum(_nbytes(v) for v in value.series.values())
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 0
+
+
+class Session:
+    """
+    One conversation: its chat history, the datasets its turns fetched (a
+    private DatasetRegistry, so handles from earlier turns stay valid) and
+    memoised fetches and indicator results, so a follow-up such as "now add
+    Bollinger bands" reuses them instead of fetching and parsing again.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.registry = DatasetRegistry(max_items=SESSION_MAX_DATASETS)
+        self.created_at = self.last_used = time.time()
+        self._turns: List[Tuple[str, str]] = []
+        self._fetches: Dict[Hashable, str] = {}
+        self._memo: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._counters = {"fetch_hits": 0, "memo_hits": 0}
+        self._lock = threading.Lock()
+
+    def add_turn(self, question: str, answer: str) -> None:
+        """Record a finished turn; the answer notes which datasets the session holds."""
+        datasets = [
+            f"{d.handle} ({d.symbol}, {len(d.frame)} {d.meta.get('interval', 'daily')} rows)"
+            for d in self.registry.datasets() if d.symbol
+        ]
+        if len(answer) > SESSION_MAX_ANSWER_CHARS:
+            answer = answer[:SESSION_MAX_ANSWER_CHARS] + " [...]"
+        if datasets:
+            answer += "\n\n[Datasets available in this conversation: " + ", ".join(datasets) + "]"
+        with self._lock:
+            self._turns.append((question, answer))
+            del self._turns[:-SESSION_MAX_TURNS]
+
+    @property
+    def turns(self) -> int:
+        """Number of finished turns held in the history."""
+        with self._lock:
+            return len(self._turns)
+
+    def history(self) -> List[Any]:
+        """Earlier turns as chat messages, oldest first."""
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        with self._lock:
+            turns = list(self._turns)
+        return [m for q, a in turns for m in (HumanMessage(q), AIMessage(a))]
+
+    def fetched(self, key: Hashable) -> Optional[Dataset]:
+        """The dataset an earlier identical fetch registered, if it is still held."""
+        with self._lock:
+            handle = self._fetches.get(key)
+        dataset = self.registry.get(handle) if handle else None
+        if dataset is not None:
+            with self._lock:
+                self._counters["fetch_hits"] += 1
+        return dataset
+
+    def remember_fetch(self, key: Hashable, dataset: Dataset) -> None:
+        with self._lock:
+            self._fetches[key] = dataset.handle
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """`compute()` once per key for this session (LRU-bounded). Results are shared: read-only."""
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self._counters["memo_hits"] += 1
+                return self._memo[key]
+        value = compute()
+        with self._lock:
+            self._memo[key] = value
+            while len(self._memo) > SESSION_MAX_MEMO:
+                self._memo.popitem(last=False)
+        return value
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the session's datasets and memoised results."""
+        with self._lock:
+            memo = list(self._memo.values())
+        return sum(_nbytes(d.frame) for d in self.registry.datasets()) + sum(_nbytes(v) for v in memo)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"turns": len(self._turns), "memo": len(self._memo), **self._counters}
+
+
+class SessionStore:
+    """
+    Sessions by id, bounded three ways: idle sessions expire after `ttl`
+    seconds, at most `max_items` are kept, and their datasets and memoised
+    results together stay under `max_bytes`. Over a bound, the least
+    recently used sessions are dropped first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = SESSION_TTL_SECONDS,
+        max_items: int = SESSION_MAX_ITEMS,
+        max_bytes: int = SESSION_MAX_BYTES,
+    ):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"created": 0, "resumed": 0, "expired": 0, "evicted": 0}
+
+    def get_or_create(self, session_id: Optional[str] = None, now: Optional[float] = None) -> Session:
+        """
+        The live session `session_id`, or a new one when it is missing or has
+        expired. New sessions always get a fresh uuid4 id: an unknown id sent
+        by a client is never adopted, so ids cannot be chosen (and handed to
+        someone else) in advance.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            session = self._items.get(session_id) if session_id else None
+            if session is not None:
+                self._counters["resumed"] += 1
+            else:
+                session_id = uuid.uuid4().hex
+                session = self._items[session_id] = Session(session_id)
+                self._counters["created"] += 1
+            session.last_used = now
+            self._items.move_to_end(session_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self._counters["evicted"] += 1
+            return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            self._expire(time.time())
+            return self._items.get(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._items.pop(session_id, None) is not None
+
+    def _expire(self, now: float) -> None:
+        # Insertion order is last-use order, so expired sessions are at the front.
+        while self._items:
+            session = next(iter(self._items.values()))
+            if session.last_used + self.ttl > now:
+                break
+            self._items.popitem(last=False)
+            self._counters["expired"] += 1
+
+    def trim(self, keep: Optional[Session] = None) -> int:
+        """
+        Evict least recently used sessions (never `keep`) until the memory
+        budget is met. Call after a turn has added data. Returns bytes held.
+        """
+        with self._lock:
+            sizes = OrderedDict((sid, s.nbytes()) for sid, s in self._items.items())
+            total = sum(sizes.values())
+            for sid, size in list(sizes.items()):
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and sid == keep.id:
+                    continue
+                del self._items[sid]
+                total -= size
+                self._counters["evicted"] += 1
+            return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._items.values())
+            counters = dict(self._counters)
+        return {**counters, "items": len(sessions), "bytes": sum(s.nbytes() for s in sessions)}
+
+
+_current_session: ContextVar[Optional[Session]] = ContextVar("current_session", default=None)
+
+
+def current_session() -> Optional[Session]:
+    """The session of the request being served, if it has one."""
+    return _current_session.get()
+
+
+@contextmanager
+def session_scope(session: Session) -> Iterator[DatasetRegistry]:
+    """Run the enclosed turn in `session`: its dataset registry, fetch and indicator memos."""
+    token = _current_session.set(session)
+    try:
+        with dataset_scope(session.registry) as registry:
+            yield registry
+    finally:
+        _current_session.reset(token)
+
+
+_default_store: Optional[SessionStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide session store."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SessionStore()
+        return _default_store
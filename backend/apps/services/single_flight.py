@@ -0,0 +1,63 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one.
+
+    The first caller for a key (the leader) runs the function; everyone who
+    asks for the same key while it is running waits for, and receives, the
+    leader's result or exception. Works from plain threads (`do`) and from
+    asyncio tasks (`ado`), which can share the same in-flight call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._counters = {"calls": 0, "leaders": 0, "coalesced": 0, "errors": 0}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            self._counters["calls"] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self._counters["leaders"] += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[..., Any], args, kwargs) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._counters["errors"] += 1
+            future.set_exception(e)
+        else:
+            # Forget the key before publishing so later callers start a new call
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args, kwargs)
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Async variant: `fn` is a blocking callable, run in a worker thread."""
+        future, leader = self._join(key)
+        if leader:
+            await asyncio.to_thread(self._run, key, future, fn, args, kwargs)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._inflight)}
@@ -0,0 +1,225 @@
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram buckets (seconds) shared by every span kind: from sub-millisecond
+# tool calls to multi-second LLM turns.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class Span:
+    """One timed operation: an LLM call, tool call, upstream request or render."""
+    kind: str
+    name: str
+    start: float
+    duration: float = 0.0
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+            **({"error": self.error} if self.error else {}),
+            **self.attrs,
+        }
+
+
+class Trace:
+    """Spans recorded during one API request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Any]:
+        """Timing breakdown for the API response: totals per kind plus every span."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        by_kind: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            entry = by_kind.setdefault(span.kind, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + span.duration * 1000, 2)
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "by_kind": by_kind,
+            "spans": [s.to_dict(self.started) for s in spans],
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide span aggregates, rendered in the Prometheus text format:
+    a duration histogram, an error counter and summed numeric attributes
+    (payload bytes, token counts) per span kind and name.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._totals: Dict[Tuple[str, str, str], float] = {}
+
+    def observe(self, span: Span) -> None:
+        key = (span.kind, span.name)
+        with self._lock:
+            # bucket counts, then sum and count
+            hist = self._histograms.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if span.duration <= bound:
+                    hist[i] += 1
+            hist[-2] += span.duration
+            hist[-1] += 1
+            if span.error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for attr, value in span.attrs.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    total_key = (span.kind, span.name, attr)
+                    self._totals[total_key] = self._totals.get(total_key, 0) + value
+
+    def render(self, prefix: str = "stock") -> str:
+        with self._lock:
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+            errors = dict(self._errors)
+            totals = dict(self._totals)
+
+        lines = [
+            f"# HELP {prefix}_span_duration_seconds Duration of traced operations.",
+            f"# TYPE {prefix}_span_duration_seconds histogram",
+        ]
+        for (kind, name), hist in sorted(histograms.items()):
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            for bound, count in zip(self.buckets, hist):
+                lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="+Inf"}} {hist[-1]}')
+            lines.append(f"{prefix}_span_duration_seconds_sum{{{labels}}} {hist[-2]:.6f}")
+            lines.append(f"{prefix}_span_duration_seconds_count{{{labels}}} {hist[-1]}")
+
+        lines += [
+            f"# HELP {prefix}_span_errors_total Traced operations that raised.",
+            f"# TYPE {prefix}_span_errors_total counter",
+        ]
+        for (kind, name), count in sorted(errors.items()):
+            lines.append(f'{prefix}_span_errors_total{{kind="{kind}",name="{_escape(name)}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_span_attribute_total Summed span attributes (bytes, rows, tokens).",
+            f"# TYPE {prefix}_span_attribute_total counter",
+        ]
+        for (kind, name, attr), value in sorted(totals.items()):
+            lines.append(
+                f'{prefix}_span_attribute_total{{kind="{kind}",name="{_escape(name)}",attr="{attr}"}} {value:g}'
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+            self._totals.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = MetricsRegistry()
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_scope(trace: Optional[Trace] = None) -> Iterator[Trace]:
+    """Collect the spans of the enclosed request (threads started with its context included)."""
+    if trace is None:
+        trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record(span: Span, trace: Optional[Trace] = None) -> None:
+    """Add a finished span to the metrics and to `trace` (default: the current request's)."""
+    METRICS.observe(span)
+    trace = trace or _current_trace.get()
+    if trace is not None:
+        trace.add(span)
+
+
+def render_gauges(groups: Dict[str, Dict[str, Any]], prefix: str = "stock") -> str:
+    """Numeric values of stats dicts as Prometheus gauges named <prefix>_<group>_<key>."""
+    lines = []
+    for group, values in groups.items():
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{prefix}_{group}_{key}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value:g}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time the enclosed block as a span. Yields its attribute dict so the
+    block can add sizes or counts once they are known.
+    """
+    current = Span(kind, name, time.perf_counter(), attrs=dict(attrs))
+    try:
+        yield current.attrs
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        record(current)
+
+
+def _sized(result: Any, attrs: Dict[str, Any]) -> Any:
+    if isinstance(result, (str, bytes)):
+        attrs["output_bytes"] = len(result)
+    return result
+
+
+def traced(kind: str, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator recording every call of a sync or async function as a span."""
+
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(kind, span_name) as attrs:
+                    return _sized(await fn(*args, **kwargs), attrs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, span_name) as attrs:
+                return _sized(fn(*args, **kwargs), attrs)
+        return wrapper
+
+    return decorate
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+
+
+class Readiness:
+    """
+    Startup state of the slow-to-build parts of a worker (agent executor,
+    HTTP pool, chart render processes). Each component is built once in
+    the background; /health reports the result. A failed component is
+    built again lazily by the first request that needs it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._components.clear()
+            self.started_at = time.time()
+
+    def _set(self, name: str, **state: Any) -> None:
+        with self._lock:
+            self._components[name] = {**self._components.get(name, {}), **state}
+
+    def run(self, name: str, build: Callable[[], Any]) -> bool:
+        """Build one component, recording its state and duration."""
+        self._set(name, state=PENDING)
+        started = time.perf_counter()
+        try:
+            build()
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s", name, e)
+            self._set(name, state=FAILED, seconds=round(time.perf_counter() - started, 3), error=str(e))
+            return False
+        self._set(name, state=READY, seconds=round(time.perf_counter() - started, 3))
+        return True
+
+    async def warm(self, components: Dict[str, Callable[[], Any]]) -> None:
+        """Build all components concurrently, off the event loop."""
+        await asyncio.gather(*(
+            asyncio.to_thread(self.run, name, build) for name, build in components.items()
+        ))
+
+    @property
+    def ready(self) -> bool:
+        """Nothing is still building (failures do not block: they are retried on use)."""
+        with self._lock:
+            return all(c["state"] != PENDING for c in self._components.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {name: dict(c) for name, c in self._components.items()}
+        return {
+            "ready": all(c["state"] != PENDING for c in components.values()),
+            "degraded": any(c["state"] == FAILED for c in components.values()),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "components": components,
+        }
+
+
+READINESS = Readiness()
+
+
+def warm_task(components: Dict[str, Callable[[], Any]]) -> Optional["asyncio.Task[None]"]:
+    """Start warming `components` in the background; None if there is nothing to warm."""
+    READINESS.reset()
+    if not components:
+        return None
+    # Pending from the start, so /health is never "ready" before warm-up runs.
+    for name in components:
+        READINESS._set(name, state=PENDING)
+    return asyncio.create_task(READINESS.warm(components))
@@ -0,0 +1,173 @@
+import asyncio
+import inspect
+import json
+from contextlib import contextmanager
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from apps.api import routes_agent
+from apps.main import app
+from apps.services import response_cache
+from apps.services.response_cache import ResponseCache, response_key
+from apps.services.run_limiter import RunLimiter
+
+
+async def _notify(callbacks, method: str, *args, **kwargs) -> None:
+    for handler in callbacks:
+        result = getattr(handler, method)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            await result
+
+
+class _ScriptedExecutor:
+    """Stands in for the agent executor: drives the run's callbacks through a fixed script."""
+
+    def __init__(
+        self,
+        fail: bool = False,
+        hang: bool = False,
+        tool_output: str = "Chart: /static/charts/ibm.png",
+        answer: str = "IBM is up.",
+    ):
+        self.fail = fail
+        self.hang = hang
+        self.tool_output = tool_output
+        self.answer = answer
+        self.cancelled = False
+
+    async def ainvoke(self, inputs, config):
+        callbacks = config["callbacks"]
+        run_id = uuid4()
+        await _notify(callbacks, "on_tool_start", {"name": "fetch_stock_prices"}, "IBM", run_id=run_id)
+        await _notify(callbacks, "on_tool_end", self.tool_output, run_id=run_id)
+        if self.fail:
+            raise RuntimeError("model exploded")
+        if self.hang:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        for token in ["IBM ", "is up."]:
+            await _notify(callbacks, "on_llm_new_token", token, run_id=run_id)
+        return {"input": inputs["input"], "output": self.answer, "intermediate_steps": []}
+
+
+@contextmanager
+def _scripted(executor: _ScriptedExecutor):
+    """Serve the agent endpoints from `executor`, with a fresh run limiter and response cache."""
+    saved = routes_agent.get_agent_executor, routes_agent.get_run_limiter, response_cache._default_cache
+    limiter = RunLimiter(max_concurrency=1, max_queue=0, timeout=30)
+    routes_agent.get_agent_executor = lambda: executor
+    routes_agent.get_run_limiter = lambda: limiter
+    response_cache._default_cache = ResponseCache()
+    try:
+        yield limiter
+    finally:
+        routes_agent.get_agent_executor, routes_agent.get_run_limiter, response_cache._default_cache = saved
+
+
+def _events(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_emits_progress_then_result():
+    with _scripted(_ScriptedExecutor()) as limiter:
+        response = TestClient(app).post("/api/agent/query/stream", json={"input": "IBM", "mode": "agent"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["tool_start", "tool_end", "chart", "token", "token", "result"]
+    assert events[0][1]["tool"] == events[1][1]["tool"] == "fetch_stock_prices"
+    assert events[2][1] == {"url": "/static/charts/ibm.png"}
+    assert "".join(data["text"] for name, data in events if name == "token") == "IBM is up."
+    assert events[-1][1]["summary"] == "IBM is up." and events[-1][1]["session_id"]
+    assert limiter.stats()["running"] == 0
+
+
+def test_stream_reports_agent_failure_as_error_event():
+    with _scripted(_ScriptedExecutor(fail=True)) as limiter:
+        response = TestClient(app).post("/api/agent/query/stream", json={"input": "IBM", "mode": "agent"})
+
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["tool_start", "tool_end", "chart", "error"]
+    assert events[-1][1]["status"] == 500 and "model exploded" in events[-1][1]["detail"]
+    assert limiter.stats()["running"] == 0
+
+
+async def _read_first_event_then_disconnect(body: bytes, limiter: RunLimiter):
+    """
+    Drive the ASGI app directly: the client goes away after the first
+    streamed event. Returns the chunks received and the limiter's stats
+    once the request has ended (checked before the loop shuts down, which
+    would cancel any leftover task anyway).
+    """
+    first_chunk = asyncio.Event()
+    request_sent = False
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            first_chunk.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/agent/query/stream",
+        "raw_path": b"/api/agent/query/stream", "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+    # Let the cancelled agent task unwind.
+    await asyncio.sleep(0.05)
+    return chunks, limiter.stats(), limiter._semaphore.locked()
+
+
+def test_disconnect_cancels_run_and_frees_the_slot():
+    executor = _ScriptedExecutor(hang=True)
+    with _scripted(executor) as limiter:
+        body = json.dumps({"input": "IBM", "mode": "agent"}).encode()
+        chunks, stats, locked = asyncio.run(_read_first_event_then_disconnect(body, limiter))
+
+    assert chunks and chunks[0].startswith(b"event: tool_start")
+    assert stats["running"] == 0 and stats["waiting"] == 0 and not locked
+    assert executor.cancelled
+
+
+def test_cacheability_follows_the_run_outcome():
+    key = response_key("IBM") + "|agent"
+    client = TestClient(app)
+
+    # A tool error makes the run uncacheable even when the answer reads fine.
+    with _scripted(_ScriptedExecutor(tool_output="ERROR: upstream quota exhausted")):
+        client.post("/api/agent/query", json={"input": "IBM", "mode": "agent"})
+        client.post("/api/agent/query/stream", json={"input": "IBM", "mode": "agent"})
+        assert response_cache._default_cache.get(key) is None
+
+    # A clean run is cached, even if its answer happens to mention "ERROR".
+    answer = "IBM's ERROR-free quarter: the stock is up."
+    with _scripted(_ScriptedExecutor(answer=answer)):
+        client.post("/api/agent/query", json={"input": "IBM", "mode": "agent"})
+        assert response_cache._default_cache.get(key)["summary"] == answer
+
+
+if __name__ == "__main__":
+    test_stream_emits_progress_then_result()
+    test_stream_reports_agent_failure_as_error_event()
+    test_disconnect_cancels_run_and_frees_the_slot()
+    test_cacheability_follows_the_run_outcome()
+    print("agent stream tests passed")
@@ -0,0 +1,172 @@
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from apps.benchmarks.fixtures import offline
+from apps.main import app
+from apps.services import alerts
+from apps.services.alerts import AlertEngine, parse_rule
+
+
+def _bars(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1.0},
+        index=pd.bdate_range("2020-01-01", periods=rows),
+    )
+
+
+def test_parse_rule():
+    lhs, op, rhs = parse_rule("close crosses above sma:50")
+    assert (lhs.key, op, rhs.key) == ("close", "crosses_above", "sma_50")
+    assert parse_rule("close < bb:20:2:lower")[1:] == ("below", parse_rule("close below bb:20:2:lower")[2])
+    lhs, op, rhs = parse_rule("250 below close")
+    assert (lhs.key, op, rhs.value) == ("close", "above", 250.0)
+    for bad in ("close near sma:50", "close above ema:12", "1 above 2", "close above bb:20:2"):
+        try:
+            parse_rule(bad)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
+
+
+def test_bar_by_bar_signals_match_reference():
+    frame = _bars(300, seed=3)
+    engine = AlertEngine()
+    engine.add_rules([("X", "close crosses above sma:20"), ("X", "close below bb:20:2:lower")])
+    fired = {1: [], 2: []}
+    for t in range(60, len(frame) + 1):
+        assert engine.on_bar("X", frame.iloc[:t])
+        assert not engine.on_bar("X", frame.iloc[:t])  # same bar twice
+        for signal in engine.evaluate():
+            fired[signal["rule_id"]].append(signal["date"])
+
+    close = frame["close"]
+    sma = close.rolling(20).mean()
+    lower = sma - 2 * close.rolling(20).std()
+    dates = frame.index.strftime("%Y-%m-%d")
+    crosses = (close > sma) & (close.shift() <= sma.shift())
+    below = (close < lower).to_numpy()
+    was_below = np.roll(below, 1)
+    was_below[59] = False  # nothing evaluated before the first bar
+    window = slice(59, None)
+    assert fired[1] == list(dates[window][crosses.to_numpy()[window]])
+    assert fired[2] == list(dates[window][(below & ~was_below)[window]])
+    assert fired[1] and fired[2]
+
+
+def test_ten_thousand_rules_on_five_hundred_symbols():
+    templates = [
+        "close crosses above sma:50", "close crosses below sma:50", "sma:20 crosses above sma:50",
+        "close below bb:20:2:lower", "close above bb:20:2:upper", "close crosses above sma:200",
+        "high above bb:20:2:upper", "low below sma:20", "close above 100", "close below 90",
+    ]
+    engine = AlertEngine()
+    symbols = [f"S{i:03d}" for i in range(500)]
+    engine.add_rules((s, r) for s in symbols for r in templates * 2)
+    frames = {s: _bars(260, seed=i) for i, s in enumerate(symbols)}
+    for s, f in frames.items():
+        engine.on_bar(s, f.iloc[:-1])
+    engine.evaluate()
+
+    for s, f in frames.items():
+        engine.on_bar(s, f)
+    started = time.perf_counter()
+    engine.evaluate()
+    elapsed = time.perf_counter() - started
+
+    stats = engine.stats()
+    assert stats["rules"] == 10_000 and stats["symbols"] == 500 and stats["evaluations"] == 20_000
+    assert stats["operands"] == 8
+    assert elapsed < 0.05, elapsed
+
+
+def test_rule_with_new_operand_is_checked_on_the_current_bar():
+    frame = _bars(300, seed=3)
+    close = frame["close"]
+    sma = close.rolling(20).mean()
+    crosses = ((close > sma) & (close.shift() <= sma.shift())).to_numpy()
+    t = int(np.flatnonzero(crosses[60:])[0]) + 61  # frame.iloc[:t] ends on a crossing bar
+    date = frame.index[t - 1].strftime("%Y-%m-%d")
+
+    engine = AlertEngine()
+    crossing = engine.add_rules([("X", "close crosses above sma:20")])[0]["id"]
+    assert engine.on_bar("X", frame.iloc[:t])
+    assert [s["rule_id"] for s in engine.evaluate()] == [crossing]
+
+    # sma:10 was never computed for X: the same bar is read again for it.
+    side = "above" if close.iloc[t - 1] > close.rolling(10).mean().iloc[t - 1] else "below"
+    level = engine.add_rules([("X", f"close {side} sma:10")])[0]["id"]
+    assert engine.on_bar("X", frame.iloc[:t])
+    signals = engine.evaluate()
+    assert [(s["rule_id"], s["date"]) for s in signals] == [(level, date)]  # no repeated crossing
+    assert not np.isnan(signals[0]["threshold"])
+    assert not engine.on_bar("X", frame.iloc[:t])
+
+    # A rule over operands already computed waits for the next bar.
+    engine.add_rules([("X", "close above sma:20")])
+    assert not engine.on_bar("X", frame.iloc[:t])
+
+
+def test_rules_persist():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rules.json"
+        engine = AlertEngine(path=path)
+        first, second = engine.add_rules([("ibm", "close above 1"), ("MSFT", "close below sma:20")])
+        engine.remove_rule(first["id"])
+        reloaded = AlertEngine(path=path)
+        assert reloaded.rules() == [second]
+        assert reloaded.add_rules([("IBM", "close above 2")])[0]["id"] == second["id"] + 1
+
+        # Reloading is one batch and does not rewrite the file.
+        engine.add_rules((f"S{i:03d}", "close crosses above sma:50") for i in range(10_000))
+        saved = path.stat().st_mtime_ns
+        started = time.perf_counter()
+        reloaded = AlertEngine(path=path)
+        elapsed = time.perf_counter() - started
+        assert reloaded.stats()["rules"] == 10_001 and path.stat().st_mtime_ns == saved
+        assert elapsed < 2.0, elapsed
+
+
+def test_endpoints_scan_and_poll():
+    saved = alerts._engine
+    alerts._engine = AlertEngine()
+    try:
+        client = TestClient(app)
+        assert client.post("/api/alerts/rules", json={"symbols": ["IBM"], "rules": ["close nearly sma:5"]}).status_code == 422
+        created = client.post("/api/alerts/rules", json={
+            "symbols": ["IBM", "SYN50K"], "rules": ["close above 0", "close crosses above sma:200"],
+        }).json()["rules"]
+        assert len(created) == 4 and created[0] == {"id": 1, "symbol": "IBM", "rule": "close above 0"}
+
+        with offline():
+            scanned = client.post("/api/alerts/scan").json()
+            again = client.post("/api/alerts/scan").json()
+        assert scanned["symbols"] == 2 and not scanned["errors"]
+        assert {s["symbol"] for s in scanned["fired"] if s["rule"] == "close above 0"} == {"IBM", "SYN50K"}
+        assert again["fired"] == []  # no new bar
+
+        polled = client.get("/api/alerts/signals", params={"after": 0}).json()
+        assert len(polled["signals"]) == len(scanned["fired"])
+        assert client.get("/api/alerts/signals", params={"after": polled["last_id"]}).json()["signals"] == []
+
+        assert client.delete(f"/api/alerts/rules/{created[0]['id']}").status_code == 204
+        assert len(client.get("/api/alerts/rules", params={"symbol": "ibm"}).json()["rules"]) == 1
+        assert "stock_alerts_rules 3" in client.get("/metrics").text
+    finally:
+        alerts._engine = saved
+
+
+if __name__ == "__main__":
+    test_parse_rule()
+    test_bar_by_bar_signals_match_reference()
+    test_rule_with_new_operand_is_checked_on_the_current_bar()
+    test_ten_thousand_rules_on_five_hundred_symbols()
+    test_rules_persist()
+    test_endpoints_scan_and_poll()
+    print("alert tests passed")
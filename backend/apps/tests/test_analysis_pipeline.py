@@ -0,0 +1,80 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.pipeline import AnalysisParams, fast_path_params, run_analysis
+from apps.services import alpha_vantage_client, chart_cache
+from apps.services.alpha_vantage_client import AlphaVantageClient
+from apps.services.chart_cache import ChartCache
+from apps.services.dataset_registry import dataset_scope
+from apps.services.market_calendar import last_session_date
+from apps.services.price_store import PriceStore
+from apps.services.query_parser import parse_query
+
+
+def _route(text: str):
+    return fast_path_params(parse_query(text))
+
+
+def test_router_sends_only_standard_requests_to_fast_path():
+    params = _route("show me apple for the past 6 months with 20 and 50 day moving averages")
+    assert params.symbol == "AAPL" and params.range_days == 180 and params.windows == (20, 50)
+    assert _route("TSLA bollinger bands").windows == (5, 20, 50)
+
+    assert _route("Should I buy AAPL?") is None
+    assert _route("Compare AAPL and MSFT") is None
+    assert _route("AAPL RSI last month") is None
+    assert _route("what is a moving average") is None
+    assert _route("AAPL from 2020-01-01 to 2021-01-01") is None
+    assert _route("AAPL price on 2023-05-01") is None
+    assert _route("AAPL weekly bars") is None
+    assert _route("show amzn and goog") is None
+    assert _route("How is IT doing?") is None
+    assert _route("how is $IT doing?").symbol == "IT"
+
+
+def test_pipeline_runs_without_agent():
+    end = pd.Timestamp(last_session_date())
+    dates = pd.bdate_range(end=end, periods=300)
+    close = np.linspace(100, 160, len(dates))
+    bars = pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close,
+         "volume": np.full(len(dates), 1_000_000)},
+        index=dates,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp) / "prices")
+        store.write("TEST", bars, full_history=True)
+        saved = alpha_vantage_client._client, chart_cache._default_cache
+        alpha_vantage_client._client = AlphaVantageClient(api_key="unused", store=store)
+        chart_cache._default_cache = ChartCache(Path(tmp) / "charts")
+        try:
+            params = AnalysisParams(symbol="test", range_days=60, summarize=False)
+            with dataset_scope():
+                response = asyncio.run(run_analysis(params))
+            params.chart = True
+            with dataset_scope():
+                with_png = asyncio.run(run_analysis(params))
+        finally:
+            alpha_vantage_client._client, chart_cache._default_cache = saved
+
+    raw = response["raw_result"]
+    assert raw["pipeline"] == "fast" and raw["end_date"] == end.strftime("%Y-%m-%d")
+    assert abs(raw["last"]["sma_50"] - close[-50:].mean()) < 1e-9
+    assert raw["stats"]["max"] == close[-1]
+    assert response["series_urls"] == [raw["series_url"]]
+    assert raw["series_url"].startswith("/api/series/TEST?") and "sma%3A50" in raw["series_url"]
+    assert response["chart_urls"] == [] and "50-day SMA" in response["summary"]
+    # The PNG is only rendered when asked for.
+    assert with_png["chart_urls"] and with_png["chart_urls"][0].startswith("/static/charts/")
+    assert with_png["chart_urls"][0] in with_png["summary"]
+
+
+if __name__ == "__main__":
+    test_router_sends_only_standard_requests_to_fast_path()
+    test_pipeline_runs_without_agent()
+    print("analysis pipeline tests passed")
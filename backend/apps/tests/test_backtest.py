@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.pipeline import fast_path_params
+from apps.agents.tools import backtest_strategy, fetch_stock_prices
+from apps.analytics import backtest_grid, buy_and_hold, parse_grid
+from apps.benchmarks.fixtures import offline
+from apps.services.dataset_registry import dataset_scope
+from apps.services.query_parser import parse_query
+
+
+def _loop_crossover(close, fast, slow, start, cost):
+    """Bar-by-bar reference implementation."""
+    sma = lambda w: pd.Series(close).rolling(w).mean().to_numpy()
+    fast_ma, slow_ma = sma(fast), sma(slow)
+    equity, peak, worst, position, trades = 1.0, 1.0, 0.0, 0, 0
+    for t in range(start + 1, len(close)):
+        held = 1 if fast_ma[t - 1] > slow_ma[t - 1] and t - 1 >= start else 0
+        charge = cost if held != position else 0.0
+        trades += held if held != position else 0
+        position = held
+        equity *= 1 + held * (close[t] / close[t - 1] - 1) - charge
+        peak = max(peak, equity)
+        worst = min(worst, equity / peak - 1)
+    return equity - 1, worst, trades
+
+
+def _loop_reversion(close, window, num_std, start):
+    series = pd.Series(close)
+    mid = series.rolling(window).mean().to_numpy()
+    lower = mid - num_std * series.rolling(window).std().to_numpy()
+    position, positions = 0, []
+    for t in range(start, len(close)):
+        if close[t] < lower[t]:
+            position = 1
+        elif close[t] > mid[t]:
+            position = 0
+        positions.append(position)
+    equity = 1.0
+    for i in range(1, len(positions)):
+        equity *= 1 + positions[i - 1] * (close[start + i] / close[start + i - 1] - 1)
+    return equity - 1
+
+
+def test_parse_grid():
+    assert parse_grid("5,10-30:10") == [5, 10, 20, 30]
+    assert parse_grid("1.5-2.5:0.5", cast=float) == [1.5, 2.0, 2.5]
+    assert parse_grid("20, 20 ,50") == [20, 50]
+
+
+def test_grid_matches_bar_by_bar_loop():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, 1500)))
+    start = 99
+
+    table = backtest_grid(close, "sma_crossover", fast=[10, 20], slow=[50, 100], start=start, cost_bps=5)
+    assert len(table) == 4
+    for f, s in [(10, 50), (20, 100)]:
+        total, drawdown, trades = _loop_crossover(close, f, s, start, 5 / 10_000)
+        row = table.loc[f"fast={f},slow={s}"]
+        assert abs(row["total_return"] - total) < 1e-9
+        assert abs(row["max_drawdown"] - drawdown) < 1e-9
+        assert row["trades"] == trades
+
+    bands = backtest_grid(close, "bollinger_reversion", windows=[20, 40], num_std=[1.5, 2.0], start=start)
+    assert abs(bands.loc["window=20,num_std=1.5", "total_return"] - _loop_reversion(close, 20, 1.5, start)) < 1e-9
+
+    hold = buy_and_hold(close, start)
+    assert abs(hold["total_return"] - (close[-1] / close[start] - 1)) < 1e-9
+
+
+def test_tool_sweeps_hundreds_of_combinations_fast():
+    with offline(), dataset_scope():
+        handle = fetch_stock_prices.invoke({"symbol": "IBM", "output_size": "full"}).split()[1]
+        backtest_strategy.invoke({"csv_data": handle, "top_n": 1})  # warm-up
+        started = time.perf_counter()
+        result = backtest_strategy.invoke({
+            "csv_data": handle, "fast_windows": "5-50:5", "slow_windows": "20-300:5", "top_n": 3,
+        })
+        elapsed = time.perf_counter() - started
+        bad = backtest_strategy.invoke({"csv_data": handle, "fast_windows": "300", "slow_windows": "50"})
+
+    assert result["combinations"] > 500 and result["bars"] > 6000
+    assert elapsed < 1.0, elapsed
+    table = result["table"]
+    assert table["columns"][0] == "params" and len(table["rows"]) == 3
+    assert table["rows"][0][table["columns"].index("rank")] == 1
+    assert "sharpe" in result["buy_and_hold"]
+    assert "error" in bad
+
+
+def test_backtest_questions_go_to_the_agent():
+    text = "would a 20/50 crossover have worked on TSLA?"
+    parsed = parse_query(text)
+    assert parsed.sma_windows == [20, 50] and "backtest" in parsed.indicators
+    assert fast_path_params(parsed) is None
+    assert parsed.cache_key() != parse_query("TSLA 20 and 50 day moving averages").cache_key()
+
+
+if __name__ == "__main__":
+    test_parse_grid()
+    test_grid_matches_bar_by_bar_loop()
+    test_tool_sweeps_hundreds_of_combinations_fast()
+    test_backtest_questions_go_to_the_agent()
+    print("backtest tests passed")
@@ -0,0 +1,117 @@
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools.batch_analysis import analyze_batch, batch_analysis
+from apps.analytics import build_panel, compute_indicators, cross_section, parse_specs
+from apps.benchmarks.fixtures import fixture_client
+from apps.services import alpha_vantage_client
+from apps.services.alpha_vantage_client import AlphaVantageClient
+from apps.services.market_calendar import last_session_date
+from apps.services.price_store import PriceStore
+from apps.services.rate_limiter import RateLimiter
+
+
+def _frames(symbols, rows: int = 300):
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range(end=pd.Timestamp(last_session_date()), periods=rows)
+    frames = {}
+    for symbol in symbols:
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, rows)))
+        frames[symbol] = pd.DataFrame(
+            {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+             "volume": rng.integers(1_000, 10_000, rows)},
+            index=dates,
+        )
+    return frames
+
+
+def test_cross_section_matches_per_symbol_engine():
+    frames = _frames(["AAA", "BBB", "CCC"])
+    frames["CCC"] = frames["CCC"].iloc[150:]  # listed later: shorter history
+    specs = parse_specs("sma:20,sma:200,ema:12,rsi:14,macd:12:26:9")
+    table = cross_section(build_panel(frames), specs)
+
+    for symbol, frame in frames.items():
+        expected = compute_indicators(frame.rename_axis("date").reset_index(), specs).last_values()
+        row = table.loc[symbol]
+        for key in ("sma_20", "sma_200", "ema_12", "rsi_14", "macd_12_26_9"):
+            if expected[key] is None or np.isnan(expected[key]):
+                assert np.isnan(row[key]), (symbol, key)
+            else:
+                assert abs(row[key] - expected[key]) <= 1e-9 * max(1.0, abs(expected[key])), (symbol, key)
+        assert row["return_period"] == frame["close"].iloc[-1] / frame["close"].iloc[0] - 1
+
+    assert np.isnan(table.loc["CCC", "sma_200"])
+    assert list(table["rank"]) == [1, 2, 3]
+    assert table["return_period"].is_monotonic_decreasing
+
+
+def test_batch_tool_reports_missing_symbols():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        for symbol, frame in _frames(["AAA", "BBB", "CCC", "DDD"]).items():
+            store.write(symbol, frame, full_history=True)
+
+        def unknown_symbol(symbol, output_size):
+            raise RuntimeError(f"Invalid API call for {symbol}")
+
+        saved = alpha_vantage_client._client
+        alpha_vantage_client._client = AlphaVantageClient(api_key="unused", store=store)
+        # Symbols not in the store fail on their own, without touching the network.
+        alpha_vantage_client._client._fetch_daily_upstream = unknown_symbol
+        try:
+            result = batch_analysis.invoke({
+                "symbols": "aaa, BBB,CCC,DDD,NOPE",
+                "indicators": "sma:50,rsi:14",
+                "range_days": 180,
+                "rank_by": "volatility",
+                "ascending": True,
+                "top_n": 3,
+                "correlation": True,
+            })
+        finally:
+            alpha_vantage_client._client = saved
+
+    assert "error" not in result, result
+    assert result["symbols"] == 4 and list(result["errors"]) == ["NOPE"]
+    columns, rows = result["table"]["columns"], result["table"]["rows"]
+    assert columns[0] == "symbol" and columns[-1] == "rank" and "close_vs_sma_50" in columns
+    assert len(rows) == 3
+    vol = columns.index("volatility")
+    assert rows[0][vol] <= rows[1][vol] <= rows[2][vol]
+    assert result["correlation"]["symbols"] == ["AAA", "BBB", "CCC", "DDD"]
+
+
+def test_uncached_symbols_beyond_free_slots_are_deferred():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        for symbol, frame in _frames(["AAA", "BBB"]).items():
+            store.write(symbol, frame, full_history=True)
+        client = fixture_client(store)
+        # Three free slots now; a fourth call would queue for 20 seconds.
+        client.limiter = RateLimiter(per_minute=3, per_day=100)
+        saved = alpha_vantage_client._client
+        alpha_vantage_client._client = client
+        try:
+            started = time.perf_counter()
+            result = analyze_batch(["AAA", "BBB", "C1", "C2", "C3", "C4", "C5"], indicators="sma:20")
+            busy = client.fetch_many(["C4"], max_wait=0)
+            elapsed = time.perf_counter() - started
+        finally:
+            alpha_vantage_client._client = saved
+
+    assert result["symbols"] == 5 and result["deferred"] == ["C4", "C5"] and not result["errors"]
+    assert client.session.calls == 3
+    assert not busy[0] and "quota busy" in busy[1]["C4"]
+    assert elapsed < 5.0, elapsed
+
+
+if __name__ == "__main__":
+    test_cross_section_matches_per_symbol_engine()
+    test_batch_tool_reports_missing_symbols()
+    test_uncached_symbols_beyond_free_slots_are_deferred()
+    print("batch panel tests passed")
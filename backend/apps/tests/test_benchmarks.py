@@ -0,0 +1,43 @@
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from apps.benchmarks.fake_llm import ScriptedChatModel
+from apps.benchmarks.harness import Result, compare, percentile
+from apps.benchmarks.tools import tool_scenarios
+
+
+def test_percentiles_and_baseline_comparison():
+    assert percentile([4, 1, 3, 2], 50) == 2.5
+    assert percentile([1, 2, 3, 4, 5], 90) == 4.6
+
+    before = Result("tool", [0.010] * 10, wall=0.1).summary()
+    slower = Result("tool", [0.015] * 10, wall=0.15)
+    same = Result("tool", [0.0105] * 10, wall=0.105)
+    assert compare([same], {"tool": before}) == []
+    problems = compare([slower], {"tool": before})
+    assert any("p50_ms" in p for p in problems) and any("throughput" in p for p in problems)
+    assert compare([slower], {}) == []
+
+
+def test_scripted_model_replays_tool_calls():
+    model = ScriptedChatModel().bind_tools([])
+    first = model.invoke([HumanMessage("How is IBM doing?")])
+    assert [c["name"] for c in first.tool_calls] == ["fetch_stock_prices"]
+
+    fetched = ToolMessage("DATASET: ds_0123456789ab\nIBM: ...", tool_call_id=first.tool_calls[0]["id"])
+    second = model.invoke([HumanMessage("How is IBM doing?"), first, fetched])
+    assert {c["args"]["csv_data"] for c in second.tool_calls} == {"ds_0123456789ab"}
+    assert ScriptedChatModel().invoke("summarise").content  # unbound: plain reply
+
+
+def test_tool_suite_runs_offline():
+    results = tool_scenarios(sizes=["compact"], repeat=1, plot_repeat=1)
+    names = [r.name for r in results]
+    assert "fetch_stock_prices[compact]" in names and "generate_plot[compact,cached]" in names
+    assert all(r.errors == 0 for r in results), [(r.name, r.errors) for r in results if r.errors]
+
+
+if __name__ == "__main__":
+    test_percentiles_and_baseline_comparison()
+    test_scripted_model_replays_tool_calls()
+    test_tool_suite_runs_offline()
+    print("benchmark harness tests passed")
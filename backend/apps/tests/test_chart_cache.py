@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.services import chart_cache
+from apps.services.chart_cache import ChartCache, chart_key
+from apps.services.chart_renderer import CHART_STYLE
+
+
+def _frame(scale: float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-01", periods=50),
+        "close": np.linspace(100, 150, 50) * scale,
+    })
+
+
+def test_key_depends_on_content_only():
+    key = chart_key(_frame(), "date", "close", "line", CHART_STYLE)
+    assert key == chart_key(_frame().copy(), "date", "close", "line", CHART_STYLE)
+    assert key != chart_key(_frame(1.01), "date", "close", "line", CHART_STYLE)
+    assert key != chart_key(_frame(), "date", "close", "line", {**CHART_STYLE, "dpi": 200})
+
+
+def test_eviction_by_age_then_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChartCache(Path(tmp), max_bytes=250, max_age=3600)
+        now = time.time()
+        for i, age in enumerate([7200, 300, 200, 100]):
+            path = cache.path_for(f"k{i}")
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (now - age, now - age))
+        (Path(tmp) / "unrelated.txt").write_bytes(b"x" * 1000)
+
+        assert cache.evict(now) == 2  # k0 too old, then k1 is least recently used
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["chart_k2.png", "chart_k3.png", "unrelated.txt"]
+
+
+def test_generate_plot_reuses_rendered_chart():
+    from apps.agents.tools.generate_plot import generate_plot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = chart_cache._default_cache
+        chart_cache._default_cache = ChartCache(Path(tmp))
+        try:
+            csv = _frame().to_csv(index=False)
+            first = generate_plot.invoke({"csv_data": csv})
+            assert first.startswith("/static/charts/chart_"), first
+            rendered = Path(tmp) / first.rsplit("/", 1)[1]
+            assert rendered.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+            mtime = rendered.stat().st_mtime_ns
+            assert generate_plot.invoke({"csv_data": csv}) == first
+            assert rendered.stat().st_mtime_ns >= mtime
+            assert chart_cache._default_cache.stats()["hits"] == 1
+        finally:
+            chart_cache._default_cache = saved
+
+
+if __name__ == "__main__":
+    test_key_depends_on_content_only()
+    test_eviction_by_age_then_size()
+    test_generate_plot_reuses_rendered_chart()
+    print("chart cache tests passed")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools.bollinger import bollinger_bands
+from apps.agents.tools.calculate_stats import calculate_stats
+from apps.agents.tools.moving_averages import moving_averages
+from apps.services.dataset_registry import current_registry, dataset_scope, resolve_dataset
+
+
+def _frame(rows: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    # Rounded so the CSV round-trip is exact.
+    close = np.round(100 + rng.standard_normal(rows).cumsum(), 2)
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-01", periods=rows),
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.full(rows, 1000, dtype=np.int64),
+    })
+
+
+def test_handle_and_csv_give_same_results():
+    frame = _frame()
+    csv = frame.to_csv(index=False)
+    with dataset_scope():
+        handle = current_registry().register(frame, symbol="TEST").handle
+
+        assert moving_averages.invoke({"csv_data": handle, "windows": "5,20"}) == \
+            moving_averages.invoke({"csv_data": csv, "windows": "5,20"})
+        assert bollinger_bands.invoke({"csv_data": handle}) == \
+            bollinger_bands.invoke({"csv_data": csv})
+        assert calculate_stats.invoke({"csv_data": handle}) == \
+            calculate_stats.invoke({"csv_data": csv})
+
+        # Tools must not mutate the shared frame.
+        assert list(frame.columns) == ["date", "open", "high", "low", "close", "volume"]
+
+
+def test_scopes_are_isolated():
+    with dataset_scope():
+        handle = current_registry().register(_frame(), symbol="TEST").handle
+        assert resolve_dataset(handle).symbol == "TEST"
+
+    with dataset_scope():
+        result = moving_averages.invoke({"csv_data": handle})
+        assert "error" in result and "Unknown or expired" in result["error"]
+
+
+if __name__ == "__main__":
+    test_handle_and_csv_give_same_results()
+    test_scopes_are_isolated()
+    print("dataset registry tests passed")
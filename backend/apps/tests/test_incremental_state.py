@@ -0,0 +1,103 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools.bollinger import bollinger_bands
+from apps.agents.tools.calculate_stats import calculate_stats
+from apps.agents.tools.moving_averages import moving_averages
+from apps.analytics import compute_indicators, parse_specs
+from apps.analytics.incremental import IndicatorState
+from apps.services import price_store
+from apps.services.dataset_registry import current_registry, dataset_scope
+from apps.services.price_store import PriceStore
+
+
+def _bars(rows: int = 1500) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    close = 80 * np.exp(np.cumsum(rng.normal(0, 0.015, rows)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+         "volume": rng.integers(1_000_000, 50_000_000, rows)},
+        index=pd.bdate_range("2015-01-01", periods=rows),
+    )
+
+
+def _assert_matches_full(state: IndicatorState, bars: pd.DataFrame) -> None:
+    frame = bars.rename_axis("date").reset_index()
+    full = compute_indicators(frame, parse_specs("sma:5,sma:20,sma:200,bb:20:2")).last_values()
+    assert abs(state.sma(5) - full["sma_5"]) <= 1e-9 * full["sma_5"]
+    assert abs(state.sma(200) - full["sma_200"]) <= 1e-9 * full["sma_200"]
+    bands = state.bands(20, 2.0)
+    assert abs(bands["upper"] - full["bb_20_2_upper"]) <= 1e-9 * full["bb_20_2_upper"]
+    assert abs(bands["lower"] - full["bb_20_2_lower"]) <= 1e-9 * full["bb_20_2_lower"]
+
+    for column in ("close", "volume"):
+        values = bars[column].astype(float)
+        stats = state.column_stats(column)
+        assert stats["count"] == len(bars)
+        assert abs(stats["mean"] - values.mean()) <= 1e-9 * abs(values.mean())
+        assert abs(stats["std"] - values.std()) <= 1e-9 * values.std()
+        assert stats["min"] == values.min() and stats["max"] == values.max()
+
+
+def test_appended_bars_match_full_recomputation():
+    bars = _bars()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("TEST", bars.iloc[:1000], full_history=True)
+
+        # One bar per write, with a compact-style overlap of earlier bars.
+        for end in range(1001, len(bars) + 1):
+            store.write("TEST", bars.iloc[max(0, end - 100):end])
+
+        state = store.indicator_state("TEST")
+        assert state.rows == len(bars)
+        assert state.last_date == bars.index[-1].strftime("%Y-%m-%d")
+        _assert_matches_full(state, bars)
+
+
+def test_revised_history_triggers_rebuild():
+    bars = _bars(400)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("TEST", bars.iloc[:300])
+        revised = bars.iloc[250:].copy()
+        revised.iloc[0, revised.columns.get_loc("close")] *= 1.5  # split adjustment, say
+        store.write("TEST", revised)
+
+        expected = pd.concat([bars.iloc[:250], revised])
+        _assert_matches_full(store.indicator_state("TEST"), expected)
+
+
+def test_tools_use_stored_state():
+    bars = _bars(600)
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = price_store._default_store
+        price_store._default_store = PriceStore(Path(tmp))
+        try:
+            price_store._default_store.write("TEST", bars, full_history=True)
+            with dataset_scope():
+                frame = bars.rename_axis("date").reset_index()
+                handle = current_registry().register(frame, symbol="TEST").handle
+
+                ma = moving_averages.invoke({"csv_data": handle, "windows": "20,200", "last_n": 0})
+                assert ma["dates"] == [] and ma["ma"]["200"] == []
+                assert abs(ma["last_values"]["200"] - frame["close"].tail(200).mean()) < 1e-9
+
+                bb = bollinger_bands.invoke({"csv_data": handle, "last_n": 0})
+                assert bb["last"]["date"] == frame["date"].iloc[-1].strftime("%Y-%m-%d")
+
+                stats = calculate_stats.invoke({"csv_data": handle, "metric": "close"})
+                assert stats["count"] == 600
+                assert abs(stats["std"] - frame["close"].std()) < 1e-9 * frame["close"].std()
+        finally:
+            price_store._default_store = saved
+
+
+if __name__ == "__main__":
+    test_appended_bars_match_full_recomputation()
+    test_revised_history_triggers_rebuild()
+    test_tools_use_stored_state()
+    print("incremental state tests passed")
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools.bollinger import bollinger_bands
+from apps.agents.tools.moving_averages import moving_averages
+from apps.services.dataset_registry import current_registry, dataset_scope
+
+
+def _handle(rows: int = 300):
+    rng = np.random.default_rng(11)
+    close = 100 + rng.standard_normal(rows).cumsum()
+    frame = pd.DataFrame({
+        "date": pd.bdate_range("2023-01-02", periods=rows),
+        "open": close, "high": close, "low": close, "close": close,
+        "volume": np.ones(rows, dtype=np.int64),
+    })
+    return current_registry().register(frame).handle, frame
+
+
+def test_rows_format_matches_legacy_loop():
+    with dataset_scope():
+        handle, frame = _handle()
+        result = moving_averages.invoke({"csv_data": handle, "windows": "5,20", "output_format": "rows"})
+
+        sma = frame["close"].rolling(window=20).mean()
+        expected = [
+            {"date": d.strftime("%Y-%m-%d"), "value": (None if pd.isna(v) else float(v))}
+            for d, v in zip(frame["date"], sma)
+        ]
+        got = result["ma"]["20"]
+        assert [r["date"] for r in got] == [r["date"] for r in expected]
+        for g, e in zip(got, expected):
+            assert (g["value"] is None) == (e["value"] is None)
+            if e["value"] is not None:
+                assert abs(g["value"] - e["value"]) < 1e-9
+
+
+def test_columnar_output_and_point_selection():
+    with dataset_scope():
+        handle, frame = _handle()
+
+        ma = moving_averages.invoke({"csv_data": handle, "windows": "5,200"})
+        assert len(ma["dates"]) == len(frame) == len(ma["ma"]["200"])
+        assert ma["ma"]["200"][0] is None and ma["ma"]["200"][-1] == ma["last_values"]["200"]
+
+        tail = moving_averages.invoke({"csv_data": handle, "windows": "5", "last_n": 10})
+        assert tail["dates"] == ma["dates"][-10:]
+        assert tail["ma"]["5"] == ma["ma"]["5"][-10:]
+
+        bb = bollinger_bands.invoke({"csv_data": handle, "max_points": 50})
+        assert len(bb["bands"]["dates"]) <= 50
+        assert bb["bands"]["dates"][-1] == bb["last"]["date"]
+        assert bb["bands"]["upper"][-1] == bb["last"]["upper"]
+
+
+if __name__ == "__main__":
+    test_rows_format_matches_legacy_loop()
+    test_columnar_output_and_point_selection()
+    print("indicator output tests passed")
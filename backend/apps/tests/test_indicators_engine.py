@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from apps.analytics import compute_indicators, parse_specs
+
+
+def _frame(rows: int = 6000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    return pd.DataFrame({
+        "date": pd.bdate_range("2000-01-03", periods=rows),
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+        "volume": rng.integers(1_000_000, 90_000_000, rows),
+    })
+
+
+def _close(a, b, rtol=1e-9, atol=1e-9):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    assert np.array_equal(np.isnan(a), np.isnan(b))
+    mask = ~np.isnan(a)
+    np.testing.assert_allclose(a[mask], b[mask], rtol=rtol, atol=atol)
+
+
+def test_matches_pandas_reference():
+    df = _frame()
+    close = df["close"]
+    specs = parse_specs("sma:5,sma:200,ema:12,bb:20:2,rsi:14,macd:12:26:9,stats:close")
+    res = compute_indicators(df, specs)
+
+    _close(res.series["sma_5"], close.rolling(5).mean())
+    _close(res.series["sma_200"], close.rolling(200).mean())
+    _close(res.series["ema_12"], close.ewm(span=12, adjust=False, min_periods=12).mean())
+
+    mid, std = close.rolling(20).mean(), close.rolling(20).std()
+    _close(res.series["bb_20_2_mid"], mid)
+    _close(res.series["bb_20_2_upper"], mid + 2 * std, rtol=1e-8)
+    _close(res.series["bb_20_2_lower"], mid - 2 * std, rtol=1e-8)
+
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    _close(res.series["rsi_14"], 100 - 100 / (1 + gain / loss), rtol=1e-8)
+
+    macd = close.ewm(span=12, adjust=False, min_periods=12).mean() - \
+        close.ewm(span=26, adjust=False, min_periods=26).mean()
+    _close(res.series["macd_12_26_9"], macd)
+
+    stats = res.stats["stats_close"]
+    assert stats["count"] == len(df)
+    assert abs(stats["std"] - close.std()) < 1e-9 * close.std()
+
+
+def test_volume_scale_rolling_std_is_accurate():
+    df = _frame()
+    specs = parse_specs("bb:50:2")
+    res = compute_indicators(df.assign(close=df["volume"].astype(float)), specs)
+    volume = df["volume"].astype(float)
+    mid, std = volume.rolling(50).mean(), volume.rolling(50).std()
+    _close(res.series["bb_50_2_mid"], mid, rtol=1e-9)
+    _close(res.series["bb_50_2_upper"], mid + 2 * std, rtol=1e-8)
+
+
+def test_long_wide_range_rolling_std_is_accurate():
+    rows = 50_000
+    rng = np.random.default_rng(11)
+    drift = np.linspace(np.log(0.1), np.log(3000.0), rows)
+    close = pd.Series(np.exp(drift + rng.normal(0, 0.01, rows)))
+    df = _frame(rows).assign(close=close)
+    res = compute_indicators(df, parse_specs("bb:20:2"))
+    std = close.rolling(20).std()
+    half_width = (res.series["bb_20_2_upper"] - res.series["bb_20_2_mid"]) / 2
+    _close(half_width, std, rtol=1e-7, atol=0)
+
+
+def test_parse_errors():
+    for bad in ["foo:3", "sma:0", "sma:2.5", "stats:date", ""]:
+        try:
+            parse_specs(bad)
+            raise AssertionError(f"expected ValueError for {bad!r}")
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_matches_pandas_reference()
+    test_volume_scale_rolling_std_is_accurate()
+    test_long_wide_range_rolling_std_is_accurate()
+    test_parse_errors()
+    print("indicator engine tests passed")
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools.fetch_stock_prices import fetch_stock_prices
+from apps.services import alpha_vantage_client as av
+from apps.services import price_providers
+from apps.services.price_providers import AlphaVantageProvider, LocalFileProvider
+from apps.services.rate_limiter import RateLimiter
+from apps.services.series_parser import OHLCV, SeriesLayout, SeriesParser
+
+
+def _intraday_payload(day: str, bars: int, interval: str = "5min") -> dict:
+    stamps = pd.date_range(f"{day} 09:30", periods=bars, freq=interval)
+    series = {
+        ts.strftime("%Y-%m-%d %H:%M:%S"): {
+            "1. open": f"{100 + i:.4f}", "2. high": f"{101 + i:.4f}",
+            "3. low": f"{99 + i:.4f}", "4. close": f"{100.5 + i:.4f}", "5. volume": str(1000 + i),
+        }
+        for i, ts in enumerate(stamps)
+    }
+    return {
+        "Meta Data": {"1. Information": "Intraday (5min)", "3. Last Refreshed": stamps[-1].isoformat()},
+        # Upstream lists newest first
+        f"Time Series ({interval})": dict(reversed(list(series.items()))),
+    }
+
+
+class _StreamedResponse:
+    status_code = 200
+    raw = None
+
+    def __init__(self, payload: dict):
+        self.content = json.dumps(payload, indent=4).encode()
+
+    def iter_content(self, chunk_size):
+        # Deliberately tiny chunks: bars are split across chunk boundaries.
+        for i in range(0, len(self.content), 97):
+            yield self.content[i:i + 97]
+
+    def close(self):
+        pass
+
+
+class _Session:
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.params = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        assert stream
+        self.params.append(params)
+        return _StreamedResponse(self.payloads.pop(0))
+
+
+def test_parser_handles_split_chunks():
+    payload = json.dumps(_intraday_payload("2024-03-04", 50), indent=4).encode()
+    parser = SeriesParser(SeriesLayout("Time Series (5min)", OHLCV))
+    for i in range(0, len(payload), 13):
+        parser.feed(payload[i:i + 13])
+    df = parser.frame()
+    assert len(df) == 50 and df.index.is_monotonic_increasing
+    assert df.index[0] == pd.Timestamp("2024-03-04 09:30")
+    assert df["volume"].dtype == np.int64 and df["close"].iloc[-1] == 149.5
+
+
+def test_alpha_vantage_intraday_history_is_paged():
+    session = _Session([_intraday_payload("2024-01-31", 10), _intraday_payload("2024-02-01", 10)])
+    limiter = RateLimiter(per_minute=100, per_day=100)
+    client = av.AlphaVantageClient(api_key="test", store=None, session=session, limiter=limiter)
+    provider = AlphaVantageProvider(client)
+
+    df = provider.fetch_history("IBM", "5min", ["2024-01", "2024-02"])
+    assert len(df) == 20 and df.index.is_monotonic_increasing
+    assert [p["month"] for p in session.params] == ["2024-01", "2024-02"]
+    assert all(p["function"] == "TIME_SERIES_INTRADAY" and p["interval"] == "5min" for p in session.params)
+
+
+def test_local_files_feed_the_fetch_tool():
+    dates = pd.bdate_range("2024-01-01", periods=150)
+    bars = pd.DataFrame({
+        "1. open": np.linspace(10, 20, 150), "2. high": np.linspace(11, 21, 150),
+        "3. low": np.linspace(9, 19, 150), "4. close": np.linspace(10.5, 20.5, 150),
+        "5. volume": np.arange(150) * 100,
+    }, index=pd.Index(dates, name="timestamp"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bars.to_csv(Path(tmp) / "TEST.csv")
+        provider = LocalFileProvider(Path(tmp))
+        assert provider.symbols() == ["TEST"]
+
+        df = provider.fetch("test", output_size="compact")
+        assert list(df.columns) == list(OHLCV) and len(df) == 100
+        assert df.index[-1] == dates[-1]
+
+        price_providers.register_provider("offline-test", lambda: provider)
+        saved = os.environ.get("PRICE_PROVIDER")
+        os.environ["PRICE_PROVIDER"] = "offline-test"
+        try:
+            text = fetch_stock_prices.invoke({
+                "symbol": "TEST", "output_size": "full", "end_date": dates[9].strftime("%Y-%m-%d"),
+            })
+        finally:
+            if saved is None:
+                del os.environ["PRICE_PROVIDER"]
+            else:
+                os.environ["PRICE_PROVIDER"] = saved
+        assert text.startswith("DATASET: ds_"), text
+        assert "10 daily rows" in text
+
+
+if __name__ == "__main__":
+    test_parser_handles_split_chunks()
+    test_alpha_vantage_intraday_history_is_paged()
+    test_local_files_feed_the_fetch_tool()
+    print("price provider tests passed")
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.agents.tools import fetch_stock_prices, price_series
+from apps.agents.tools.serialize import columnar
+from apps.analytics import lttb
+from apps.api.routes_series import router as series_router
+from apps.benchmarks.fixtures import offline
+from apps.services.dataset_registry import dataset_scope
+
+
+def test_lttb_keeps_ends_and_extremes():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[1234], y[8765] = 5.0, -5.0  # isolated spikes that even thinning would miss
+
+    idx = lttb(x, y, 1000)
+    assert len(idx) == 1000 and idx[0] == 0 and idx[-1] == 9999
+    assert (np.diff(idx) > 0).all()
+    assert 1234 in idx and 8765 in idx
+
+    assert (lttb(x[:50], y[:50], 100) == np.arange(50)).all()
+
+
+def test_columnar_shape_by_downsamples_all_series_together():
+    dates = pd.Series(pd.bdate_range("2000-01-03", periods=5000))
+    close = np.linspace(10, 20, 5000)
+    close[2500] = 100.0
+    cols = columnar(dates, {"close": close, "sma_5": close * 2}, max_points=300, shape_by="close")
+
+    assert len(cols["dates"]) == len(cols["close"]) == len(cols["sma_5"]) == 300
+    assert 100.0 in cols["close"] and 200.0 in cols["sma_5"]
+    assert cols["dates"][-1] == dates.iloc[-1].strftime("%Y-%m-%d")
+
+
+def test_series_endpoint_and_tool():
+    app = FastAPI()
+    app.include_router(series_router)
+    with offline():
+        client = TestClient(app)
+        body = client.get("/api/series/ibm", params={
+            "range_days": 365 * 25, "indicators": "sma:20,bb:20:2", "points": 1000,
+        }).json()
+        bad = client.get("/api/series/IBM", params={"indicators": "foo:1"})
+
+        with dataset_scope():
+            handle = fetch_stock_prices.invoke({"symbol": "IBM", "output_size": "full"}).split()[1]
+            out = price_series.invoke({"csv_data": handle, "indicators": "sma:20,stats:close", "points": 500})
+
+    series = body["series"]
+    assert body["symbol"] == "IBM" and body["downsample"] == "lttb"
+    assert body["points"] == len(series["dates"]) == 1000 < body["total_points"]
+    assert set(series) == {"dates", "close", "sma_20", "bb_20_2_mid", "bb_20_2_upper", "bb_20_2_lower"}
+    assert series["dates"][-1] == body["end_date"]
+    assert bad.status_code == 422
+
+    assert out["series_url"].startswith("/api/series/IBM?")
+    assert "indicators=sma%3A20&" in out["series_url"] and "points=500" in out["series_url"]
+    assert out["points"] == 500 and out["total_points"] == 6500
+
+
+if __name__ == "__main__":
+    test_lttb_keeps_ends_and_extremes()
+    test_columnar_shape_by_downsamples_all_series_together()
+    test_series_endpoint_and_tool()
+    print("price series tests passed")
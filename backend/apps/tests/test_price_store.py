@@ -0,0 +1,164 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apps.agents.tools import fetch_stock_prices
+from apps.benchmarks.fixtures import offline
+from apps.services.alpha_vantage_client import AlphaVantageClient
+from apps.services.dataset_registry import dataset_scope
+from apps.services.market_calendar import last_session_date, trading_days_between
+from apps.services import price_store
+from apps.services.price_store import PriceStore
+
+
+def _bars(start: str, periods: int) -> pd.DataFrame:
+    idx = pd.bdate_range(start=start, periods=periods)
+    close = 100 + np.arange(periods, dtype=float)
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close,
+         "volume": np.full(periods, 1000, dtype=np.int64)},
+        index=idx,
+    )
+
+
+class _RecordingClient(AlphaVantageClient):
+    """Client whose upstream is a fixed frame; records requested output sizes."""
+
+    def __init__(self, store, upstream: pd.DataFrame):
+        super().__init__(api_key="test", store=store)
+        self.upstream = upstream
+        self.calls = []
+
+    def _fetch_daily_upstream(self, symbol, output_size="compact"):
+        self.calls.append(output_size)
+        return self.upstream if output_size == "full" else self.upstream.tail(100)
+
+
+def test_store_roundtrip_and_merge():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("aapl", _bars("2024-01-01", 10))
+        store.write("AAPL", _bars("2024-01-08", 10))
+
+        df = store.load("AAPL")
+        assert df.index.is_monotonic_increasing
+        assert not df.index.duplicated().any()
+        assert len(df) == 15
+        assert df["volume"].dtype == np.int64
+        assert store.meta("AAPL").last_date == df.index[-1].strftime("%Y-%m-%d")
+
+
+def test_repeat_fetch_is_served_from_store():
+    end = pd.Timestamp(last_session_date())
+    upstream = _bars((end - pd.offsets.BDay(299)).strftime("%Y-%m-%d"), 300)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = _RecordingClient(PriceStore(Path(tmp)), upstream)
+
+        full = client.fetch_daily("AAPL", output_size="full")
+        compact = client.fetch_daily("AAPL", output_size="compact")
+        again = client.fetch_daily("AAPL", output_size="full")
+
+        assert client.calls == ["full"]
+        assert len(full) == 300 and len(again) == 300
+        assert len(compact) == 100
+
+        # Ranges are read from the store; compact still means the latest 100 bars.
+        start = full.index[-30]
+        ranged = client.fetch_daily("AAPL", output_size="compact", start=start)
+        assert len(ranged) == 30 and not ranged["close"].to_numpy().flags.writeable
+        assert client.fetch_daily("AAPL", output_size="compact", end=full.index[150]).empty
+        assert client.calls == ["full"]
+
+
+def test_stale_store_tops_up_with_compact():
+    end = pd.Timestamp(last_session_date())
+    upstream = _bars((end - pd.offsets.BDay(299)).strftime("%Y-%m-%d"), 300)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("AAPL", upstream.iloc[:-5], full_history=True)
+        meta = store.meta("AAPL")
+        meta.checked_at = 0
+        store._write_meta(store._symbol_dir("AAPL"), meta)
+
+        client = _RecordingClient(store, upstream)
+        df = client.fetch_daily("AAPL", output_size="full")
+
+        assert client.calls == ["compact"]
+        assert len(df) == 300
+
+
+def test_load_maps_columns_and_slices_by_date():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        bars = _bars("2024-01-01", 300)
+        store.write("MSFT", bars, full_history=True)
+
+        df = store.load("MSFT", start=pd.Timestamp("2024-02-01"), end=pd.Timestamp("2024-03-01"))
+        expected = bars[(bars.index >= "2024-02-01") & (bars.index < "2024-03-01")]
+        pd.testing.assert_frame_equal(df, expected, check_freq=False)
+        assert not df["close"].to_numpy().flags.writeable  # view of the mapped file
+
+        # A version written with day-resolution dates still loads.
+        version_dir = Path(tmp) / "MSFT" / store.meta("MSFT").version
+        np.save(version_dir / "date.npy", bars.index.values.astype("datetime64[D]"))
+        assert store.load("MSFT", start=pd.Timestamp("2024-12-01")).index[0] == pd.Timestamp("2024-12-02")
+        assert store.load("MSFT", end=pd.Timestamp("2023-01-01")).empty
+
+
+def test_fetch_tool_registers_views_of_stored_range():
+    with tempfile.TemporaryDirectory() as tmp, offline(store=PriceStore(Path(tmp))) as client:
+        dates = client.fetch_daily("IBM", "full").index
+        start, end = dates[-40].strftime("%Y-%m-%d"), dates[-11].strftime("%Y-%m-%d")
+        with dataset_scope() as registry:
+            handle = fetch_stock_prices.invoke(
+                {"symbol": "IBM", "output_size": "full", "start_date": start, "end_date": end}
+            ).split()[1]
+            frame = registry.get(handle).frame
+    assert len(frame) == 30 and frame["date"].iloc[-1] == dates[-11]
+    # No copy on the way: the columns are still read-only views of the mapped files.
+    assert not frame["close"].to_numpy().flags.writeable
+
+
+def test_replaced_version_outlives_grace_period():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("IBM", _bars("2024-01-01", 10))
+        old = store.meta("IBM")
+        mapped = store.load("IBM")
+        store.write("IBM", _bars("2024-01-15", 5))
+
+        # A reader that read the old meta still finds its files.
+        assert (Path(tmp) / "IBM" / old.version / "close.npy").exists()
+        assert len(mapped) == 10 and len(store.load("IBM")) == 15
+
+        saved = price_store.VERSION_GRACE_SECONDS
+        price_store.VERSION_GRACE_SECONDS = 0
+        try:
+            store.write("IBM", _bars("2024-01-22", 5))
+        finally:
+            price_store.VERSION_GRACE_SECONDS = saved
+        versions = [d.name for d in (Path(tmp) / "IBM").iterdir() if d.is_dir()]
+        assert old.version not in versions and len(versions) == 1
+        assert mapped["close"].iloc[-1] == 109.0  # old mapping is still readable
+
+
+def test_trading_days_between():
+    assert trading_days_between(date(2024, 1, 5), date(2024, 1, 8)) == 1  # Fri -> Mon
+    assert trading_days_between(date(2024, 1, 1), date(2024, 1, 15)) == 10
+    assert trading_days_between(date(2024, 1, 8), date(2024, 1, 8)) == 0
+
+
+if __name__ == "__main__":
+    test_store_roundtrip_and_merge()
+    test_repeat_fetch_is_served_from_store()
+    test_stale_store_tops_up_with_compact()
+    test_load_maps_columns_and_slices_by_date()
+    test_fetch_tool_registers_views_of_stored_range()
+    test_replaced_version_outlives_grace_period()
+    test_trading_days_between()
+    print("price store tests passed")
@@ -0,0 +1,147 @@
+import json
+
+import requests
+
+from apps.services import alpha_vantage_client as av
+from apps.services.rate_limiter import QuotaExceededError, RateLimiter
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_bucket_queues_instead_of_failing():
+    clock = _FakeClock()
+    limiter = RateLimiter(per_minute=5, per_day=100, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire(max_wait=60) for _ in range(6)]
+
+    assert waits[:5] == [0.0] * 5
+    assert abs(waits[5] - 12.0) < 1e-9  # one token refills every 12s
+    assert limiter.snapshot()["day_used"] == 6
+
+
+def test_daily_quota_is_enforced():
+    clock = _FakeClock()
+    limiter = RateLimiter(per_minute=100, per_day=2, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    try:
+        limiter.acquire()
+        raise AssertionError("expected QuotaExceededError")
+    except QuotaExceededError:
+        pass
+    assert limiter.snapshot()["rejected"] == 1
+
+
+class _Response:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self._payload = payload
+        self.raw = None
+
+    def json(self):
+        return self._payload
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class _ScriptedSession:
+    """Replays a list of responses (or exceptions) in order."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        assert timeout == (av.CONNECT_TIMEOUT, av.READ_TIMEOUT)
+        self.calls += 1
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+MINUTE_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+    "and 500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would like "
+    "to target a higher API call frequency."
+)
+DAY_NOTE = (
+    "We have detected your API key as TEST and our standard API rate limit is 25 requests per "
+    "day. Please subscribe to any of the premium plans at https://www.alphavantage.co/premium/ "
+    "to instantly remove all daily rate limits."
+)
+PREMIUM_NOTE = (
+    "Thank you for using Alpha Vantage! This is a premium endpoint. You may subscribe to any of "
+    "the premium plans at https://www.alphavantage.co/premium/ to instantly unlock all premium endpoints"
+)
+
+
+def test_transient_failures_are_retried():
+    clock = _FakeClock()
+    limiter = RateLimiter(per_minute=100, per_day=100, clock=clock, sleep=clock.sleep)
+    ok = {"Time Series (Daily)": {"2024-01-02": {
+        "1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": "1.5", "5. volume": "10"}}}
+    session = _ScriptedSession([
+        requests.ConnectionError("reset"),
+        _Response(503, {}),
+        _Response(200, {"Note": MINUTE_NOTE}),
+        _Response(200, ok),
+    ])
+    client = av.AlphaVantageClient(api_key="test", store=None, session=session, limiter=limiter)
+
+    saved = av.BACKOFF_BASE
+    av.BACKOFF_BASE = 0.0
+    try:
+        df = client.fetch_daily("AAPL")
+    finally:
+        av.BACKOFF_BASE = saved
+
+    assert session.calls == 4
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df["close"].iloc[0] == 1.5
+
+
+def test_notes_are_told_apart():
+    limiter = RateLimiter(per_minute=100, per_day=100)
+    session = _ScriptedSession([_Response(200, {"Information": PREMIUM_NOTE})])
+    client = av.AlphaVantageClient(api_key="test", store=None, session=session, limiter=limiter)
+    try:
+        client.fetch_series("AAPL", "daily_adjusted")
+        raise AssertionError("premium notice should fail")
+    except RuntimeError as e:
+        assert "premium endpoint" in str(e)
+    # Not retried, and the bucket is not penalised.
+    quota = limiter.snapshot()
+    assert session.calls == 1 and quota["day_remaining"] == 99 and quota["tokens_available"] >= 99
+
+    session = _ScriptedSession([_Response(200, {"Information": DAY_NOTE})])
+    client = av.AlphaVantageClient(api_key="test", store=None, session=session, limiter=limiter)
+    try:
+        client.fetch_daily("AAPL")
+        raise AssertionError("daily limit should fail")
+    except RuntimeError as e:
+        assert "rate limit" in str(e)
+    assert session.calls == 1 and limiter.snapshot()["day_remaining"] == 0
+
+
+if __name__ == "__main__":
+    test_bucket_queues_instead_of_failing()
+    test_daily_quota_is_enforced()
+    test_transient_failures_are_retried()
+    test_notes_are_told_apart()
+    print("rate limiter tests passed")
@@ -0,0 +1,96 @@
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from apps.services.market_calendar import MARKET_TZ
+from apps.services.price_store import PriceStore
+from apps.services.response_cache import ResponseCache, response_key
+
+
+def _response(*charts: str) -> dict:
+    return {"summary": "AAPL rose 4%.", "raw_result": {"output": "AAPL rose 4%."}, "chart_urls": list(charts)}
+
+
+def test_equivalent_questions_share_a_key():
+    key = response_key("AAPL last 3 months")
+    assert key is not None
+    assert response_key("show me apple for the past 3 months") == key
+    assert response_key("Show me $AAPL over the last three months") == key
+    assert response_key("AAPL last 6 months") != key
+    assert response_key("AAPL last 3 months with RSI") != key
+    assert response_key("How does the market work?") is None
+
+
+def test_intent_dates_and_interval_change_the_key():
+    key = response_key("AAPL last 3 months")
+    for question in (
+        "Why did AAPL drop over the last 3 months?",
+        "Should I sell AAPL over the last 3 months?",
+        "AAPL weekly bars last 3 months",
+        "AAPL last 3 months to 2023-05-01",
+    ):
+        assert response_key(question) != key, question
+
+
+def test_entry_expires_at_next_bar():
+    cache = ResponseCache()
+    # Tuesday 11:00 ET: the next bar is published Tuesday 16:00 + grace.
+    created = datetime(2024, 3, 5, 11, 0, tzinfo=MARKET_TZ)
+    cache.put("k", _response(), now=created)
+    assert cache.get("k", now=datetime(2024, 3, 5, 15, 59, tzinfo=MARKET_TZ).timestamp()) is not None
+    assert cache.get("k", now=datetime(2024, 3, 5, 17, 0, tzinfo=MARKET_TZ).timestamp()) is None
+    assert cache.stats()["items"] == 0
+
+
+def test_lru_bound_and_disk_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(max_items=2, root=Path(tmp))
+        for key in ("a", "b", "c"):
+            cache.put(key, _response())
+        assert cache.stats()["items"] == 2
+
+        # "a" fell out of memory but is still on disk; a new process sees all three.
+        assert cache.get("a") == _response()
+        fresh = ResponseCache(root=Path(tmp))
+        assert all(fresh.get(key) == _response() for key in ("a", "b", "c"))
+
+
+def test_missing_chart_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        charts = Path(tmp)
+        (charts / "chart_kept.png").write_bytes(b"png")
+        cache = ResponseCache(charts_dir=charts)
+        cache.put("kept", _response("/static/charts/chart_kept.png"))
+        cache.put("gone", _response("/static/charts/chart_gone.png"))
+        assert cache.get("kept") is not None
+        assert cache.get("gone") is None
+
+
+def _bars(day: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1},
+        index=pd.DatetimeIndex([pd.Timestamp(day)]),
+    )
+
+
+def test_newer_stored_bar_invalidates_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(Path(tmp))
+        store.write("AAPL", _bars("2024-03-04"))
+        cache = ResponseCache(store=store)
+        cache.put("k", _response(), data_as_of="2024-03-04", symbols=["aapl"])
+        assert cache.get("k") is not None
+        store.write("AAPL", _bars("2024-03-05"))
+        assert cache.get("k") is None
+
+
+if __name__ == "__main__":
+    test_equivalent_questions_share_a_key()
+    test_intent_dates_and_interval_change_the_key()
+    test_entry_expires_at_next_bar()
+    test_lru_bound_and_disk_persistence()
+    test_missing_chart_is_a_miss()
+    test_newer_stored_bar_invalidates_entry()
+    print("response cache tests passed")
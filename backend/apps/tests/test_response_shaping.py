@@ -0,0 +1,89 @@
+import numpy as np
+import orjson
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from apps.api.routes_agent import _build_response
+from apps.main import app
+from apps.services.response_shaping import ArtifactStore, dumps, get_artifact_store, shape, to_jsonable
+
+
+def test_to_jsonable_converts_in_one_pass():
+    value = to_jsonable({
+        "steps": [(AIMessage("hi"), "obs")],
+        "n": np.int64(3),
+        "x": np.float64(1.5),
+        1: None,
+    })
+    assert value["n"] == 3 and value["x"] == 1.5 and value["1"] is None
+    assert isinstance(value["steps"][0][0], str) and value["steps"][0][1] == "obs"
+    orjson.dumps(value)
+
+
+def test_shape_cuts_large_fields_to_artifacts():
+    store = ArtifactStore()
+    csv = "date,close\n" + "\n".join(f"2024-01-{i % 28 + 1:02d},{100 + i}" for i in range(20_000))
+    result = {"input": csv, "output": "AAPL is up 5%.", "series": list(range(50_000))}
+
+    small = {"output": "ok"}
+    assert shape(small, budget=1000, store=store) is small
+
+    shaped = shape(result, budget=16_384, store=store)
+    assert len(dumps(shaped)) <= 16_384
+    assert shaped["output"] == "AAPL is up 5%."
+    assert shaped["input"]["truncated"] and shaped["input"]["preview"].startswith("date,close\n2024-01-01,100")
+    assert shaped["series"]["items"] == 50_000
+
+    artifact_id = shaped["input"]["artifact_url"].rsplit("/", 1)[1]
+    assert orjson.loads(store.get(artifact_id)) == csv
+
+    # Too many medium fields: the whole value becomes one reference.
+    crowded = {f"k{i}": "x" * 3000 for i in range(40)}
+    whole = shape(crowded, budget=16_384, store=store)
+    assert whole["truncated"] and orjson.loads(store.get(whole["artifact_url"].rsplit("/", 1)[1])) == crowded
+
+
+def test_store_is_bounded():
+    store = ArtifactStore(max_items=2, max_bytes=10_000)
+    first = store.put(b'"a"')
+    store.put(b'"b"')
+    store.put(b'"c"')
+    assert store.get(first) is None and store.stats()["items"] == 2
+    kept = store.stats()
+    assert store.put(b'"' + b"x" * 20_000 + b'"') is None
+    assert store.stats() == kept
+
+
+def test_oversize_field_gets_no_artifact_url():
+    store = ArtifactStore(max_bytes=10_000)
+    shaped = shape({"output": "ok", "input": "x" * 20_000}, budget=4096, store=store)
+    assert shaped["input"]["truncated"] and shaped["input"]["bytes"] == 20_002
+    assert "artifact_url" not in shaped["input"]
+    assert store.stats()["items"] == 0
+
+
+def test_agent_response_is_bounded_and_compressed():
+    csv = "date,close\n" + "2024-01-02,1.0\n" * 200_000
+    response = _build_response({
+        "input": csv,
+        "output": "Chart: /static/charts/abc.png",
+    })
+    assert len(dumps(response)) < 70_000
+    assert response["chart_urls"] == ["/static/charts/abc.png"]
+    artifact_url = response["raw_result"]["input"]["artifact_url"]
+
+    client = TestClient(app)
+    fetched = client.get(artifact_url, headers={"Accept-Encoding": "gzip"})
+    assert fetched.status_code == 200 and fetched.headers["content-encoding"] == "gzip"
+    assert fetched.json() == csv
+    assert client.get("/api/agent/artifacts/0000000000000000").status_code == 404
+    assert get_artifact_store().stats()["items"] >= 1
+
+
+if __name__ == "__main__":
+    test_to_jsonable_converts_in_one_pass()
+    test_shape_cuts_large_fields_to_artifacts()
+    test_store_is_bounded()
+    test_oversize_field_gets_no_artifact_url()
+    test_agent_response_is_bounded_and_compressed()
+    print("response shaping tests passed")
@@ -0,0 +1,54 @@
+import asyncio
+
+from apps.services.run_limiter import QueueFullError, RunLimiter
+
+
+def test_limits_concurrency_and_queue():
+    async def scenario():
+        limiter = RunLimiter(max_concurrency=2, max_queue=1, timeout=5)
+        peak = 0
+        release = asyncio.Event()
+
+        async def job():
+            nonlocal peak
+            peak = max(peak, limiter.stats()["running"])
+            await release.wait()
+            return "done"
+
+        tasks = [asyncio.create_task(limiter.run(job)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        # Two running, one queued: the next caller is rejected.
+        try:
+            await limiter.run(job)
+            raise AssertionError("expected QueueFullError")
+        except QueueFullError:
+            pass
+
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return peak, results, limiter.stats()
+
+    peak, results, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert results == ["done"] * 3
+    assert stats["running"] == 0 and stats["waiting"] == 0
+
+
+def test_timeout_frees_the_slot():
+    async def scenario():
+        limiter = RunLimiter(max_concurrency=1, max_queue=0, timeout=0.05)
+        try:
+            await limiter.run(lambda: asyncio.sleep(1))
+            raise AssertionError("expected TimeoutError")
+        except asyncio.TimeoutError:
+            pass
+        return await limiter.run(lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+if __name__ == "__main__":
+    test_limits_concurrency_and_queue()
+    test_timeout_frees_the_slot()
+    print("run limiter tests passed")
@@ -0,0 +1,85 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from apps.benchmarks.fixtures import offline
+from apps.main import app
+from apps.services import response_cache, scheduler
+from apps.services.price_store import PriceStore
+from apps.services.rate_limiter import RateLimiter
+from apps.services.response_cache import ResponseCache, response_key
+from apps.services.scheduler import WatchlistScheduler, cache_keys, try_leader_lock, watchlist_symbols
+
+
+def test_watchlist_and_cache_keys():
+    assert watchlist_symbols(" aapl,MSFT,,aapl ") == ["AAPL", "MSFT"]
+    keys = cache_keys("AAPL")
+    assert len(set(keys)) == 8
+    for question in ("AAPL", "AAPL moving averages and bollinger bands", "how volatile is AAPL?"):
+        assert response_key(question) in keys
+    for question in ("Should I sell AAPL?", "AAPL since 2020-01-01", "AAPL weekly bars"):
+        assert response_key(question) not in keys
+
+
+def test_only_one_process_leads():
+    if scheduler.fcntl is None:  # no cross-process lock on this platform
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / ".scheduler.lock"
+        leader = try_leader_lock(path)
+        assert leader is not None
+        # flock locks belong to the open file, so a second open stands in for another process.
+        assert try_leader_lock(path) is None
+        leader.close()
+        again = try_leader_lock(path)
+        assert again is not None
+        again.close()
+
+
+def test_run_precomputes_within_quota_budget():
+    saved = response_cache._default_cache
+    with tempfile.TemporaryDirectory() as tmp, offline(store=PriceStore(Path(tmp))) as client:
+        client.limiter = RateLimiter(per_minute=10 ** 9, per_day=4)
+        cache = response_cache._default_cache = ResponseCache()
+        try:
+            job = WatchlistScheduler(["IBM", "MSFT", "AAPL"], quota_share=0.5, summarize=False)
+            run = asyncio.run(job.run_once())
+
+            assert run["quota_budget"] == 2 and run["quota_used"] == 2
+            assert [s["state"] for s in run["symbols"].values()] == ["ok", "ok", "skipped"]
+            assert run["state"] == "partial"
+            cached = cache.get(response_key("IBM bollinger bands"))
+            assert cached is not None and cached["raw_result"]["symbol"] == "IBM"
+            assert cache.get(response_key("AAPL")) is None
+
+            # Stored fresh bars cost nothing, so they run even with no budget left.
+            again = asyncio.run(WatchlistScheduler(["IBM"], quota_share=0.0, summarize=False).run_once())
+            assert again["symbols"]["IBM"]["state"] == "ok" and again["quota_used"] == 0
+
+            status = job.status()
+            assert status["state"] == "idle" and status["last_run"]["symbols"]["MSFT"]["state"] == "ok"
+            assert job.gauges()["last_run_symbols_skipped"] == 1
+        finally:
+            response_cache._default_cache = saved
+
+
+def test_status_endpoint():
+    saved = scheduler._scheduler
+    scheduler._scheduler = WatchlistScheduler(["IBM"])
+    try:
+        client = TestClient(app)
+        body = client.get("/health/scheduler").json()
+        assert body["enabled"] and body["symbols"] == ["IBM"] and body["last_run"] is None
+        assert "stock_watchlist_running 0" in client.get("/metrics").text
+    finally:
+        scheduler._scheduler = saved
+
+
+if __name__ == "__main__":
+    test_watchlist_and_cache_keys()
+    test_only_one_process_leads()
+    test_run_precomputes_within_quota_budget()
+    test_status_endpoint()
+    print("scheduler tests passed")
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from apps.benchmarks.fixtures import synthetic_body
+from apps.benchmarks.parse_series import decode_json, decode_streamed
+from apps.services.alpha_vantage_client import SERIES
+from apps.services.series_parser import SeriesParser, parse_series
+
+
+def test_streamed_decoder_matches_json_decoder():
+    for series, rows in (("daily", 3000), ("daily_adjusted", 500), ("weekly", 300), ("1min", 2000)):
+        layout = SERIES[series][1]
+        body = synthetic_body(layout, rows)
+        df = decode_streamed(body, layout)
+        pd.testing.assert_frame_equal(df, decode_json(body, layout), check_exact=True, check_freq=False)
+        assert df["volume"].dtype == np.int64 and df.index.dtype == "datetime64[ns]"
+
+
+def test_frame_is_built_without_copying_columns():
+    layout = SERIES["daily"][1]
+    parser = SeriesParser(layout, capacity=16)
+    parser.feed(synthetic_body(layout, 100))
+    df = parser.frame()
+    assert len(df) == 100 and df.index.is_monotonic_increasing
+    assert np.shares_memory(df["close"].to_numpy(), parser._columns["close"])
+
+
+def test_error_and_malformed_bodies():
+    layout = SERIES["daily"][1]
+    note = json.dumps({"Error Message": "Invalid API call."}).encode()
+    frame, head = parse_series([note], layout)
+    assert frame.empty and json.loads(head)["Error Message"]
+
+    broken = synthetic_body(layout, 5).replace(b'"5. volume": "', b'"5. volume": "x', 1)
+    try:
+        parse_series([broken], layout)
+    except RuntimeError as e:
+        assert "Unexpected" in str(e)
+    else:
+        raise AssertionError("malformed bar was accepted")
+
+
+if __name__ == "__main__":
+    test_streamed_decoder_matches_json_decoder()
+    test_frame_is_built_without_copying_columns()
+    test_error_and_malformed_bodies()
+    print("series parser tests passed")
@@ -0,0 +1,118 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from apps.agents.tools import compute_indicators, fetch_stock_prices
+from apps.api.routes_agent import _build_response
+from apps.benchmarks.fixtures import offline
+from apps.main import app
+from apps.services import response_cache
+from apps.services.response_cache import ResponseCache, response_key
+from apps.services.sessions import SessionStore, get_session_store, session_scope
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"date": pd.bdate_range("2020-01-01", periods=rows), "close": range(rows)})
+
+
+def test_store_expires_and_bounds_sessions():
+    store = SessionStore(ttl=60, max_items=3, max_bytes=10 ** 9)
+    first = store.get_or_create(now=0)
+    assert store.get_or_create(first.id, now=30) is first
+    assert store.get_or_create(first.id, now=100) is not first  # idle past the TTL
+    for _ in range(4):
+        store.get_or_create(now=100)
+    assert store.stats()["items"] == 3
+
+    budget = SessionStore(max_bytes=50_000)
+    sessions = [budget.get_or_create() for _ in range(3)]
+    for session in sessions:
+        session.registry.register(_frame(1000), symbol="X")  # ~16 KB each
+    assert budget.trim(keep=sessions[0]) <= 50_000
+    held = budget.stats()
+    assert held["items"] == 3 and held["bytes"] <= 50_000
+
+    sessions[2].registry.register(_frame(3000), symbol="Y")
+    budget.trim(keep=sessions[2])
+    assert budget.get(sessions[0].id) is None and budget.get(sessions[2].id) is sessions[2]
+
+
+def test_unknown_session_id_is_not_adopted():
+    store = SessionStore()
+    chosen = "attacker-chosen-id-0001"
+    session = store.get_or_create(chosen)
+    assert session.id != chosen and len(session.id) == 32
+    assert store.get(chosen) is None and store.get_or_create(session.id) is session
+
+    with offline():
+        response = TestClient(app).post("/api/agent/query", json={"input": "IBM", "session_id": chosen})
+    assert response.json()["session_id"] != chosen and get_session_store().get(chosen) is None
+
+
+def test_follow_up_turn_reuses_datasets_and_indicators():
+    session = SessionStore().get_or_create()
+    with offline() as client:
+        with session_scope(session):
+            first = fetch_stock_prices.invoke({"symbol": "IBM", "output_size": "full"})
+            compute_indicators.invoke({"csv_data": first.split()[1], "indicators": "sma:20,bb:20:2"})
+        session.add_turn("IBM moving averages", "IBM is above its 20-day SMA.")
+        calls = client.session.calls
+
+        with session_scope(session):
+            again = fetch_stock_prices.invoke({"symbol": "IBM", "output_size": "full"})
+            result = compute_indicators.invoke({"csv_data": again.split()[1], "indicators": "sma:20,bb:20:2"})
+
+    assert again.split()[1] == first.split()[1]
+    assert client.session.calls == calls
+    assert session.stats()["fetch_hits"] == 1 and session.stats()["memo_hits"] == 1
+    assert "sma_20" in result["last"]
+
+    history = session.history()
+    assert [m.type for m in history] == ["human", "ai"]
+    assert first.split()[1] in history[1].content
+
+
+def test_query_returns_and_resumes_session():
+    saved = response_cache._default_cache
+    cache = response_cache._default_cache = ResponseCache()
+    try:
+        cache.put(response_key("IBM"), {"summary": "IBM is flat.", "raw_result": {}, "chart_urls": []})
+        client = TestClient(app)
+        body = client.post("/api/agent/query", json={"input": "IBM"}).json()
+        session_id = body["session_id"]
+        assert body["summary"] == "IBM is flat." and "session_id" not in cache.get(response_key("IBM"))
+
+        # A follow-up depends on the earlier turns: it is not answered from the cache.
+        with offline():
+            again = client.post("/api/agent/query", json={"input": "IBM", "session_id": session_id}).json()
+        assert again["session_id"] == session_id and again["summary"] != "IBM is flat."
+        assert again["raw_result"]["pipeline"] == "fast"
+        assert len(get_session_store().get(session_id).history()) == 4
+
+        assert client.delete(f"/api/agent/sessions/{session_id}").status_code == 204
+        assert client.delete(f"/api/agent/sessions/{session_id}").status_code == 404
+    finally:
+        response_cache._default_cache = saved
+
+
+def test_response_ignores_earlier_turns():
+    from langchain_core.messages import AIMessage
+
+    result = {
+        "input": "and its bands?",
+        "chat_history": [AIMessage("Chart: /static/charts/old.png, series /api/series/IBM?old=1")],
+        "output": "See /static/charts/new.png",
+        "intermediate_steps": [("generate_plot", "/api/series/IBM?new=1")],
+    }
+    response = _build_response(result)
+    assert response["chart_urls"] == ["/static/charts/new.png"]
+    assert response["series_urls"] == ["/api/series/IBM?new=1"]
+    assert "chat_history" not in response["raw_result"]
+
+
+if __name__ == "__main__":
+    test_store_expires_and_bounds_sessions()
+    test_unknown_session_id_is_not_adopted()
+    test_follow_up_turn_reuses_datasets_and_indicators()
+    test_query_returns_and_resumes_session()
+    test_response_ignores_earlier_turns()
+    print("session tests passed")
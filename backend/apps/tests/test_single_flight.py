@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.benchmarks.fixtures import fixture_client
+from apps.services.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow_fetch(symbol):
+        calls.append(symbol)
+        started.set()
+        time.sleep(0.2)
+        return {"symbol": symbol}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(flight.do, ("AAPL", "full"), slow_fetch, "AAPL")
+        started.wait()
+        rest = [pool.submit(flight.do, ("AAPL", "full"), slow_fetch, "AAPL") for _ in range(7)]
+        results = [first.result()] + [f.result() for f in rest]
+
+    assert calls == ["AAPL"]
+    assert all(r is results[0] for r in results)
+    stats = flight.stats()
+    assert stats["leaders"] == 1 and stats["coalesced"] == 7 and stats["in_flight"] == 0
+
+
+def test_async_waiters_join_and_errors_propagate():
+    flight = SingleFlight()
+    calls = []
+
+    def failing_fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        tasks = [flight.ado("TSLA", failing_fetch) for _ in range(5)]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    # A later call is not served from the failed flight.
+    assert flight.do("TSLA", lambda: "ok") == "ok"
+
+
+def test_thread_and_async_fetches_share_one_upstream_call():
+    client = fixture_client(store=None, latency=0.3)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        threaded = pool.submit(client.fetch_daily, "aapl")
+        deadline = time.monotonic() + 5
+        while client.session.calls == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        awaited = asyncio.run(client.afetch_daily("AAPL"))
+        frame = threaded.result()
+
+    assert client.session.calls == 1
+    assert awaited is frame
+
+
+if __name__ == "__main__":
+    test_concurrent_threads_share_one_call()
+    test_async_waiters_join_and_errors_propagate()
+    test_thread_and_async_fetches_share_one_upstream_call()
+    print("single flight tests passed")
@@ -0,0 +1,60 @@
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.routes_health import router as health_router
+from apps.services.warmup import READINESS, warm_task
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Loaded on first use (agent executor build, chart render), never at import.
+LAZY_MODULES = ("langchain_google_genai", "langchain.agents", "langgraph", "matplotlib")
+
+
+def test_app_import_leaves_heavy_modules_unloaded():
+    probe = f"import sys, apps.main; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+
+def test_readiness_reports_background_warmup():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+
+    def broken():
+        raise RuntimeError("no credentials")
+
+    app = FastAPI()
+    app.include_router(health_router)
+    client = TestClient(app)
+
+    async def scenario():
+        task = warm_task({"slow": slow, "broken": broken})
+        await asyncio.sleep(0.05)
+        pending = client.get("/health/ready")
+        release.set()
+        await task
+        return pending
+
+    pending = asyncio.run(scenario())
+    assert pending.status_code == 503 and pending.json()["components"]["slow"]["state"] == "pending"
+
+    health = client.get("/health").json()
+    assert health["status"] == "ok" and health["ready"] and health["degraded"]
+    assert health["components"]["broken"] == {"state": "failed", "seconds": health["components"]["broken"]["seconds"],
+                                              "error": "no credentials"}
+    assert client.get("/health/ready").status_code == 200
+    READINESS.reset()
+
+
+if __name__ == "__main__":
+    test_app_import_leaves_heavy_modules_unloaded()
+    test_readiness_reports_background_warmup()
+    print("startup tests passed")
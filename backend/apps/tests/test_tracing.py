@@ -0,0 +1,64 @@
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from apps.agents.callbacks import TracingCallbackHandler
+from apps.agents.tools import fetch_stock_prices, moving_averages
+from apps.api.routes_health import router as health_router
+from apps.benchmarks.fixtures import offline
+from apps.services.dataset_registry import dataset_scope
+from apps.services.tracing import METRICS, Span, trace_scope
+
+
+def test_request_trace_covers_tools_and_upstream():
+    with offline(), dataset_scope(), trace_scope() as trace:
+        text = fetch_stock_prices.invoke({"symbol": "IBM", "output_size": "full"})
+        moving_averages.invoke({"csv_data": text.split()[1], "windows": "20", "last_n": 1})
+
+    summary = trace.summary()
+    names = [(s["kind"], s["name"]) for s in summary["spans"]]
+    assert names == [("tool", "fetch_stock_prices"), ("http", "alpha_vantage"), ("tool", "moving_averages")]
+    http = summary["spans"][1]
+    assert http["function"] == "TIME_SERIES_DAILY" and http["rows"] == 6500
+    assert summary["spans"][0]["output_bytes"] == len(text)
+    assert summary["by_kind"]["tool"]["count"] == 2
+    # The upstream call happens inside the fetch tool's span.
+    fetch = summary["spans"][0]
+    assert fetch["start_ms"] <= http["start_ms"] and http["duration_ms"] <= fetch["duration_ms"]
+
+
+def test_llm_callback_records_tokens():
+    with trace_scope() as trace:
+        handler = TracingCallbackHandler()
+    run_id = uuid.uuid4()
+    handler.on_chat_model_start({"name": "gemini"}, [[AIMessage("hi")]], run_id=run_id,
+                                invocation_params={"model": "gemini-2.5-flash"})
+    message = AIMessage("hello there", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+    (span,) = trace.summary()["spans"]
+    assert span["name"] == "gemini-2.5-flash" and span["input_tokens"] == 12 and span["output_tokens"] == 3
+
+
+def test_metrics_endpoint_exposes_spans():
+    METRICS.observe(Span("tool", "probe", 0.0, duration=0.02, attrs={"output_bytes": 100}))
+    METRICS.observe(Span("tool", "probe", 0.0, duration=2.0, error="ValueError"))
+    app = FastAPI()
+    app.include_router(health_router)
+    body = TestClient(app).get("/metrics").text
+
+    assert 'stock_span_duration_seconds_bucket{kind="tool",name="probe",le="0.025"} 1' in body
+    assert 'stock_span_duration_seconds_count{kind="tool",name="probe"} 2' in body
+    assert 'stock_span_errors_total{kind="tool",name="probe"} 1' in body
+    assert 'stock_span_attribute_total{kind="tool",name="probe",attr="output_bytes"} 100' in body
+    assert "stock_alpha_vantage_quota_day_used" in body
+
+
+if __name__ == "__main__":
+    test_request_trace_covers_tools_and_upstream()
+    test_llm_callback_records_tokens()
+    test_metrics_endpoint_exposes_spans()
+    print("tracing tests passed")
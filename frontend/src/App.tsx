@@ -4,7 +4,7 @@ import AnalysisResults from './components/AnalysisResults';
 import useStockAnalysis from './hooks/useStockAnalysis';
 
 const App: React.FC = () => {
-  const { data, loading, error, queryAgent } = useStockAnalysis();
+  const { data, loading, error, progress, queryAgent } = useStockAnalysis();
 
   const handleSubmit = async (query: string) => {
     await queryAgent(query);
@@ -20,6 +20,14 @@ const App: React.FC = () => {
 
         <StockInput onSubmit={handleSubmit} loading={loading} />
 
+        {loading && progress.length > 0 && (
+          <ul className="bg-[#1f2937] border border-gray-700 rounded-lg p-4 text-sm text-gray-300 space-y-1">
+            {progress.map((line, idx) => (
+              <li key={idx}>{line}</li>
+            ))}
+          </ul>
+        )}
+
         {error && (
           <div className="bg-red-900/70 text-red-100 border border-red-700 rounded-lg p-4">
             <strong>Error:</strong> {error}
@@ -30,6 +38,7 @@ const App: React.FC = () => {
           <AnalysisResults
             summary={data.summary || 'No summary returned.'}
             chartUrls={data.chart_urls ?? []}
+            seriesUrls={data.series_urls ?? []}
             rawResult={data.raw_result}
           />
         )}
@@ -1,4 +1,7 @@
-import React, { useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
+import StockChart from './StockChart';
+import { getSeries } from '../services/api';
+import type { PriceSeries } from '../types';
 
 function escapeHtml(s: string) {
   return s.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
@@ -40,11 +43,37 @@ function toPrettyHtml(text: string): string {
 interface AnalysisResultsProps {
   summary: string;
   chartUrls: string[];
+  seriesUrls?: string[];
   rawResult?: any;
 }
 
-const AnalysisResults: React.FC<AnalysisResultsProps> = ({ summary, chartUrls, rawResult }) => {
+// Interactive charts from /api/series; null while loading, 'failed' on error.
+function useSeries(urls: string[]) {
+  const [series, setSeries] = useState<Record<string, PriceSeries | 'failed' | null>>({});
+  const key = urls.join('|');
+
+  useEffect(() => {
+    const controller = new AbortController();
+    setSeries(Object.fromEntries(urls.map((u) => [u, null])));
+    urls.forEach((url) => {
+      getSeries(url, controller.signal)
+        .then((s) => setSeries((prev) => ({ ...prev, [url]: s })))
+        .catch(() => {
+          if (!controller.signal.aborted) setSeries((prev) => ({ ...prev, [url]: 'failed' }));
+        });
+    });
+    return () => controller.abort();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [key]);
+
+  return series;
+}
+
+const AnalysisResults: React.FC<AnalysisResultsProps> = ({ summary, chartUrls, seriesUrls = [], rawResult }) => {
   const [showRaw, setShowRaw] = useState(false);
+  const series = useSeries(seriesUrls);
+  // PNG charts are the fallback for when no interactive series could be drawn.
+  const seriesFailed = seriesUrls.length === 0 || seriesUrls.every((u) => series[u] === 'failed');
   const summaryHtml = useMemo(() => toPrettyHtml(summary || 'No summary returned.'), [summary]);
 
   const copyToClipboard = async () => {
@@ -72,7 +101,27 @@ const AnalysisResults: React.FC<AnalysisResultsProps> = ({ summary, chartUrls, r
         />
       </div>
 
-      {chartUrls && chartUrls.length > 0 && (
+      {seriesUrls.length > 0 && !seriesFailed && (
+        <div className="bg-[#1f2937] rounded-xl p-6 shadow-lg border border-gray-700 space-y-6">
+          <h3 className="text-xl font-semibold text-blue-200">Charts</h3>
+          {seriesUrls.map((url) => {
+            const s = series[url];
+            if (s === 'failed') return null;
+            if (!s) return <div key={url} className="text-sm text-gray-400">Loading chart...</div>;
+            return (
+              <figure key={url}>
+                <StockChart series={s} />
+                <figcaption className="px-3 py-2 text-xs text-gray-400">
+                  {s.symbol} {s.start_date} to {s.end_date}
+                  {s.downsample ? ` (${s.points} of ${s.total_points} points)` : ''}
+                </figcaption>
+              </figure>
+            );
+          })}
+        </div>
+      )}
+
+      {seriesFailed && chartUrls && chartUrls.length > 0 && (
         <div className="bg-[#1f2937] rounded-xl p-6 shadow-lg border border-gray-700">
           <h3 className="text-xl font-semibold mb-4 text-blue-200">Charts</h3>
           <div className="grid grid-cols-1 sm:grid-cols-2 gap-4">
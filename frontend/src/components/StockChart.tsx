@@ -1,23 +1,55 @@
-import React from 'react';
+import React, { useMemo } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
+import type { PriceSeries } from '../types';
+
+// Lines drawn on the price axis; oscillators (RSI, MACD) have their own scale.
+const OVERLAY = /^(sma|ema|bb)_/;
+const COLORS = ['#f59e0b', '#10b981', '#ec4899', '#a78bfa', '#22d3ee', '#f87171'];
 
 interface StockChartProps {
-    data: Array<{ date: string; price: number }>;
+    series: PriceSeries;
 }
 
-const StockChart: React.FC<StockChartProps> = ({ data }) => {
+const StockChart: React.FC<StockChartProps> = ({ series }) => {
+    const overlays = useMemo(
+        () => Object.keys(series.series).filter((name) => OVERLAY.test(name)),
+        [series],
+    );
+
+    // Recharts wants rows; the API sends columns to keep the payload small.
+    const data = useMemo(() => {
+        const { dates, ...columns } = series.series;
+        return dates.map((date, i) => {
+            const row: Record<string, string | number | null> = { date };
+            for (const [name, values] of Object.entries(columns)) row[name] = values[i] as number | null;
+            return row;
+        });
+    }, [series]);
+
     return (
         <ResponsiveContainer width="100%" height={400}>
             <LineChart data={data}>
-                <CartesianGrid strokeDasharray="3 3" />
-                <XAxis dataKey="date" />
-                <YAxis />
+                <CartesianGrid strokeDasharray="3 3" stroke="#374151" />
+                <XAxis dataKey="date" minTickGap={40} />
+                <YAxis domain={['auto', 'auto']} />
                 <Tooltip />
                 <Legend />
-                <Line type="monotone" dataKey="price" stroke="#8884d8" activeDot={{ r: 8 }} />
+                <Line type="monotone" dataKey="close" stroke="#60a5fa" dot={false} isAnimationActive={false} />
+                {overlays.map((name, i) => (
+                    <Line
+                        key={name}
+                        type="monotone"
+                        dataKey={name}
+                        stroke={COLORS[i % COLORS.length]}
+                        strokeWidth={1}
+                        dot={false}
+                        connectNulls={false}
+                        isAnimationActive={false}
+                    />
+                ))}
             </LineChart>
         </ResponsiveContainer>
     );
 };
 
-export default StockChart;
\ No newline at end of file
+export default StockChart;
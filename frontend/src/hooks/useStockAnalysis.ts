@@ -1,7 +1,7 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import axios from 'axios';
 import type { AgentResponse } from '../types';
-import { queryAgent as apiQueryAgent } from '../services/api';
+import { streamAgentQuery } from '../services/api';
 
 function extractChartUrlsFromText(text: string): string[] {
   const pattern = /\/static\/charts\/[^\s"')]+\.png/gi;
@@ -9,6 +9,11 @@ function extractChartUrlsFromText(text: string): string[] {
   return Array.from(new Set(matches)).filter((u) => u.startsWith('/static/'));
 }
 
+function extractSeriesUrlsFromText(text: string): string[] {
+  const pattern = /\/api\/series\/[^\s"'`),\]]+/gi;
+  return Array.from(new Set(text.match(pattern) || []));
+}
+
 function pickBestSummary(res: AgentResponse): string {
   const s = (res.summary ?? '').trim();
   const raw =
@@ -32,12 +37,25 @@ const useStockAnalysis = () => {
   const [data, setData] = useState<AgentResponse | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [progress, setProgress] = useState<string[]>([]);
+  // Server-side conversation, so follow-ups reuse earlier turns' data
+  const sessionId = useRef<string | undefined>(undefined);
 
   const queryAgent = useCallback(async (input: string) => {
     setLoading(true);
     setError(null);
+    setProgress([]);
     try {
-      const res = await apiQueryAgent(input);
+      const res = await streamAgentQuery(input, (event) => {
+        if (event.type === 'tool_start') {
+          setProgress((p) => [...p, `Running ${event.data.tool}...`]);
+        } else if (event.type === 'tool_error') {
+          setProgress((p) => [...p, `${event.data.tool} failed: ${event.data.error}`]);
+        } else if (event.type === 'chart') {
+          setProgress((p) => [...p, `Chart ready: ${event.data.url}`]);
+        }
+      }, undefined, sessionId.current);
+      sessionId.current = res.session_id ?? sessionId.current;
 
       const rawText =
         typeof res.raw_result === 'string' ? res.raw_result : JSON.stringify(res.raw_result ?? res);
@@ -47,10 +65,17 @@ const useStockAnalysis = () => {
           ? res.chart_urls
           : extractChartUrlsFromText(rawText);
 
+      const seriesUrls =
+        Array.isArray(res.series_urls) && res.series_urls.length > 0
+          ? res.series_urls
+          : extractSeriesUrlsFromText(rawText);
+
       const mapped: AgentResponse = {
         summary: pickBestSummary(res),
         chart_urls: chartUrls,
+        series_urls: seriesUrls,
         raw_result: res.raw_result ?? res,
+        session_id: res.session_id,
       };
 
       setData(mapped);
@@ -68,6 +93,8 @@ const useStockAnalysis = () => {
         } else if (err.message) {
           message = err.message;
         }
+      } else if (err instanceof Error && err.message) {
+        message = err.message;
       }
       setError(message);
       throw err;
@@ -76,7 +103,11 @@ const useStockAnalysis = () => {
     }
   }, []);
 
-  return { data, loading, error, queryAgent };
+  const resetSession = useCallback(() => {
+    sessionId.current = undefined;
+  }, []);
+
+  return { data, loading, error, progress, queryAgent, resetSession };
 };
 
 export default useStockAnalysis;
\ No newline at end of file
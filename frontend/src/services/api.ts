@@ -1,12 +1,66 @@
 import axios from 'axios';
-import type { AgentResponse } from '../types';
+import type { AgentResponse, AgentStreamEvent, PriceSeries } from '../types';
 
 const api = axios.create({
   baseURL: '', // same-origin; Vite proxy forwards /api and /static
   timeout: 120000, // increase timeout for long-running agent chains
 });
 
-export async function queryAgent(input: string): Promise<AgentResponse> {
-  const { data } = await api.post<AgentResponse>('/api/agent/query', { input });
+export async function queryAgent(input: string, sessionId?: string): Promise<AgentResponse> {
+  const { data } = await api.post<AgentResponse>('/api/agent/query', { input, session_id: sessionId });
   return data;
-}
\ No newline at end of file
+}
+
+export async function getSeries(url: string, signal?: AbortSignal): Promise<PriceSeries> {
+  const { data } = await api.get<PriceSeries>(url, { signal });
+  return data;
+}
+
+export async function streamAgentQuery(
+  input: string,
+  onEvent: (event: AgentStreamEvent) => void,
+  signal?: AbortSignal,
+  sessionId?: string,
+): Promise<AgentResponse> {
+  const res = await fetch('/api/agent/query/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify({ input, session_id: sessionId }),
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    const detail = await res.text().catch(() => '');
+    throw new Error(detail || `Stream request failed (${res.status})`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: AgentResponse | null = null;
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE frames are separated by a blank line
+    let sep: number;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let type = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) type = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      const event = { type, data: data ? JSON.parse(data) : {} } as AgentStreamEvent;
+      onEvent(event);
+      if (event.type === 'result') result = event.data;
+      if (event.type === 'error') throw new Error(event.data.detail);
+    }
+  }
+
+  if (!result) throw new Error('Stream ended without a result');
+  return result;
+}
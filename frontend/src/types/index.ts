@@ -32,8 +32,32 @@ export interface AgentResponse {
     summary: string;
     raw_result: any;
     chart_urls: string[];
+    series_urls?: string[];
+    // Conversation id; send it back with the next question to follow up
+    session_id?: string;
 }
 
+// Columnar price + indicator lines from /api/series/{symbol}, LTTB-downsampled
+export interface PriceSeries {
+    symbol: string;
+    interval: string;
+    start_date: string;
+    end_date: string;
+    total_points: number;
+    points: number;
+    downsample: 'lttb' | null;
+    series: { dates: string[]; close: Array<number | null> } & Record<string, Array<number | null> | string[]>;
+}
+
+export type AgentStreamEvent =
+    | { type: 'token'; data: { text: string } }
+    | { type: 'tool_start'; data: { tool: string; input: any } }
+    | { type: 'tool_end'; data: { tool: string; output: any } }
+    | { type: 'tool_error'; data: { tool: string; error: string } }
+    | { type: 'chart'; data: { url: string } }
+    | { type: 'result'; data: AgentResponse }
+    | { type: 'error'; data: { status: number; detail: string } };
+
 export interface ApiResponse<T> {
     data: T;
     message?: string;